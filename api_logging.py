@@ -0,0 +1,106 @@
+"""
+Structured logging for the model API
+JSON log lines written by a background thread, so the request path only
+enqueues a record and never blocks on stdout.
+
+Configuration (environment variables):
+    LOG_LEVEL                   minimum level written (default INFO)
+    PREDICTION_LOG_SAMPLE_RATE  fraction of requests that log every
+                                predicted day (default 0.01)
+    LOG_QUEUE_SIZE              records buffered before new ones are dropped
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+PREDICTION_LOG_SAMPLE_RATE = float(os.environ.get('PREDICTION_LOG_SAMPLE_RATE', '0.01'))
+LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', '10000'))
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, event and any extra fields"""
+
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'pid': record.process,
+            'event': record.getMessage(),
+        }
+        entry.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class BackgroundQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueue records for a writer thread that owns the real handler.
+
+    The writer is started by the first record logged in each process, so it
+    also runs in workers forked after the logger was configured. When the
+    queue is full, records are dropped and counted rather than blocking.
+    """
+
+    def __init__(self, target, maxsize=LOG_QUEUE_SIZE):
+        super().__init__(queue.Queue(maxsize))
+        self.target = target
+        self.maxsize = maxsize
+        self.listener = None
+        self.listener_pid = None
+        self.start_lock = threading.Lock()
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Formatting happens in the writer thread
+        return record
+
+    def enqueue(self, record):
+        if self.listener_pid != os.getpid():
+            self._start_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _start_listener(self):
+        with self.start_lock:
+            if self.listener_pid == os.getpid():
+                return
+            self.queue = queue.Queue(self.maxsize)
+            self.listener = logging.handlers.QueueListener(self.queue, self.target)
+            self.listener.start()
+            self.listener_pid = os.getpid()
+            atexit.register(self.listener.stop)
+
+
+def get_logger(name='model_api'):
+    """Logger that writes JSON lines to stdout from a background thread"""
+    logger = logging.getLogger(name)
+    if not logger.handlers:
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(JSONFormatter())
+        logger.addHandler(BackgroundQueueHandler(stream))
+        logger.setLevel(LOG_LEVEL)
+        logger.propagate = False
+    return logger
+
+
+def log_event(logger, event, log_level=logging.INFO, **fields):
+    """Log `event` with structured fields (cheap no-op below the logger level)"""
+    if logger.isEnabledFor(log_level):
+        logger.log(log_level, event, extra={'fields': fields})
+
+
+def sample_predictions():
+    """Whether this request should log its per-day predictions"""
+    return random.random() < PREDICTION_LOG_SAMPLE_RATE
@@ -0,0 +1,222 @@
+"""
+Lightweight Prometheus metrics for the model API
+Counters and histograms rendered in the Prometheus text exposition format.
+
+Recording is a dict lookup, a bisect and an increment under a per-metric
+lock, cheap enough to leave on in production.
+
+Gunicorn workers share one port, so a scrape reaches a random worker. With
+a multiprocess directory (METRICS_MULTIPROC_DIR, set by serve.py) every
+process writes a snapshot of its values there about once a second, and
+/metrics renders the sum over all snapshots. Snapshots of exited workers
+are kept, so counters never go backwards when a worker is replaced.
+"""
+
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds, from 50us to 2.5s
+DEFAULT_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5
+)
+
+
+def format_labels(label_names, label_values, extra=()):
+    pairs = list(zip(label_names, label_values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in pairs) + '}'
+
+
+class Counter:
+    """Monotonic counter, optionally split by labels"""
+
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def snapshot(self):
+        with self.lock:
+            return [[list(key), value] for key, value in self.values.items()]
+
+    @staticmethod
+    def merge(snapshots):
+        values = {}
+        for items in snapshots:
+            for key, value in items:
+                values[tuple(key)] = values.get(tuple(key), 0) + value
+        return values
+
+    def render(self, values=None):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        if values is None:
+            with self.lock:
+                values = dict(self.values)
+        for key, value in sorted(values.items()):
+            lines.append(f'{self.name}{format_labels(self.label_names, key)} {value}')
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram, optionally split by labels"""
+
+    def __init__(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self.series = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self.lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.label_names)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self):
+        with self.lock:
+            return [[list(key), list(series)] for key, series in self.series.items()]
+
+    @staticmethod
+    def merge(snapshots):
+        merged = {}
+        for items in snapshots:
+            for key, series in items:
+                total = merged.get(tuple(key))
+                merged[tuple(key)] = series if total is None else [a + b for a, b in zip(total, series)]
+        return merged
+
+    def render(self, series_by_key=None):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        if series_by_key is None:
+            with self.lock:
+                series_by_key = {key: list(series) for key, series in self.series.items()}
+
+        for key, series in sorted(series_by_key.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), series[:-1]):
+                cumulative += count
+                labels = format_labels(self.label_names, key, [('le', bound)])
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = format_labels(self.label_names, key)
+            lines.append(f'{self.name}_sum{labels} {series[-1]}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class Registry:
+    """
+    Collection of metrics rendered together for /metrics; aggregated over
+    processes when `multiproc_dir` is set.
+    """
+
+    def __init__(self, multiproc_dir=None, flush_interval_s=1.0):
+        self.metrics = []
+        self.multiproc_dir = multiproc_dir
+        self.flush_interval = flush_interval_s
+        self.lock = threading.Lock()
+        self.flusher_pid = None
+        self.snapshot_path = None
+
+    def counter(self, name, help_text, label_names=()):
+        metric = Counter(name, help_text, label_names)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(name, help_text, label_names, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def reset(self):
+        """Drop all recorded values, e.g. in a parent before it forks workers that would each inherit them"""
+        for metric in self.metrics:
+            with metric.lock:
+                if isinstance(metric, Counter):
+                    metric.values.clear()
+                else:
+                    metric.series.clear()
+
+    def ensure_flushing(self):
+        """Start this process's snapshot writer (threads do not survive fork, so once per worker)"""
+        if self.multiproc_dir is None or self.flusher_pid == os.getpid():
+            return
+        with self.lock:
+            if self.flusher_pid != os.getpid():
+                # Start time in the name, so a reused pid never overwrites an exited worker's values
+                self.snapshot_path = os.path.join(self.multiproc_dir, f'metrics-{os.getpid()}-{time.time_ns()}.json')
+                threading.Thread(target=self._flush_loop, name='metrics-flusher', daemon=True).start()
+                self.flusher_pid = os.getpid()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self):
+        """Write this process's values to its snapshot file (atomically)"""
+        snapshot = {metric.name: metric.snapshot() for metric in self.metrics}
+        tmp_path = self.snapshot_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, self.snapshot_path)
+
+    def read_snapshots(self):
+        snapshots = []
+        for path in glob.glob(os.path.join(self.multiproc_dir, 'metrics-*.json')):
+            try:
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # Removed or replaced mid-read; the next scrape picks it up
+        return snapshots
+
+    def render(self):
+        lines = []
+        if self.multiproc_dir is None:
+            for metric in self.metrics:
+                lines.extend(metric.render())
+        else:
+            self.ensure_flushing()
+            self.flush()  # This worker's own values are always current
+            snapshots = self.read_snapshots()
+            for metric in self.metrics:
+                lines.extend(metric.render(metric.merge(s.get(metric.name, []) for s in snapshots)))
+        return '\n'.join(lines) + '\n'
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def clear_multiproc_dir(path):
+    """Create `path` and drop snapshots of a previous server run"""
+    os.makedirs(path, exist_ok=True)
+    for name in glob.glob(os.path.join(path, 'metrics-*.json*')):
+        os.remove(name)
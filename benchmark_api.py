@@ -0,0 +1,83 @@
+"""
+Load generator for the model API
+Fires concurrent /api/predict-workout requests and reports throughput and
+latency percentiles.
+
+Usage:
+    python serve.py --workers 4 &
+    python benchmark_api.py --requests 2000 --concurrency 32
+"""
+
+import argparse
+import json
+import random
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+LEVELS = ['beginner', 'intermediate', 'advanced']
+GOALS = ['weight loss', 'build muscle', 'improve fitness']
+
+
+def random_profile(rng):
+    return {
+        'age': rng.randint(18, 70),
+        'weight': round(rng.uniform(45, 120), 1),
+        'height': round(rng.uniform(150, 200), 1),
+        'fitnessLevel': rng.choice(LEVELS),
+        'fitnessGoals': rng.choice(GOALS),
+        'allergies': ''
+    }
+
+
+def timed_request(url, profile):
+    body = json.dumps(profile).encode()
+    req = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return time.perf_counter() - start, status
+
+
+def percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the model API')
+    parser.add_argument('--url', default='http://localhost:5000/api/predict-workout')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    profiles = [random_profile(rng) for _ in range(args.requests)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(lambda p: timed_request(args.url, p), profiles))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency * 1000 for latency, _ in results)
+    errors = sum(1 for _, status in results if status != 200)
+
+    print("=" * 60)
+    print("MODEL API BENCHMARK")
+    print("=" * 60)
+    print(f"Requests: {args.requests} (concurrency {args.concurrency}, errors {errors})")
+    print(f"Throughput: {args.requests / elapsed:.1f} req/s")
+    print(f"Latency p50: {percentile(latencies, 50):.2f} ms")
+    print(f"Latency p90: {percentile(latencies, 90):.2f} ms")
+    print(f"Latency p99: {percentile(latencies, 99):.2f} ms")
+    print(f"Latency max: {latencies[-1]:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
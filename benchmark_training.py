@@ -0,0 +1,146 @@
+"""
+Training benchmark
+Trains both models once per (batch size, mode) and reports wall time per
+epoch, training samples/sec and final test accuracy, so the fastest setting
+that keeps accuracy can be picked for train_rnn_model.py / train_cnn_model.py.
+
+Modes: baseline, xla (jit_compile), mixed (mixed_bfloat16) and xla+mixed.
+The first epoch includes tracing and XLA compilation, so it is reported
+separately from the steady-state epochs.
+
+Usage:
+    python benchmark_training.py
+    python benchmark_training.py --epochs 10 --rnn-batch-sizes 64 256 --cnn-batch-sizes 16 128
+    python benchmark_training.py --models cnn --modes baseline xla
+"""
+
+import argparse
+import json
+import numpy as np
+
+from fitness_rnn_model import generate_training_data as generate_rnn_data, create_rnn_model, compile_rnn_model
+from fitness_cnn_model import (
+    generate_training_data as generate_cnn_data, prepare_training_data, create_cnn_model, compile_cnn_model
+)
+from training_modes import mode_name, set_mixed_precision, training_clock
+
+MODES = {
+    'baseline': (False, False),
+    'xla': (True, False),
+    'mixed': (False, True),
+    'xla+mixed': (True, True),
+}
+RESULTS_PATH = 'training_benchmark.json'
+
+
+def rnn_run(data, batch_size, epochs, jit_compile, callbacks):
+    """Fit the windowed RNN; returns (training rows, test accuracy)"""
+    X_seq_train, X_seq_test, X_feat_train, X_feat_test, y_train, y_test = data
+    model = compile_rnn_model(create_rnn_model(), jit_compile)
+    model.fit(
+        [X_seq_train, X_feat_train], y_train,
+        epochs=epochs, batch_size=batch_size, validation_split=0.2, callbacks=callbacks, verbose=0
+    )
+    _, accuracy = model.evaluate([X_seq_test, X_feat_test], y_test, verbose=0)
+    return len(y_train) - int(len(y_train) * 0.2), accuracy
+
+
+def cnn_run(data, batch_size, epochs, jit_compile, callbacks):
+    """Fit the CNN on the 80/10/10 split; returns (training rows, test accuracy)"""
+    (X_train, y_train), val, (X_test, y_test) = data
+    model = compile_cnn_model(create_cnn_model(), jit_compile)
+    model.fit(
+        X_train, y_train,
+        epochs=epochs, batch_size=batch_size, validation_data=val, callbacks=callbacks, verbose=0
+    )
+    _, accuracy = model.evaluate(X_test, y_test, verbose=0)
+    return len(X_train), accuracy
+
+
+def benchmark(name, run, data, batch_size, epochs, jit_compile, mixed_precision, seed):
+    from tensorflow import keras
+
+    keras.backend.clear_session()
+    keras.utils.set_random_seed(seed)
+    set_mixed_precision(mixed_precision)
+
+    clock_callback, clock = training_clock()
+    rows, accuracy = run(data, batch_size, epochs, jit_compile, [clock_callback])
+
+    seconds = clock['epoch_seconds']
+    steady = seconds[1:] or seconds
+    epoch_seconds = float(np.mean(steady))
+    return {
+        'model': name,
+        'mode': mode_name(jit_compile, mixed_precision),
+        'batch_size': batch_size,
+        'epochs': epochs,
+        'train_rows': rows,
+        'first_epoch_seconds': seconds[0],
+        'epoch_seconds': epoch_seconds,
+        'samples_per_sec': rows / epoch_seconds,
+        'total_seconds': float(sum(seconds)),
+        'test_accuracy': float(accuracy),
+    }
+
+
+def print_report(results):
+    print("\n" + "=" * 60)
+    print("TRAINING BENCHMARK (CPU)")
+    print("=" * 60)
+    print(f"{'model':<6}{'mode':<11}{'batch':>6}{'1st ep s':>10}{'epoch s':>9}{'samples/s':>11}{'acc':>7}")
+    for r in results:
+        print(f"{r['model']:<6}{r['mode']:<11}{r['batch_size']:>6}{r['first_epoch_seconds']:>10.2f}"
+              f"{r['epoch_seconds']:>9.3f}{r['samples_per_sec']:>11,.0f}{r['test_accuracy']:>7.1%}")
+
+    for name in sorted({r['model'] for r in results}):
+        runs = [r for r in results if r['model'] == name]
+        best_accuracy = max(r['test_accuracy'] for r in runs)
+        fastest = max(runs, key=lambda r: r['samples_per_sec'])
+        print(f"\n{name.upper()}: fastest {fastest['mode']} @ batch {fastest['batch_size']} "
+              f"({fastest['samples_per_sec']:,.0f} samples/sec, {fastest['test_accuracy']:.1%} "
+              f"vs best {best_accuracy:.1%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark training modes and batch sizes on CPU')
+    parser.add_argument('--models', nargs='+', choices=['rnn', 'cnn'], default=['rnn', 'cnn'])
+    parser.add_argument('--modes', nargs='+', choices=list(MODES), default=list(MODES))
+    parser.add_argument('--epochs', type=int, default=5, help='epochs per run (first one includes compilation)')
+    parser.add_argument('--rnn-batch-sizes', type=int, nargs='+', default=[64, 256])
+    parser.add_argument('--cnn-batch-sizes', type=int, nargs='+', default=[16, 128])
+    parser.add_argument('--rnn-samples', type=int, default=2000)
+    parser.add_argument('--cnn-samples', type=int, default=1500)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=RESULTS_PATH)
+    args = parser.parse_args()
+    if args.epochs < 2:
+        parser.error('--epochs must be at least 2 to time a steady-state epoch')
+
+    plans = []
+    if 'rnn' in args.models:
+        plans.append(('rnn', rnn_run, generate_rnn_data(args.rnn_samples, seed=args.seed), args.rnn_batch_sizes))
+    if 'cnn' in args.models:
+        _, train, val, test = prepare_training_data(*generate_cnn_data(args.cnn_samples, seed=args.seed))
+        plans.append(('cnn', cnn_run, (train, val, test), args.cnn_batch_sizes))
+
+    results = []
+    try:
+        for name, run, data, batch_sizes in plans:
+            for batch_size in batch_sizes:
+                for mode in args.modes:
+                    jit_compile, mixed_precision = MODES[mode]
+                    print(f"⏱️  {name} {mode} @ batch {batch_size}...")
+                    results.append(benchmark(
+                        name, run, data, batch_size, args.epochs, jit_compile, mixed_precision, args.seed))
+    finally:
+        set_mixed_precision(False)
+
+    print_report(results)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+CNN Profile Classifier Serving
+Folds the StandardScaler from train_cnn_model.py into the CNN so the API
+classifies raw [age, weight, height, fitness_level, goal] rows without
+pickle or scikit-learn.
+
+Export the serving artifacts once after training:
+    python cnn_serving.py
+"""
+
+import os
+import numpy as np
+
+from fitness_cnn_model import MODEL_PATH as CNN_MODEL_PATH, SCALER_PATH as CNN_SCALER_PATH, workout_categories
+from numpy_inference import relu, softmax
+from columnar_dataset import CNN_DATASET_DIR as CNN_DATASET_PATH, load_dataset, cnn_profile_rows
+
+# Scaler folded in: raw (batch, 5) profile rows in, 9 probabilities out
+CNN_SERVING_PATH = 'fitness_cnn_serving.h5'
+CNN_SERVING_TFLITE_PATH = 'fitness_cnn_serving.tflite'
+CNN_WEIGHTS_PATH = 'fitness_cnn_weights.npz'
+
+CNN_FEATURES = ['age', 'weight', 'height', 'fitness_level', 'goal']
+CNN_POOL_ROWS = 2  # MaxPooling2D((2, 1))
+
+
+def profile_row(age, weight, height, level, goal):
+    """Raw CNN input row, in CNN_FEATURES order"""
+    return [float(age), float(weight), float(height), float(level), float(goal)]
+
+
+def fold_scaler(keras_model, mean, scale):
+    """
+    Wrap the trained CNN so it takes raw profile rows: a Normalization layer
+    holding the scaler's mean and variance, then the (5, 1, 1) reshape.
+    """
+    from tensorflow.keras import layers, models
+
+    profile_input = layers.Input(shape=(len(CNN_FEATURES),), name='profile_input')
+    x = layers.Normalization(mean=mean, variance=np.square(scale), name='scaler')(profile_input)
+    x = layers.Reshape((len(CNN_FEATURES), 1, 1))(x)
+    return models.Model(profile_input, keras_model(x))
+
+
+def conv2d_rows(x, kernel, bias):
+    """Keras Conv2D with a (k, 1) kernel and 'same' padding over (batch, rows, channels)"""
+    k = kernel.shape[0]
+    top = (k - 1) // 2
+    padded = np.pad(x, ((0, 0), (top, k - 1 - top), (0, 0)))
+    rows = x.shape[1]
+    return sum(padded[:, j:j + rows] @ kernel[j, 0] for j in range(k)) + bias
+
+
+class NumpyCNNModel:
+    """Inference-only copy of the fused CNN (scaler, convolutions, dense head)"""
+
+    def __init__(self, weights):
+        self.weights = {name: np.asarray(value, dtype=np.float32) for name, value in weights.items()}
+        self.num_conv = sum(1 for name in self.weights if name.endswith('_kernel') and name.startswith('conv_'))
+        self.num_dense = sum(1 for name in self.weights if name.endswith('_kernel') and name.startswith('dense_'))
+
+    @classmethod
+    def load(cls, path=CNN_WEIGHTS_PATH):
+        with np.load(path) as data:
+            return cls(dict(data))
+
+    def save(self, path=CNN_WEIGHTS_PATH):
+        np.savez(path, **self.weights)
+
+    def predict(self, inputs, verbose=0):
+        """Same contract as the fused Keras model: raw (batch, 5) rows in"""
+        w = self.weights
+        x = (np.asarray(inputs, dtype=np.float32) - w['mean']) / w['scale']
+        x = x[:, :, None]
+
+        for i in range(self.num_conv):
+            x = relu(conv2d_rows(x, w[f'conv_{i}_kernel'], w[f'conv_{i}_bias']))
+
+        # MaxPooling2D((2, 1)) with 'valid' padding drops the odd last row
+        rows = x.shape[1] // CNN_POOL_ROWS
+        x = x[:, :rows * CNN_POOL_ROWS].reshape(len(x), rows, CNN_POOL_ROWS, -1).max(axis=2)
+        x = x.reshape(len(x), -1)
+
+        for i in range(self.num_dense):
+            x = x @ w[f'dense_{i}_kernel'] + w[f'dense_{i}_bias']
+            x = relu(x) if i < self.num_dense - 1 else softmax(x)
+        return x
+
+
+def extract_cnn_weights(keras_model, mean, scale):
+    """Flat weight dict for NumpyCNNModel from the trained (unfused) CNN"""
+    weights = {'mean': mean, 'scale': scale}
+    conv_layers = [layer for layer in keras_model.layers if layer.__class__.__name__ == 'Conv2D']
+    dense_layers = [layer for layer in keras_model.layers if layer.__class__.__name__ == 'Dense']
+
+    for i, layer in enumerate(conv_layers):
+        weights[f'conv_{i}_kernel'], weights[f'conv_{i}_bias'] = layer.get_weights()
+    for i, layer in enumerate(dense_layers):
+        weights[f'dense_{i}_kernel'], weights[f'dense_{i}_bias'] = layer.get_weights()
+    return weights
+
+
+def load_cnn_profiles(path=CNN_DATASET_PATH, rows=500):
+    """Last `rows` samples of the CNN dataset as raw (n, 5) rows and labels"""
+    return cnn_profile_rows(load_dataset(path), slice(-rows, None))
+
+
+if __name__ == '__main__':
+    from fitness_cnn_model import load_cnn_model
+    from export_tflite import convert_to_tflite, save_flatbuffer
+    from tflite_inference import TFLiteModel
+
+    print("=" * 60)
+    print("EXPORTING CNN FOR SERVING (SCALER FOLDED IN)")
+    print("=" * 60)
+
+    keras_model, scaler = load_cnn_model(CNN_MODEL_PATH, CNN_SCALER_PATH)
+    mean = scaler.mean_.astype(np.float32)
+    scale = scaler.scale_.astype(np.float32)
+
+    fused = fold_scaler(keras_model, mean, scale)
+    fused.save(CNN_SERVING_PATH)
+    print(f"✅ Fused model saved as '{CNN_SERVING_PATH}'")
+
+    save_flatbuffer(convert_to_tflite(fused), CNN_SERVING_TFLITE_PATH)
+
+    engine = NumpyCNNModel(extract_cnn_weights(keras_model, mean, scale))
+    engine.save(CNN_WEIGHTS_PATH)
+    print(f"✅ Weights saved as '{CNN_WEIGHTS_PATH}' ({os.path.getsize(CNN_WEIGHTS_PATH) / 1024:.1f} KB)")
+
+    # The original pipeline (scaler.transform + CNN) is the reference
+    features, labels = load_cnn_profiles()
+    expected = keras_model.predict(scaler.transform(features).reshape(-1, 5, 1, 1), verbose=0)
+    for name, actual in (('Fused Keras', fused.predict(features, verbose=0)),
+                         ('TFLite', TFLiteModel(CNN_SERVING_TFLITE_PATH).predict(features)),
+                         ('NumPy', engine.predict(features))):
+        max_diff = float(np.max(np.abs(expected - actual)))
+        if max_diff > 1e-4:
+            raise SystemExit(f"❌ {name} output differs from scaler + CNN by {max_diff:.2e}")
+        print(f"✅ {name} matches scaler + CNN on {len(features)} held-out rows (max abs diff {max_diff:.2e})")
+    print(f"   Accuracy: {np.mean(np.argmax(expected, -1) == labels) * 100:.2f}%")
@@ -0,0 +1,226 @@
+"""
+Columnar Training Dataset Format
+Each dataset is a directory with one .npy file per column plus meta.json:
+
+    rnn_training_dataset/
+        age.npy  fitness_level.npy  goal.npy   uint8 (rows,)
+        workouts.npy                           uint8 (rows, 7), day 7 is the target
+        meta.json                              row count, dtypes and the code -> name tables
+
+    cnn_training_dataset/
+        age.npy  fitness_level.npy  goal.npy  category.npy   uint8 (rows,)
+        weight.npy  height.npy  bmi.npy                      float32 (rows,)
+        meta.json
+
+Workout, level and goal names live only in meta.json. Columns load with
+np.load(mmap_mode='r'), so readers page in the rows they touch instead of
+parsing text. generate_datasets.py writes both; --csv also exports the old
+wide CSVs.
+
+A large dataset can instead be split into shard-00000/, shard-00001/, ...
+subdirectories, each laid out as above, plus a manifest.json
+(generate_datasets.py --shards N, see sharded_generation.py).
+
+Only the wide CSVs are checked in, so load_dataset() reads
+rnn_training_dataset.csv / cnn_training_dataset.csv when the directory has
+not been written yet (generate_datasets.py --from-csv converts them once).
+"""
+
+import json
+import os
+import shutil
+import numpy as np
+
+RNN_DATASET_DIR = 'rnn_training_dataset'
+CNN_DATASET_DIR = 'cnn_training_dataset'
+META_FILE = 'meta.json'
+
+# Column name -> (dtype, shape of one row)
+RNN_COLUMNS = {
+    'age': ('uint8', ()),
+    'fitness_level': ('uint8', ()),
+    'goal': ('uint8', ()),
+    'workouts': ('uint8', (7,)),
+}
+CNN_COLUMNS = {
+    'age': ('uint8', ()),
+    'weight': ('float32', ()),
+    'height': ('float32', ()),
+    'bmi': ('float32', ()),
+    'fitness_level': ('uint8', ()),
+    'goal': ('uint8', ()),
+    'category': ('uint8', ()),
+}
+
+# Dataset directory -> columns of the checked-in CSV next to it (<dir>.csv)
+CSV_FALLBACK_COLUMNS = {
+    RNN_DATASET_DIR: RNN_COLUMNS,
+    CNN_DATASET_DIR: CNN_COLUMNS,
+}
+
+
+class ColumnarWriter:
+    """Fill a dataset directory chunk by chunk; the row count must be known up front"""
+
+    def __init__(self, path, columns, rows, names=None):
+        from numpy.lib.format import open_memmap
+
+        clear_dataset(path)
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.columns = columns
+        self.rows = rows
+        self.names = names or {}
+        self.offset = 0
+        self.arrays = {
+            name: open_memmap(os.path.join(path, f'{name}.npy'), mode='w+', dtype=dtype, shape=(rows,) + shape)
+            for name, (dtype, shape) in columns.items()
+        }
+
+    def write(self, chunk):
+        n = len(chunk['age'])
+        for name, array in self.arrays.items():
+            array[self.offset:self.offset + n] = chunk[name]
+        self.offset += n
+
+    def close(self):
+        if self.offset != self.rows:
+            raise ValueError(f"{self.path}: wrote {self.offset} rows, expected {self.rows}")
+        for array in self.arrays.values():
+            array.flush()
+        self.arrays = {}
+
+        meta = {
+            'rows': self.rows,
+            'columns': {name: {'dtype': dtype, 'shape': list(shape)} for name, (dtype, shape) in self.columns.items()},
+            'names': self.names,
+        }
+        with open(os.path.join(self.path, META_FILE), 'w') as f:
+            json.dump(meta, f, indent=2)
+
+
+def shard_path(path, index):
+    return os.path.join(path, f'shard-{index:05d}')
+
+
+def clear_dataset(path):
+    """Remove a previous dataset at `path`, sharded or not"""
+    if not os.path.isdir(path):
+        return
+    for name in os.listdir(path):
+        if name.startswith('shard-'):
+            shutil.rmtree(os.path.join(path, name))
+        elif name.endswith('.npy') or name.endswith('.json'):  # columns, meta.json, manifest.json
+            os.remove(os.path.join(path, name))
+
+
+def dataset_shards(path):
+    """Columnar directories making up a dataset: `path` itself, or its shard-* subdirectories"""
+    if os.path.exists(os.path.join(path, META_FILE)):
+        return [path]
+    shards = sorted(
+        os.path.join(path, name) for name in os.listdir(path) if name.startswith('shard-')
+    ) if os.path.isdir(path) else []
+    if not shards:
+        raise FileNotFoundError(f"{path}: no {META_FILE} or shard-* directories (run generate_datasets.py)")
+    return shards
+
+
+def load_meta(path):
+    with open(os.path.join(path, META_FILE)) as f:
+        return json.load(f)
+
+
+def load_columns(path, mmap_mode='r'):
+    """Every column of a dataset directory, memory-mapped by default"""
+    return {
+        name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode)
+        for name in load_meta(path)['columns']
+    }
+
+
+def csv_chunks(csv_path, columns, chunk_size):
+    """Chunks of an existing wide CSV, in the generator column layout"""
+    import pandas as pd
+
+    for frame in pd.read_csv(csv_path, chunksize=chunk_size):
+        chunk = {name: frame[name].to_numpy().astype(dtype) for name, (dtype, _) in columns.items() if name != 'workouts'}
+        if 'workouts' in columns:
+            chunk['workouts'] = frame[[f'day{d}_workout' for d in range(1, 8)]].to_numpy().astype(np.uint8)
+        yield chunk
+
+
+def load_csv_dataset(csv_path, columns, chunk_size=1_000_000):
+    """All `columns` of a wide CSV, in memory"""
+    chunks = list(csv_chunks(csv_path, columns, chunk_size))
+    return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in columns}
+
+
+def csv_fallback(path):
+    """(csv path, columns) to read instead of a missing dataset directory, or None"""
+    columns = CSV_FALLBACK_COLUMNS.get(os.path.basename(os.path.normpath(path)))
+    csv_path = os.path.normpath(path) + '.csv'
+    if columns is None or not os.path.exists(csv_path):
+        return None
+    return csv_path, columns
+
+
+def load_dataset(path):
+    """
+    All columns of a dataset. A single directory stays memory-mapped; shards
+    are concatenated into memory. Without the directory, the checked-in CSV
+    of the same name is read instead.
+    """
+    try:
+        shard_paths = dataset_shards(path)
+    except FileNotFoundError:
+        fallback = csv_fallback(path)
+        if fallback is None:
+            raise
+        print(f"⚠️ {path}/ not found, reading {fallback[0]} "
+              f"(python generate_datasets.py --from-csv converts it once)")
+        return load_csv_dataset(*fallback)
+
+    shards = [load_columns(shard) for shard in shard_paths]
+    if len(shards) == 1:
+        return shards[0]
+    return {name: np.concatenate([shard[name] for shard in shards]) for name in shards[0]}
+
+
+def dataset_rows(path):
+    return sum(load_meta(shard)['rows'] for shard in dataset_shards(path))
+
+
+def dataset_bytes(path):
+    return sum(
+        os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names
+    )
+
+
+def rnn_model_inputs(columns, rows=slice(None)):
+    """(seq_input (n, 6) int64, feat_input (n, 3) float32, labels (n,)) from RNN columns"""
+    workouts = np.asarray(columns['workouts'][rows], dtype=np.int64)
+    feat_input = np.stack([
+        columns['age'][rows] / 100.0, columns['fitness_level'][rows] / 2.0, columns['goal'][rows] / 2.0
+    ], axis=1).astype(np.float32)
+    return workouts[:, :6], feat_input, workouts[:, 6]
+
+
+def rnn_columns_from_inputs(seq_input, feat_input, labels):
+    """Inverse of rnn_model_inputs()"""
+    feat_input = np.asarray(feat_input, dtype=np.float64)
+    return {
+        'age': np.rint(feat_input[:, 0] * 100).astype(np.uint8),
+        'fitness_level': np.rint(feat_input[:, 1] * 2).astype(np.uint8),
+        'goal': np.rint(feat_input[:, 2] * 2).astype(np.uint8),
+        'workouts': np.column_stack([seq_input, labels]).astype(np.uint8),
+    }
+
+
+def cnn_profile_rows(columns, rows=slice(None)):
+    """(raw [age, weight, height, level, goal] rows (n, 5) float32, categories (n,)) from CNN columns"""
+    features = np.stack([
+        columns['age'][rows], columns['weight'][rows], columns['height'][rows],
+        columns['fitness_level'][rows], columns['goal'][rows]
+    ], axis=1).astype(np.float32)
+    return features, np.asarray(columns['category'][rows], dtype=np.int64)
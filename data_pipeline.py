@@ -0,0 +1,177 @@
+"""
+Streaming tf.data Input Pipeline
+Feeds model.fit straight from the columnar dataset shards written by
+generate_datasets.py, so training is no longer capped by RAM:
+
+    shards -> interleave(read row blocks, parallel) -> map(decode, parallel)
+           -> unbatch -> shuffle(bounded buffer) -> batch -> prefetch
+
+Every shard is split by row position into train/validation/test, so the
+splits never overlap and stay balanced across shards. For multi-worker
+training (distributed_training.py) each split is further cut into one
+contiguous row range per worker.
+"""
+
+import functools
+import time
+import numpy as np
+
+from columnar_dataset import dataset_shards, load_columns, load_meta
+
+DEFAULT_BLOCK_ROWS = 4096  # Rows read from a shard per memmap slice
+DEFAULT_SHUFFLE_BUFFER = 50_000  # Rows held in the shuffle buffer
+MAX_PARALLEL_SHARDS = 8
+
+# Row fractions of every shard (start, stop); the RNN mirrors test_size=0.2 plus
+# validation_split=0.2, the CNN the 80/10/10 split of prepare_training_data()
+RNN_SPLITS = {'train': (0.0, 0.64), 'validation': (0.64, 0.8), 'test': (0.8, 1.0)}
+CNN_SPLITS = {'train': (0.0, 0.8), 'validation': (0.8, 0.9), 'test': (0.9, 1.0)}
+
+RNN_READ_COLUMNS = ['age', 'fitness_level', 'goal', 'workouts']
+CNN_FEATURE_COLUMNS = ['age', 'weight', 'height', 'fitness_level', 'goal']
+
+
+def split_rows(rows, split):
+    start, stop = split
+    return int(rows * start), int(rows * stop)
+
+
+def worker_rows(start, stop, worker=None):
+    """Row range of worker (index, count) within [start, stop); every worker gets the same share +-1"""
+    if worker is None:
+        return start, stop
+    index, count = worker
+    bounds = np.linspace(start, stop, count + 1).astype(int)
+    return int(bounds[index]), int(bounds[index + 1])
+
+
+def count_rows(path, split):
+    """Rows of `split` across all shards of a dataset"""
+    total = 0
+    for shard in dataset_shards(path):
+        start, stop = split_rows(load_meta(shard)['rows'], split)
+        total += stop - start
+    return total
+
+
+def read_blocks(shard, columns, split, block_rows=DEFAULT_BLOCK_ROWS, worker=None):
+    """Yield tuples of raw column blocks (in `columns` order) for one shard's split (or a worker's part of it)"""
+    if isinstance(shard, bytes):
+        shard = shard.decode()
+    arrays = load_columns(shard)
+    start, stop = worker_rows(*split_rows(len(arrays[columns[0]]), split), worker)
+    for offset in range(start, stop, block_rows):
+        end = min(offset + block_rows, stop)
+        yield tuple(np.asarray(arrays[name][offset:end]) for name in columns)
+
+
+def block_dataset(path, columns, signature, split, block_rows=DEFAULT_BLOCK_ROWS, worker=None):
+    """Raw column blocks of every shard, read in parallel"""
+    import tensorflow as tf
+
+    shards = dataset_shards(path)
+    reader = functools.partial(read_blocks, columns=columns, split=split, block_rows=block_rows, worker=worker)
+    return tf.data.Dataset.from_tensor_slices(shards).interleave(
+        lambda shard: tf.data.Dataset.from_generator(reader, args=(shard,), output_signature=signature),
+        cycle_length=min(len(shards), MAX_PARALLEL_SHARDS),
+        num_parallel_calls=tf.data.AUTOTUNE,
+        deterministic=False
+    )
+
+
+def finish(dataset, batch_size, shuffle_buffer, seed, worker=None):
+    """
+    Shuffle, batch and prefetch. A worker's dataset (already sharded by
+    read_blocks) also repeats forever, since synchronous workers must all run
+    the same number of steps (pass steps_per_epoch), and opts out of
+    tf.data auto-sharding.
+    """
+    import tensorflow as tf
+
+    dataset = dataset.unbatch()
+    if shuffle_buffer:
+        dataset = dataset.shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+    if worker is not None:
+        options = tf.data.Options()
+        options.experimental_distribute.auto_shard_policy = tf.data.experimental.AutoShardPolicy.OFF
+        dataset = dataset.repeat().with_options(options)
+    return dataset.batch(batch_size).prefetch(tf.data.AUTOTUNE)
+
+
+def rnn_dataset(path, split, batch_size=64, shuffle_buffer=DEFAULT_SHUFFLE_BUFFER, seed=42,
+                block_rows=DEFAULT_BLOCK_ROWS, worker=None):
+    """((seq_input, feat_input), next_workout) batches for the windowed RNN; `worker` is (index, count)"""
+    import tensorflow as tf
+
+    signature = (
+        tf.TensorSpec((None,), tf.uint8),
+        tf.TensorSpec((None,), tf.uint8),
+        tf.TensorSpec((None,), tf.uint8),
+        tf.TensorSpec((None, 7), tf.uint8),
+    )
+
+    def decode(age, level, goal, workouts):
+        # Same inputs as columnar_dataset.rnn_model_inputs()
+        workouts = tf.cast(workouts, tf.int32)
+        features = tf.stack([
+            tf.cast(age, tf.float32) / 100.0, tf.cast(level, tf.float32) / 2.0, tf.cast(goal, tf.float32) / 2.0
+        ], axis=1)
+        return (workouts[:, :6], features), workouts[:, 6]
+
+    dataset = block_dataset(path, RNN_READ_COLUMNS, signature, split, block_rows, worker).map(
+        decode, num_parallel_calls=tf.data.AUTOTUNE, deterministic=False)
+    return finish(dataset, batch_size, shuffle_buffer, seed, worker)
+
+
+def fit_cnn_scaler(path, split, block_rows=1_000_000):
+    """StandardScaler over the raw CNN features of `split`, fitted in one streaming pass"""
+    from sklearn.preprocessing import StandardScaler
+
+    scaler = StandardScaler()
+    for shard in dataset_shards(path):
+        for block in read_blocks(shard, CNN_FEATURE_COLUMNS, split, block_rows):
+            scaler.partial_fit(np.stack(block, axis=1).astype(np.float64))
+    return scaler
+
+
+def cnn_dataset(path, split, scaler, batch_size=16, shuffle_buffer=DEFAULT_SHUFFLE_BUFFER, seed=42,
+                block_rows=DEFAULT_BLOCK_ROWS, worker=None):
+    """(scaled (5, 1, 1) profile, one-hot category) batches for the CNN; `worker` is (index, count)"""
+    import tensorflow as tf
+
+    signature = (
+        tf.TensorSpec((None,), tf.uint8),
+        tf.TensorSpec((None,), tf.float32),
+        tf.TensorSpec((None,), tf.float32),
+        tf.TensorSpec((None,), tf.uint8),
+        tf.TensorSpec((None,), tf.uint8),
+        tf.TensorSpec((None,), tf.uint8),
+    )
+    mean = tf.constant(scaler.mean_, tf.float32)
+    scale = tf.constant(scaler.scale_, tf.float32)
+
+    def decode(age, weight, height, level, goal, category):
+        raw = tf.stack([tf.cast(column, tf.float32) for column in (age, weight, height, level, goal)], axis=1)
+        profiles = tf.reshape((raw - mean) / scale, (-1, 5, 1, 1))
+        return profiles, tf.one_hot(tf.cast(category, tf.int32), 9)
+
+    dataset = block_dataset(path, CNN_FEATURE_COLUMNS + ['category'], signature, split, block_rows, worker).map(
+        decode, num_parallel_calls=tf.data.AUTOTUNE, deterministic=False)
+    return finish(dataset, batch_size, shuffle_buffer, seed, worker)
+
+
+def throughput_logger(samples_per_epoch):
+    """Keras callback printing training samples/sec after every epoch (wall time includes validation)"""
+    from tensorflow import keras
+
+    started = {}
+
+    def on_epoch_begin(epoch, logs=None):
+        started[epoch] = time.perf_counter()
+
+    def on_epoch_end(epoch, logs=None):
+        seconds = time.perf_counter() - started.pop(epoch)
+        print(f"  ⚡ Epoch {epoch + 1}: {samples_per_epoch:,} samples in {seconds:.2f}s "
+              f"({samples_per_epoch / seconds:,.0f} samples/sec)")
+
+    return keras.callbacks.LambdaCallback(on_epoch_begin=on_epoch_begin, on_epoch_end=on_epoch_end)
@@ -0,0 +1,119 @@
+"""
+RNN Dataset Compaction
+The RNN weeks are nine base patterns plus 10% per-day noise, so most rows are
+exact duplicates of (age, level, goal, 7 workouts). Compaction collapses them
+into unique rows with a `count` column that training uses as sample weights.
+Optional age bucketing maps ages to bucket centres first, which trades a
+little age resolution for far fewer unique rows.
+
+Rows are packed into one uint64 key each and counted chunk by chunk, so memory
+is bounded by the number of unique rows, not the dataset size.
+
+Training compacts its own training split (train_rnn_model.py --compact); this
+script reports how far a generated dataset collapses:
+    python dataset_compaction.py
+    python dataset_compaction.py --dataset rnn_training_dataset --age-buckets 1 5 10
+"""
+
+import argparse
+import time
+import numpy as np
+
+from columnar_dataset import RNN_COLUMNS, RNN_DATASET_DIR, dataset_shards, load_columns
+
+DEFAULT_CHUNK_ROWS = 1_000_000
+
+# Key layout, low bits first: 7 workouts x 3 bits, level 2, goal 2, age 8
+WORKOUT_BITS = 3
+LEVEL_SHIFT = 7 * WORKOUT_BITS
+GOAL_SHIFT = LEVEL_SHIFT + 2
+AGE_SHIFT = GOAL_SHIFT + 2
+
+
+def bucket_ages(age, width):
+    """Ages mapped to the centre of their `width`-year bucket"""
+    age = np.asarray(age, dtype=np.uint16)
+    return ((age // width) * width + width // 2).astype(np.uint8)
+
+
+def pack_rnn_rows(columns, age_bucket=None):
+    age = columns['age'] if not age_bucket else bucket_ages(columns['age'], age_bucket)
+    keys = np.asarray(age, dtype=np.uint64) << np.uint64(AGE_SHIFT)
+    keys |= np.asarray(columns['goal'], dtype=np.uint64) << np.uint64(GOAL_SHIFT)
+    keys |= np.asarray(columns['fitness_level'], dtype=np.uint64) << np.uint64(LEVEL_SHIFT)
+    workouts = np.asarray(columns['workouts'], dtype=np.uint64)
+    for day in range(7):
+        keys |= workouts[:, day] << np.uint64(day * WORKOUT_BITS)
+    return keys
+
+
+def unpack_rnn_keys(keys):
+    """RNN columns (uint8, like RNN_COLUMNS) from packed keys"""
+    shifts = np.arange(7, dtype=np.uint64) * np.uint64(WORKOUT_BITS)
+    return {
+        'age': (keys >> np.uint64(AGE_SHIFT)).astype(np.uint8),
+        'fitness_level': ((keys >> np.uint64(LEVEL_SHIFT)) & np.uint64(3)).astype(np.uint8),
+        'goal': ((keys >> np.uint64(GOAL_SHIFT)) & np.uint64(3)).astype(np.uint8),
+        'workouts': ((keys[:, None] >> shifts) & np.uint64(7)).astype(np.uint8),
+    }
+
+
+def merge_counts(keys, counts):
+    keys, inverse = np.unique(keys, return_inverse=True)
+    return keys, np.bincount(inverse, weights=counts, minlength=len(keys)).astype(np.uint32)
+
+
+def compact_rnn_chunks(chunks, age_bucket=None):
+    """
+    Unique rows of all chunks plus a `count` column.
+
+    Returns (columns, total input rows).
+    """
+    keys = np.empty(0, dtype=np.uint64)
+    counts = np.empty(0, dtype=np.uint32)
+    rows = 0
+    for chunk in chunks:
+        chunk_keys, chunk_counts = np.unique(pack_rnn_rows(chunk, age_bucket), return_counts=True)
+        keys, counts = merge_counts(np.concatenate([keys, chunk_keys]), np.concatenate([counts, chunk_counts]))
+        rows += len(chunk['age'])
+
+    columns = unpack_rnn_keys(keys)
+    columns['count'] = counts
+    return columns, rows
+
+
+def compact_rnn_columns(columns, age_bucket=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """compact_rnn_chunks() over in-memory or memory-mapped RNN columns"""
+    total = len(columns['age'])
+    chunks = (
+        {name: columns[name][start:start + chunk_rows] for name in RNN_COLUMNS}
+        for start in range(0, total, chunk_rows)
+    )
+    return compact_rnn_chunks(chunks, age_bucket)
+
+
+def compact_rnn_dataset(path, age_bucket=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """compact_rnn_chunks() over every shard of a dataset directory"""
+    def chunks():
+        for shard in dataset_shards(path):
+            columns = load_columns(shard)
+            for start in range(0, len(columns['age']), chunk_rows):
+                yield {name: columns[name][start:start + chunk_rows] for name in RNN_COLUMNS}
+
+    return compact_rnn_chunks(chunks(), age_bucket)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Report how far duplicate RNN rows collapse')
+    parser.add_argument('--dataset', default=RNN_DATASET_DIR)
+    parser.add_argument('--age-buckets', type=int, nargs='+', default=[1, 5, 10], help='bucket widths in years')
+    args = parser.parse_args()
+
+    print(f"Compaction of '{args.dataset}/'")
+    for width in args.age_buckets:
+        start = time.perf_counter()
+        columns, rows = compact_rnn_dataset(args.dataset, age_bucket=width if width > 1 else None)
+        seconds = time.perf_counter() - start
+        unique = len(columns['count'])
+        print(f"  age bucket {width:>2}y: {rows:,} rows -> {unique:,} unique "
+              f"({rows / unique:.1f}x, {seconds:.2f}s)")
@@ -0,0 +1,391 @@
+"""
+Multi-worker Data-parallel Training
+Synchronous data-parallel training of the RNN or CNN with
+tf.distribute.MultiWorkerMirroredStrategy on CPU workers. Every worker runs
+this script with a TF_CONFIG cluster spec; each streams only its own row
+range of every dataset shard (data_pipeline.py, worker=(index, count)) in
+per-replica batches, gradients are all-reduced every step, and only the
+chief (worker 0) keeps checkpoints and saves the model. --batch-size is per
+worker, so one step consumes batch size x workers rows.
+
+--workers N launches N local worker processes on free localhost ports, so the
+whole setup can be tried on one machine. --scaling 1 2 4 runs the same
+training at each worker count and writes a scaling report. On one machine the
+workers share its cores (--threads-per-worker); real nodes just run
+`--worker` with their own TF_CONFIG. --resume restores on every worker, so
+on real nodes --checkpoint-dir must be a directory all of them can read
+(e.g. a network mount); workers that restore a different epoch than the
+chief stop with an error.
+
+Usage (needs a columnar dataset from generate_datasets.py):
+    python distributed_training.py --model rnn --workers 2 --epochs 5 --save
+    python distributed_training.py --model cnn --scaling 1 2 4 --epochs 3
+    TF_CONFIG='{"cluster": {"worker": ["node1:12345", "node2:12345"]}, "task": {"type": "worker", "index": 0}}' \\
+        python distributed_training.py --model rnn --worker --dataset rnn_training_dataset
+"""
+
+import argparse
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+from columnar_dataset import CNN_DATASET_DIR, RNN_DATASET_DIR
+from data_pipeline import (
+    CNN_SPLITS, DEFAULT_SHUFFLE_BUFFER, RNN_SPLITS, cnn_dataset, count_rows, fit_cnn_scaler, rnn_dataset
+)
+
+REPORT_PATH = 'scaling_report.json'
+
+# model -> (default dataset, default per-worker batch size, default checkpoint directory)
+MODELS = {
+    'rnn': (RNN_DATASET_DIR, 64, 'rnn_checkpoints'),
+    'cnn': (CNN_DATASET_DIR, 16, 'cnn_checkpoints'),
+}
+
+
+def free_ports(count):
+    """`count` localhost ports that are free right now"""
+    sockets = [socket.socket() for _ in range(count)]
+    try:
+        for s in sockets:
+            s.bind(('localhost', 0))
+        return [s.getsockname()[1] for s in sockets]
+    finally:
+        for s in sockets:
+            s.close()
+
+
+def local_cluster(workers):
+    """Cluster spec of `workers` processes on this machine"""
+    return {'worker': [f'localhost:{port}' for port in free_ports(workers)]}
+
+
+def tf_config(cluster, index):
+    return json.dumps({'cluster': cluster, 'task': {'type': 'worker', 'index': index}})
+
+
+def worker_task():
+    """(index, count) of this process from TF_CONFIG; (0, 1) without one"""
+    config = json.loads(os.environ.get('TF_CONFIG', '{}'))
+    if not config:
+        return 0, 1
+    return config['task']['index'], len(config['cluster']['worker'])
+
+
+def training_checkpoint(model, directory, max_to_keep=3):
+    """
+    (manager, epoch variable) for checkpoints of `model` plus the number of
+    finished epochs in `directory`. Every worker opens it, but only the
+    chief ever saves through the manager.
+    """
+    import tensorflow as tf
+
+    epoch = tf.Variable(0, dtype=tf.int64, trainable=False, name='epoch')
+    checkpoint = tf.train.Checkpoint(model=model, epoch=epoch)
+    return tf.train.CheckpointManager(checkpoint, directory, max_to_keep=max_to_keep), epoch
+
+
+def checkpoint_callback(manager, epoch_variable, chief):
+    """
+    Keras callback checkpointing after every epoch. Saving is collective, so
+    every worker saves, but only the chief writes into the manager's
+    directory; the other workers write to a temporary directory that is
+    removed right away.
+    """
+    from tensorflow import keras
+
+    def on_epoch_end(epoch, logs=None):
+        epoch_variable.assign(epoch + 1)
+        if chief:
+            manager.save(checkpoint_number=epoch + 1)
+            return
+        scratch = tempfile.mkdtemp(prefix='worker-checkpoint-')
+        manager.checkpoint.write(os.path.join(scratch, 'ckpt'))
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    return keras.callbacks.LambdaCallback(on_epoch_end=on_epoch_end)
+
+
+def restore_latest(strategy, manager, epoch_variable, chief):
+    """
+    Restore the manager's latest checkpoint on this worker and return the
+    chief's epoch to resume from. The epochs are compared with an all-reduce:
+    a worker that cannot see the chief's checkpoints (directory not shared)
+    would otherwise start from other weights and epoch, so that is an error.
+    """
+    import tensorflow as tf
+
+    if manager.latest_checkpoint:
+        manager.checkpoint.restore(manager.latest_checkpoint).expect_partial()
+    epoch = float(epoch_variable.numpy())
+
+    def all_workers_sum(value):
+        per_replica = strategy.run(lambda: tf.constant(value, tf.float32))
+        return int(strategy.reduce(tf.distribute.ReduceOp.SUM, per_replica, axis=None).numpy())
+
+    chief_epoch = all_workers_sum(epoch if chief else 0.0)  # Broadcast of the chief's epoch
+    if all_workers_sum(epoch) != chief_epoch * strategy.num_replicas_in_sync:
+        raise RuntimeError(
+            f"worker restored epoch {int(epoch)} but the chief restored {chief_epoch} from "
+            f"'{manager.directory}': --resume needs a --checkpoint-dir shared by all workers")
+    return chief_epoch
+
+
+def build_model(name):
+    if name == 'rnn':
+        from fitness_rnn_model import create_rnn_model, compile_rnn_model
+        return compile_rnn_model(create_rnn_model())
+    from fitness_cnn_model import create_cnn_model, compile_cnn_model
+    return compile_cnn_model(create_cnn_model())
+
+
+def worker_datasets(strategy, name, path, global_batch, shuffle_buffer, seed):
+    """
+    (train, validation, test) distributed datasets, plus the CNN scaler (None
+    for the RNN). Each input pipeline reads only its worker's rows, batched
+    at the per-replica size, so one step consumes `global_batch` rows.
+    """
+    scaler = None
+    if name == 'cnn':
+        # Every worker fits the scaler on the full training split, so all agree on it
+        scaler = fit_cnn_scaler(path, CNN_SPLITS['train'])
+
+    def distributed(split):
+        def dataset_fn(input_context):
+            worker = (input_context.input_pipeline_id, input_context.num_input_pipelines)
+            batch_size = input_context.get_per_replica_batch_size(global_batch)
+            buffer = shuffle_buffer if split == 'train' else 0
+            if name == 'rnn':
+                return rnn_dataset(path, RNN_SPLITS[split], batch_size, buffer, seed, worker=worker)
+            return cnn_dataset(path, CNN_SPLITS[split], scaler, batch_size, buffer, seed, worker=worker)
+
+        return strategy.distribute_datasets_from_function(dataset_fn)
+
+    return distributed('train'), distributed('validation'), distributed('test'), scaler
+
+
+def run_worker(args):
+    """
+    One worker of the cluster in TF_CONFIG. The chief prints progress, keeps
+    checkpoints, optionally saves the model and writes its timings to
+    `args.result`.
+    """
+    import tensorflow as tf
+    from training_modes import training_clock
+
+    if args.threads_per_worker:
+        tf.config.threading.set_intra_op_parallelism_threads(args.threads_per_worker)
+        tf.config.threading.set_inter_op_parallelism_threads(args.threads_per_worker)
+
+    # The strategy has to exist before any other TensorFlow op runs
+    strategy = tf.distribute.MultiWorkerMirroredStrategy()
+    index, workers = worker_task()
+    chief = index == 0
+    tf.keras.utils.set_random_seed(args.seed)
+
+    splits = RNN_SPLITS if args.model == 'rnn' else CNN_SPLITS
+    # --batch-size rows per replica (one per CPU worker) each step
+    global_batch = args.batch_size * strategy.num_replicas_in_sync
+    steps = {split: max(1, count_rows(args.dataset, splits[split]) // global_batch) for split in splits}
+    train, validation, test, scaler = worker_datasets(
+        strategy, args.model, args.dataset, global_batch, args.shuffle_buffer, args.seed)
+
+    with strategy.scope():
+        model = build_model(args.model)
+    manager, epoch_variable = training_checkpoint(model, args.checkpoint_dir)
+    initial_epoch = restore_latest(strategy, manager, epoch_variable, chief) if args.resume else 0
+
+    if chief:
+        print("=" * 60)
+        print(f"TRAINING {args.model.upper()} ON {workers} WORKER(S)")
+        print("=" * 60)
+        print(f"Batch size: {args.batch_size} per worker, {global_batch} global "
+              f"({steps['train']:,} steps/epoch)")
+        if initial_epoch:
+            print(f"Resuming from epoch {initial_epoch} ('{args.checkpoint_dir}/')")
+
+    clock_callback, clock = training_clock()
+    start = time.perf_counter()
+    model.fit(
+        train,
+        validation_data=validation,
+        epochs=args.epochs,
+        initial_epoch=initial_epoch,
+        steps_per_epoch=steps['train'],
+        validation_steps=steps['validation'],
+        callbacks=[clock_callback, checkpoint_callback(manager, epoch_variable, chief)],
+        verbose=2 if chief else 0
+    )
+    total_seconds = time.perf_counter() - start
+    test_loss, test_accuracy = model.evaluate(test, steps=steps['test'], verbose=0)
+
+    if not chief:
+        return
+
+    print(f"Test Accuracy: {test_accuracy * 100:.2f}%")
+    if args.save:
+        from fitness_rnn_model import MODEL_PATH as RNN_MODEL_PATH
+        from fitness_cnn_model import MODEL_PATH as CNN_MODEL_PATH, save_scaler
+
+        model_path = RNN_MODEL_PATH if args.model == 'rnn' else CNN_MODEL_PATH
+        model.save(model_path)
+        if scaler is not None:
+            save_scaler(scaler)
+        print(f"💾 Model saved to {model_path}")
+
+    if args.result:
+        seconds = clock['epoch_seconds']
+        steady = seconds[1:] or seconds
+        epoch_seconds = float(np.mean(steady))
+        # Rows all workers together consume per epoch: every step takes global_batch
+        rows_per_epoch = steps['train'] * global_batch
+        result = {
+            'model': args.model,
+            'workers': workers,
+            'batch_size': args.batch_size,
+            'global_batch_size': global_batch,
+            'steps_per_epoch': steps['train'],
+            'rows_per_epoch': rows_per_epoch,
+            'epochs': len(seconds),
+            'first_epoch_seconds': seconds[0],
+            'epoch_seconds': epoch_seconds,
+            'samples_per_sec': rows_per_epoch / epoch_seconds,
+            'total_seconds': total_seconds,
+            'test_accuracy': float(test_accuracy),
+            'test_loss': float(test_loss),
+        }
+        with open(args.result, 'w') as f:
+            json.dump(result, f, indent=2)
+
+
+def worker_command(args, result=None):
+    """Command line of one local worker, forwarding the training options"""
+    command = [
+        sys.executable, os.path.abspath(__file__), '--worker',
+        '--model', args.model, '--dataset', args.dataset, '--epochs', str(args.epochs),
+        '--batch-size', str(args.batch_size), '--shuffle-buffer', str(args.shuffle_buffer),
+        '--checkpoint-dir', args.checkpoint_dir, '--seed', str(args.seed),
+    ]
+    if args.threads_per_worker:
+        command += ['--threads-per-worker', str(args.threads_per_worker)]
+    if args.resume:
+        command.append('--resume')
+    if args.save:
+        command.append('--save')
+    if result:
+        command += ['--result', result]
+    return command
+
+
+def launch_local(args, workers, result=None):
+    """Run `workers` local worker processes to completion; raises if any of them fails"""
+    cluster = local_cluster(workers)
+    processes = []
+    for index in range(workers):
+        env = dict(os.environ, TF_CONFIG=tf_config(cluster, index))
+        processes.append(subprocess.Popen(worker_command(args, result), env=env))
+
+    # Poll instead of waiting in order: a failed worker leaves the others blocked in a collective
+    failed = []
+    try:
+        while not failed and any(process.poll() is None for process in processes):
+            failed = [index for index, process in enumerate(processes) if process.poll() not in (None, 0)]
+            time.sleep(0.5)
+        failed = failed or [index for index, process in enumerate(processes) if process.returncode != 0]
+    finally:
+        for process in processes:
+            if process.poll() is None:
+                process.terminate()
+                process.wait()
+    if failed:
+        raise RuntimeError(f"worker {failed[0]} exited with an error")
+
+
+def scaling_report(args, worker_counts):
+    """Train once per worker count and report throughput, speed-up and efficiency against the first count"""
+    results = []
+    for workers in worker_counts:
+        # Fresh checkpoints per run, so no run resumes from the previous one
+        args.checkpoint_dir = os.path.join(args.base_checkpoint_dir, f'{workers}-workers')
+        shutil.rmtree(args.checkpoint_dir, ignore_errors=True)
+        with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as f:
+            result_path = f.name
+        try:
+            print(f"\n⏱️  {args.model} on {workers} worker(s)...")
+            launch_local(args, workers, result_path)
+            with open(result_path) as f:
+                results.append(json.load(f))
+        finally:
+            os.remove(result_path)
+
+    base = results[0]
+    for result in results:
+        speedup = result['samples_per_sec'] / base['samples_per_sec']
+        result['speedup'] = speedup
+        result['efficiency'] = speedup / (result['workers'] / base['workers'])
+
+    print("\n" + "=" * 60)
+    print(f"SCALING REPORT ({args.model.upper()}, batch {args.batch_size} per worker, {os.cpu_count()} cores)")
+    print("=" * 60)
+    print(f"{'workers':>8}{'1st ep s':>10}{'epoch s':>9}{'samples/s':>11}{'speed-up':>10}{'eff.':>7}{'acc':>7}")
+    for r in results:
+        print(f"{r['workers']:>8}{r['first_epoch_seconds']:>10.2f}{r['epoch_seconds']:>9.2f}"
+              f"{r['samples_per_sec']:>11,.0f}{r['speedup']:>9.2f}x{r['efficiency']:>7.0%}{r['test_accuracy']:>7.1%}")
+
+    with open(args.report, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Report saved to {args.report}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Multi-worker data-parallel training on CPU')
+    parser.add_argument('--model', choices=list(MODELS), default='rnn')
+    parser.add_argument('--dataset', help='columnar dataset directory (default: the model\'s generate_datasets.py output)')
+    parser.add_argument('--epochs', type=int, default=5)
+    parser.add_argument('--batch-size', type=int, help='per worker (default: 64 for the RNN, 16 for the CNN)')
+    parser.add_argument('--shuffle-buffer', type=int, default=DEFAULT_SHUFFLE_BUFFER, help='rows per worker')
+    parser.add_argument('--checkpoint-dir', help='chief checkpoints, shared by all workers for --resume '
+                                                 '(default: <model>_checkpoints)')
+    parser.add_argument('--resume', action='store_true', help='continue from the chief\'s latest checkpoint')
+    parser.add_argument('--save', action='store_true', help='chief saves the trained model like the train_*_model.py scripts')
+    parser.add_argument('--threads-per-worker', type=int, help='TensorFlow threads per worker (default: cores / workers locally)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=2, help='local worker processes to launch')
+    parser.add_argument('--scaling', type=int, nargs='+', metavar='WORKERS', help='scaling report over these worker counts')
+    parser.add_argument('--report', default=REPORT_PATH)
+    parser.add_argument('--worker', action='store_true', help='run as one worker of the TF_CONFIG cluster')
+    parser.add_argument('--result', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    default_dataset, default_batch_size, default_checkpoint_dir = MODELS[args.model]
+    args.dataset = args.dataset or default_dataset
+    args.batch_size = args.batch_size or default_batch_size
+    args.checkpoint_dir = args.checkpoint_dir or default_checkpoint_dir
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    if args.scaling:
+        if args.resume or args.save:
+            parser.error('--scaling runs from scratch and saves nothing; drop --resume/--save')
+        args.base_checkpoint_dir = args.checkpoint_dir
+        if not args.threads_per_worker:
+            # Same threads per worker at every count, so runs differ only in the number of workers
+            args.threads_per_worker = max(1, os.cpu_count() // max(args.scaling))
+        scaling_report(args, args.scaling)
+        return
+
+    if not args.threads_per_worker:
+        args.threads_per_worker = max(1, os.cpu_count() // args.workers)
+    launch_local(args, args.workers)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+"""
+Export the fitness models to TFLite and compare them with Keras
+Converts fitness_rnn_model.h5 and fitness_cnn_model.h5 to TFLite flatbuffers,
+checks numerical equivalence on held-out rows of the training datasets and
+reports CPU latency and memory for both runtimes.
+
+Usage:
+    python export_tflite.py                 # convert + compare
+    python export_tflite.py --skip-compare  # convert only
+
+Serve the RNN with it via MODEL_BACKEND=tflite python model_api.py
+"""
+
+import argparse
+import json
+import os
+import pickle
+import resource
+import subprocess
+import sys
+import time
+import numpy as np
+
+from numpy_inference import load_rnn_holdout
+from columnar_dataset import CNN_DATASET_DIR, load_dataset, cnn_profile_rows
+from tflite_inference import TFLiteModel, RNN_TFLITE_PATH, CNN_TFLITE_PATH
+# The training modules own the model paths
+from fitness_rnn_model import MODEL_PATH as RNN_MODEL_PATH
+from fitness_cnn_model import MODEL_PATH as CNN_MODEL_PATH, SCALER_PATH as CNN_SCALER_PATH
+
+CNN_DATASET_PATH = CNN_DATASET_DIR
+
+RNN_INPUT_NAMES = ['sequence_input', 'features_input']
+RNN_INPUT_SHAPES = [(1, 6), (1, 3)]
+
+
+def convert_to_tflite(keras_model, optimizations=None, representative_dataset=None,
+                      supported_types=None, supported_ops=None,
+                      inference_input_type=None, inference_output_type=None, input_shapes=None):
+    """
+    Convert a Keras model to TFLite flatbuffer bytes. With `input_shapes`
+    the model is traced at those fixed shapes first: the LSTM only lowers to
+    TFLite ops with a static batch size (TFLiteModel resizes at run time).
+    """
+    import tensorflow as tf
+
+    if input_shapes:
+        specs = [tf.TensorSpec(shape, tf.float32, name=name)
+                 for shape, name in zip(input_shapes, keras_model.input_names)]
+        function = tf.function(lambda *inputs: keras_model(list(inputs))).get_concrete_function(*specs)
+        # With the model as trackable object the LSTM becomes one fused TFLite
+        # op, but that conversion hangs for float16 on TF 2.15; float16 builds
+        # keep the (slower) WHILE loop instead
+        float16 = bool(supported_types) and tf.float16 in supported_types
+        converter = tf.lite.TFLiteConverter.from_concrete_functions([function], None if float16 else keras_model)
+    else:
+        converter = tf.lite.TFLiteConverter.from_keras_model(keras_model)
+    if optimizations:
+        converter.optimizations = optimizations
+    if representative_dataset is not None:
+        converter.representative_dataset = representative_dataset
+    if supported_types:
+        converter.target_spec.supported_types = supported_types
+    if supported_ops:
+        converter.target_spec.supported_ops = supported_ops
+    if inference_input_type is not None:
+        converter.inference_input_type = inference_input_type
+    if inference_output_type is not None:
+        converter.inference_output_type = inference_output_type
+    return converter.convert()
+
+
+def save_flatbuffer(flatbuffer, path):
+    with open(path, 'wb') as f:
+        f.write(flatbuffer)
+    print(f"✅ Saved '{path}' ({len(flatbuffer) / 1024:.1f} KB)")
+
+
+def load_cnn_holdout(path=CNN_DATASET_PATH, scaler_path=CNN_SCALER_PATH, rows=500):
+    """Last `rows` samples of the CNN dataset as scaled (n, 5, 1, 1) inputs and labels"""
+    features, labels = cnn_profile_rows(load_dataset(path), slice(-rows, None))
+
+    with open(scaler_path, 'rb') as f:
+        scaler = pickle.load(f)
+    return scaler.transform(features).reshape(-1, 5, 1, 1).astype(np.float32), labels
+
+
+def compare_outputs(expected, actual, labels=None):
+    """Max abs difference, argmax agreement and (optionally) accuracy of both"""
+    result = {
+        'max_abs_diff': float(np.max(np.abs(expected - actual))),
+        'argmax_agreement': float(np.mean(np.argmax(expected, -1) == np.argmax(actual, -1))),
+    }
+    if labels is not None:
+        result['reference_accuracy'] = float(np.mean(np.argmax(expected, -1) == labels))
+        result['candidate_accuracy'] = float(np.mean(np.argmax(actual, -1) == labels))
+    return result
+
+
+def time_predict(predict, inputs, repeats=200):
+    """Median milliseconds per predict() call after one warm-up call"""
+    predict(inputs)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predict(inputs)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def measure_memory(runtime, model_path):
+    """Peak RSS (MB) of a fresh process that loads `model_path` and predicts once"""
+    output = subprocess.run(
+        [sys.executable, __file__, '--memory-probe', runtime, model_path],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])['peak_rss_mb']
+
+
+def memory_probe(runtime, model_path):
+    """Entry point of the subprocess started by measure_memory()"""
+    if runtime == 'keras':
+        from tensorflow import keras
+        model = keras.models.load_model(model_path)
+        predict = lambda inputs: model.predict(inputs, verbose=0)
+    else:
+        model = TFLiteModel(model_path, input_names=RNN_INPUT_NAMES if 'rnn' in model_path else None)
+        predict = model.predict
+
+    if 'rnn' in model_path:
+        predict([np.zeros((1, 6), dtype=np.float32), np.zeros((1, 3), dtype=np.float32)])
+    else:
+        predict(np.zeros((1, 5, 1, 1), dtype=np.float32))
+
+    # ru_maxrss is in KB on Linux
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({'peak_rss_mb': round(peak_mb, 1)}))
+
+
+def compare_model(name, keras_model, tflite_model, inputs, labels, keras_path, tflite_path):
+    """Print equivalence, latency and memory of Keras vs TFLite for one model"""
+    expected = keras_model.predict(inputs, verbose=0)
+    actual = tflite_model.predict(inputs)
+    result = compare_outputs(expected, actual, labels)
+
+    single = [x[:1] for x in inputs] if isinstance(inputs, list) else inputs[:1]
+    batch = [x[:64] for x in inputs] if isinstance(inputs, list) else inputs[:64]
+
+    print(f"\n{name}")
+    print(f"  Max abs difference: {result['max_abs_diff']:.2e}")
+    print(f"  Argmax agreement:   {result['argmax_agreement'] * 100:.2f}%")
+    if labels is not None:
+        print(f"  Accuracy:           Keras {result['reference_accuracy'] * 100:.2f}% | "
+              f"TFLite {result['candidate_accuracy'] * 100:.2f}%")
+    for label, x in (('batch=1', single), ('batch=64', batch)):
+        keras_ms = time_predict(lambda v: keras_model.predict(v, verbose=0), x)
+        tflite_ms = time_predict(tflite_model.predict, x)
+        print(f"  Latency {label:<9} Keras {keras_ms:.3f} ms | TFLite {tflite_ms:.3f} ms "
+              f"({keras_ms / tflite_ms:.1f}x)")
+    print(f"  Peak RSS:           Keras {measure_memory('keras', keras_path):.1f} MB | "
+          f"TFLite {measure_memory('tflite', tflite_path):.1f} MB")
+    print(f"  File size:          Keras {os.path.getsize(keras_path) / 1024:.1f} KB | "
+          f"TFLite {os.path.getsize(tflite_path) / 1024:.1f} KB")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the fitness models to TFLite')
+    parser.add_argument('--skip-compare', action='store_true', help='convert without the Keras comparison')
+    parser.add_argument('--holdout-rows', type=int, default=500)
+    parser.add_argument('--memory-probe', nargs=2, metavar=('RUNTIME', 'MODEL_PATH'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.memory_probe:
+        memory_probe(*args.memory_probe)
+        return
+
+    from tensorflow import keras
+
+    print("=" * 60)
+    print("EXPORTING MODELS TO TFLITE")
+    print("=" * 60)
+
+    rnn_model = keras.models.load_model(RNN_MODEL_PATH)
+    cnn_model = keras.models.load_model(CNN_MODEL_PATH)
+    save_flatbuffer(convert_to_tflite(rnn_model, input_shapes=RNN_INPUT_SHAPES), RNN_TFLITE_PATH)
+    save_flatbuffer(convert_to_tflite(cnn_model), CNN_TFLITE_PATH)
+
+    if args.skip_compare:
+        return
+
+    print("\n" + "=" * 60)
+    print("KERAS VS TFLITE (CPU)")
+    print("=" * 60)
+
+    seq_input, feat_input = load_rnn_holdout(rows=args.holdout_rows)
+    rnn_result = compare_model(
+        'RNN (rnn_training_dataset hold-out)',
+        rnn_model, TFLiteModel(RNN_TFLITE_PATH, input_names=RNN_INPUT_NAMES),
+        [seq_input.astype(np.float32), feat_input], None,
+        RNN_MODEL_PATH, RNN_TFLITE_PATH
+    )
+
+    cnn_inputs, cnn_labels = load_cnn_holdout(rows=args.holdout_rows)
+    cnn_result = compare_model(
+        'CNN (cnn_training_dataset hold-out)',
+        cnn_model, TFLiteModel(CNN_TFLITE_PATH),
+        cnn_inputs, cnn_labels,
+        CNN_MODEL_PATH, CNN_TFLITE_PATH
+    )
+
+    for name, result in (('RNN', rnn_result), ('CNN', cnn_result)):
+        if result['max_abs_diff'] > 1e-4:
+            raise SystemExit(f"❌ {name} TFLite output differs from Keras by {result['max_abs_diff']:.2e}")
+    print("\n✅ TFLite models match Keras within 1e-4")
+
+
+if __name__ == '__main__':
+    main()
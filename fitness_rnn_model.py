@@ -1,19 +1,18 @@
 """
 Fitness Plan Generator - RNN Model
 Recurrent Neural Network for sequential fitness plan generation
+
+Importing this module is cheap: TensorFlow and scikit-learn are only
+imported by the functions that need them. Train with train_rnn_model.py.
 """
 
 import numpy as np
-import tensorflow as tf
-from tensorflow import keras
-from tensorflow.keras import layers, models
-from tensorflow.keras.preprocessing.sequence import pad_sequences
-from sklearn.model_selection import train_test_split
-import json
 
-# Generate synthetic sequential training data
-# Each sequence represents a week of workouts
-np.random.seed(42)
+from columnar_dataset import RNN_DATASET_DIR, load_dataset, rnn_columns_from_inputs, rnn_model_inputs
+
+MODEL_PATH = 'fitness_rnn_model.h5'
+DECODER_PATH = 'fitness_rnn_decoder'
+STEPWISE_MODEL_PATH = 'fitness_rnn_stepwise.h5'
 
 # Workout types encoded as numbers
 workout_types = {
@@ -25,12 +24,14 @@ workout_types = {
     'swimming': 5,
     'cycling': 6
 }
+workout_names = ['Rest', 'Cardio', 'Strength', 'HIIT', 'Yoga', 'Swimming', 'Cycling']
+days_of_week = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
 
 # Generate training sequences
 def generate_workout_sequence(level, goal):
     """Generate a weekly workout sequence"""
     sequence = []
-    
+
     if level == 0:  # Beginner
         if goal == 0:  # Weight loss
             sequence = [1, 0, 2, 0, 1, 0, 4]  # Cardio, rest, strength, rest, cardio, rest, yoga
@@ -52,197 +53,287 @@ def generate_workout_sequence(level, goal):
             sequence = [2, 2, 2, 2, 2, 2, 0]
         else:  # Fitness
             sequence = [3, 2, 3, 2, 3, 5, 2]
-    
+
     return sequence
 
+def user_features(age, level, goal):
+    """Normalized [age, level, goal] row fed to the model"""
+    return [age / 100.0, level / 2.0, goal / 2.0]
+
 # Create training data
-training_sequences = []
-training_labels = []
-user_features = []
-
-for _ in range(2000):
-    level = np.random.randint(0, 3)
-    goal = np.random.randint(0, 3)
-    age = np.random.randint(18, 65)
-    
-    # Generate sequence
-    sequence = generate_workout_sequence(level, goal)
-    
-    # Add some randomness
-    for i in range(len(sequence)):
-        if np.random.random() < 0.1:  # 10% chance to modify
-            sequence[i] = np.random.randint(0, 7)
-    
-    # Use first 6 days to predict 7th day
-    training_sequences.append(sequence[:6])
-    training_labels.append(sequence[6])
-    user_features.append([age / 100.0, level / 2.0, goal / 2.0])  # Normalized
-
-# Convert to numpy arrays
-X_seq = np.array(training_sequences)
-X_features = np.array(user_features)
-y = np.array(training_labels)
-
-# Split data
-X_seq_train, X_seq_test, X_feat_train, X_feat_test, y_train, y_test = train_test_split(
-    X_seq, X_features, y, test_size=0.2, random_state=42
-)
+def split_training_data(seq_input, feat_input, labels, seed=42, test_size=0.2):
+    """Returns (X_seq_train, X_seq_test, X_feat_train, X_feat_test, y_train, y_test)"""
+    from sklearn.model_selection import train_test_split
+
+    return train_test_split(seq_input, feat_input, labels, test_size=test_size, random_state=seed)
+
+def generate_training_data(samples=2000, seed=42, test_size=0.2):
+    """Synthetic weeks with 10% of days randomized; the first 6 days predict the 7th"""
+    from synthetic_data import generate_rnn_chunk
+
+    weeks = generate_rnn_chunk(np.random.default_rng(seed), samples, age_range=(18, 65))
+    return split_training_data(*rnn_model_inputs(weeks), seed=seed, test_size=test_size)
+
+def load_training_data(path=RNN_DATASET_DIR, seed=42, test_size=0.2):
+    """The columnar dataset written by generate_datasets.py, split like generate_training_data()"""
+    return split_training_data(*rnn_model_inputs(load_dataset(path)), seed=seed, test_size=test_size)
+
+def compact_training_rows(seq_input, feat_input, labels, age_bucket=None):
+    """
+    Duplicate rows collapsed into unique ones (see dataset_compaction.py).
+
+    Returns (seq_input, feat_input, labels, sample_weight); with `age_bucket`
+    ages are first mapped to the centre of their bucket.
+    """
+    from dataset_compaction import compact_rnn_columns
+
+    columns, _ = compact_rnn_columns(rnn_columns_from_inputs(seq_input, feat_input, labels), age_bucket)
+    return (*rnn_model_inputs(columns), columns['count'].astype(np.float32))
 
 # Build RNN Model with LSTM
 def create_rnn_model():
+    from tensorflow.keras import layers, models
+
     # Sequence input
     sequence_input = layers.Input(shape=(6,), name='sequence_input')
-    
+
     # Embedding layer
     embedded = layers.Embedding(input_dim=7, output_dim=16)(sequence_input)
-    
+
     # LSTM layers
     lstm_out = layers.LSTM(64, return_sequences=True)(embedded)
     lstm_out = layers.Dropout(0.3)(lstm_out)
     lstm_out = layers.LSTM(32, return_sequences=True)(lstm_out)
     lstm_out = layers.Dropout(0.3)(lstm_out)
     lstm_out = layers.LSTM(16)(lstm_out)
-    
+
     # User features input
     features_input = layers.Input(shape=(3,), name='features_input')
     features_dense = layers.Dense(32, activation='relu')(features_input)
     features_dense = layers.Dropout(0.2)(features_dense)
-    
+
     # Concatenate LSTM output with user features
     combined = layers.concatenate([lstm_out, features_dense])
-    
+
     # Dense layers
     dense = layers.Dense(64, activation='relu')(combined)
     dense = layers.Dropout(0.3)(dense)
     dense = layers.Dense(32, activation='relu')(dense)
-    
-    # Output layer (7 workout types)
-    output = layers.Dense(7, activation='softmax', name='output')(dense)
-    
+
+    # Output layer (7 workout types), float32 even under a mixed-precision policy
+    output = layers.Dense(7, activation='softmax', name='output', dtype='float32')(dense)
+
     # Create model
     model = models.Model(
         inputs=[sequence_input, features_input],
         outputs=output
     )
-    
+
+    return model
+
+def compile_rnn_model(model, jit_compile=False):
+    model.compile(
+        optimizer='adam',
+        loss='sparse_categorical_crossentropy',
+        metrics=['accuracy'],
+        jit_compile=jit_compile
+    )
     return model
 
-# Create and compile model
-model = create_rnn_model()
-model.compile(
-    optimizer='adam',
-    loss='sparse_categorical_crossentropy',
-    metrics=['accuracy']
-)
-
-# Model summary
-print("=" * 60)
-print("FITNESS PLAN RNN MODEL ARCHITECTURE")
-print("=" * 60)
-model.summary()
-
-# Train the model
-print("\n" + "=" * 60)
-print("TRAINING RNN MODEL")
-print("=" * 60)
-
-history = model.fit(
-    [X_seq_train, X_feat_train],
-    y_train,
-    epochs=100,
-    batch_size=64,
-    validation_split=0.2,
-    verbose=1
-)
-
-# Evaluate model
-print("\n" + "=" * 60)
-print("MODEL EVALUATION")
-print("=" * 60)
-test_loss, test_accuracy = model.evaluate(
-    [X_seq_test, X_feat_test],
-    y_test,
-    verbose=0
-)
-print(f"Test Accuracy: {test_accuracy * 100:.2f}%")
-print(f"Test Loss: {test_loss:.4f}")
-
-# Save model
-model.save('fitness_rnn_model.h5')
-print("\n✅ Model saved as 'fitness_rnn_model.h5'")
+def load_rnn_model(path=MODEL_PATH):
+    """The trained Keras model saved by train_rnn_model.py"""
+    from tensorflow import keras
+    return keras.models.load_model(path)
+
+# Serving signature: decode a whole week in one graph call
+def build_week_decoder(model, days=7, window=6):
+    """
+    Wrap a trained model in a tf.Module whose `decode_week` runs the full
+    autoregressive loop (days 3-7) inside one compiled graph.
+
+    The window fed to the model each day matches the API loop: the last
+    `window` days, right-padded with zeros (Rest) while the week is shorter.
+
+    Returns a module with:
+        decode_week(seed, features) -> {'week': int32 [batch, days],
+                                         'confidence': float32 [batch, days]}
+    Seed days are given a confidence of 1.0.
+    """
+    import tensorflow as tf
+
+    class WeekDecoder(tf.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        @tf.function(input_signature=[
+            tf.TensorSpec(shape=[None, 2], dtype=tf.int32, name='seed'),
+            tf.TensorSpec(shape=[None, 3], dtype=tf.float32, name='features'),
+        ])
+        def decode_week(self, seed, features):
+            batch = tf.shape(seed)[0]
+            seed_len = seed.shape[1]
+            days_so_far = [seed[:, i] for i in range(seed_len)]
+            confidences = [tf.ones([batch], dtype=tf.float32)] * seed_len
+
+            # Unrolled at trace time: the loop length is static
+            for day in range(seed_len, days):
+                if day >= window:
+                    past = days_so_far[day - window:day]
+                else:
+                    past = days_so_far + [tf.zeros([batch], dtype=tf.int32)] * (window - day)
+                seq_input = tf.cast(tf.stack(past, axis=1), tf.float32)
+
+                prediction = self.model([seq_input, features], training=False)
+                days_so_far.append(tf.argmax(prediction, axis=-1, output_type=tf.int32))
+                confidences.append(tf.reduce_max(prediction, axis=-1))
+
+            return {
+                'week': tf.stack(days_so_far, axis=1),
+                'confidence': tf.stack(confidences, axis=1)
+            }
+
+    return WeekDecoder(model)
+
+def export_week_decoder(model, path=DECODER_PATH):
+    """Save build_week_decoder(model) as the SavedModel model_api.py loads"""
+    import tensorflow as tf
+
+    week_decoder = build_week_decoder(model)
+    tf.saved_model.save(
+        week_decoder,
+        path,
+        signatures={'serving_default': week_decoder.decode_week}
+    )
+    return week_decoder
+
+# Step-wise variant: one token per step, (h, c) carried between days
+STEPWISE_LSTM_UNITS = [64, 32, 16]
+
+def create_stepwise_training_model(timesteps=6):
+    """
+    Teacher-forced training model: reads days 1..6 and predicts days 2..7,
+    one prediction per position. Layer names match create_stepwise_decoder()
+    so its weights can be copied into the step model.
+    """
+    from tensorflow.keras import layers, models
+
+    sequence_input = layers.Input(shape=(timesteps,), name='sequence_input')
+    features_input = layers.Input(shape=(3,), name='features_input')
+
+    x = layers.Embedding(input_dim=7, output_dim=16, name='embedding')(sequence_input)
+    for i, units in enumerate(STEPWISE_LSTM_UNITS):
+        x = layers.LSTM(units, return_sequences=True, name=f'lstm_{i + 1}')(x)
+        if i < len(STEPWISE_LSTM_UNITS) - 1:
+            x = layers.Dropout(0.3)(x)
+
+    features_dense = layers.Dense(32, activation='relu', name='features_dense')(features_input)
+    features_dense = layers.Dropout(0.2)(features_dense)
+    features_dense = layers.RepeatVector(timesteps)(features_dense)
+
+    combined = layers.concatenate([x, features_dense])
+    dense = layers.Dense(64, activation='relu', name='head_dense_1')(combined)
+    dense = layers.Dropout(0.3)(dense)
+    dense = layers.Dense(32, activation='relu', name='head_dense_2')(dense)
+    output = layers.Dense(7, activation='softmax', name='output', dtype='float32')(dense)
+
+    return models.Model(inputs=[sequence_input, features_input], outputs=output)
+
+def create_stepwise_decoder(trained_model=None):
+    """
+    Single-step model: (token, features, h/c per LSTM) -> (probs, new h/c).
+
+    Each call does O(1) work regardless of how many days came before.
+    Weights are copied from `trained_model` (create_stepwise_training_model).
+    """
+    from tensorflow.keras import layers, models
+
+    token_input = layers.Input(shape=(1,), name='token_input')
+    features_input = layers.Input(shape=(3,), name='features_input')
+    state_inputs = []
+    state_outputs = []
+
+    x = layers.Embedding(input_dim=7, output_dim=16, name='embedding')(token_input)
+    for i, units in enumerate(STEPWISE_LSTM_UNITS):
+        h_in = layers.Input(shape=(units,), name=f'lstm_{i + 1}_h')
+        c_in = layers.Input(shape=(units,), name=f'lstm_{i + 1}_c')
+        x, h, c = layers.LSTM(units, return_sequences=True, return_state=True, name=f'lstm_{i + 1}')(
+            x, initial_state=[h_in, c_in])
+        state_inputs += [h_in, c_in]
+        state_outputs += [h, c]
+
+    features_dense = layers.Dense(32, activation='relu', name='features_dense')(features_input)
+    combined = layers.concatenate([state_outputs[-2], features_dense])
+    dense = layers.Dense(64, activation='relu', name='head_dense_1')(combined)
+    dense = layers.Dense(32, activation='relu', name='head_dense_2')(dense)
+    output = layers.Dense(7, activation='softmax', name='output')(dense)
+
+    step_model = models.Model(
+        inputs=[token_input, features_input] + state_inputs,
+        outputs=[output] + state_outputs
+    )
+    if trained_model is not None:
+        for layer in step_model.layers:
+            if layer.weights:
+                layer.set_weights(trained_model.get_layer(layer.name).get_weights())
+    return step_model
+
+def decode_week_stepwise(step_model, seeds, features, days=7):
+    """Greedy weekly plans from the step model, feeding each day exactly once"""
+    seeds = np.asarray(seeds, dtype=np.float32)
+    features = np.asarray(features, dtype=np.float32)
+    batch = len(seeds)
+    states = [np.zeros((batch, units), dtype=np.float32) for units in STEPWISE_LSTM_UNITS for _ in 'hc']
+
+    week = list(seeds.T)
+    for day in range(days - 1):
+        outputs = step_model([week[day][:, None], features] + states, training=False)
+        probs, states = outputs[0].numpy(), [state.numpy() for state in outputs[1:]]
+        if day + 1 >= len(week):  # Not a seed day: take the prediction
+            week.append(np.argmax(probs, axis=-1).astype(np.float32))
+
+    return np.stack(week, axis=1).astype(np.int32)
 
 # Prediction function
-def predict_next_workout(past_week, age, level, goal):
+def predict_next_workout(model, past_week, age, level, goal):
     """
     Predict next day's workout based on past week
-    
+
     Args:
+        model: trained model (see load_rnn_model)
         past_week: List of 6 workout types (encoded as numbers)
         age: User age
         level: 0 (beginner), 1 (intermediate), 2 (advanced)
         goal: 0 (weight loss), 1 (muscle gain), 2 (fitness)
+
+    Returns:
+        (predicted workout type, confidence in percent)
     """
-    workout_names = ['Rest', 'Cardio', 'Strength', 'HIIT', 'Yoga', 'Swimming', 'Cycling']
-    
     # Prepare input
     seq_input = np.array([past_week])
-    feat_input = np.array([[age / 100.0, level / 2.0, goal / 2.0]])
-    
+    feat_input = np.array([user_features(age, level, goal)])
+
     # Predict
     prediction = model.predict([seq_input, feat_input], verbose=0)
-    predicted_class = np.argmax(prediction)
-    confidence = np.max(prediction) * 100
-    
-    print(f"\n🎯 Prediction Results:")
-    print(f"   Past Week: {[workout_names[i] for i in past_week]}")
-    print(f"   Next Workout: {workout_names[predicted_class]}")
-    print(f"   Confidence: {confidence:.2f}%")
-    
+    predicted_class = int(np.argmax(prediction))
+    confidence = float(np.max(prediction) * 100)
+
     return predicted_class, confidence
 
 # Generate complete week prediction
-def generate_weekly_plan(age, level, goal):
-    """Generate a complete weekly workout plan"""
-    workout_names = ['Rest', 'Cardio', 'Strength', 'HIIT', 'Yoga', 'Swimming', 'Cycling']
-    
+def generate_weekly_plan(model, age, level, goal):
+    """Generate a complete weekly workout plan as a list of 7 workout types"""
     # Start with initial pattern
     week = generate_workout_sequence(level, goal)[:2]  # First 2 days
-    
+
     # Predict remaining days
     for day in range(5):  # Predict days 3-7
         if len(week) >= 6:
             past_week = week[-6:]
         else:
             past_week = week + [0] * (6 - len(week))
-        
-        seq_input = np.array([past_week])
-        feat_input = np.array([[age / 100.0, level / 2.0, goal / 2.0]])
-        
-        prediction = model.predict([seq_input, feat_input], verbose=0)
-        next_workout = np.argmax(prediction)
+
+        next_workout, _ = predict_next_workout(model, past_week, age, level, goal)
         week.append(next_workout)
-    
-    print(f"\n📅 Weekly Workout Plan:")
-    days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    for i, (day, workout) in enumerate(zip(days, week)):
-        print(f"   {day}: {workout_names[workout]}")
-    
-    return week
 
-# Test predictions
-print("\n" + "=" * 60)
-print("SAMPLE PREDICTION - Next Workout")
-print("=" * 60)
-print("Input: Past week=[Cardio, Rest, Strength, Rest, Cardio, Rest]")
-print("       Age=30, Level=Intermediate, Goal=Weight Loss")
-predict_next_workout([1, 0, 2, 0, 1, 0], 30, 1, 0)
-
-print("\n" + "=" * 60)
-print("SAMPLE PREDICTION - Full Week Plan")
-print("=" * 60)
-print("Input: Age=25, Level=Beginner, Goal=Muscle Gain")
-generate_weekly_plan(25, 0, 1)
-
-print("\n" + "=" * 60)
-print("TRAINING COMPLETE!")
-print("=" * 60)
+    return week
@@ -1,279 +1,340 @@
 """
-Generate and Save Training Datasets as CSV Files
+Generate and Save Training Datasets
 Creates comprehensive datasets for both CNN and RNN models
+
+Rows are generated by the vectorized generators in synthetic_data.py and
+written one chunk at a time, so memory stays bounded by --chunk-size no matter
+how many rows are requested. Datasets are written in the columnar format of
+columnar_dataset.py (rnn_training_dataset/, cnn_training_dataset/); --csv
+also exports the wide CSVs.
+
+Usage:
+    python generate_datasets.py
+    python generate_datasets.py --csv
+    python generate_datasets.py --rnn-rows 50000000 --shards 16   # shard-NNNNN/ subdirectories, one process per core
+    python generate_datasets.py --from-csv   # convert existing CSVs to the columnar format
+    python generate_datasets.py --rnn-rows 20000000 --chunk-size 1000000
+    python generate_datasets.py --benchmark --rnn-rows 10000000   # rows/sec only, nothing written
 """
+import argparse
+import os
 import numpy as np
 import pandas as pd
 from datetime import datetime
 import json
 
-print("="*80)
-print("GENERATING COMPREHENSIVE DATASETS FOR CNN AND RNN MODELS")
-print("="*80)
-
-np.random.seed(42)
-
-# ============================================================================
-# GENERATE CNN DATASET
-# ============================================================================
-print("\n[1/4] Generating CNN Training Dataset...")
-
-# Define categories
-fitness_levels = ['Beginner', 'Intermediate', 'Advanced']
-goals = ['Weight Loss', 'Muscle Gain', 'General Fitness']
-
-cnn_data = []
-
-# Generate samples
-for _ in range(5000):  # Generate 5000 samples
-    # Random user profile
-    age = np.random.randint(18, 65)
-    weight = np.random.uniform(45, 120)  # kg
-    height = np.random.uniform(150, 200)  # cm
-    fitness_level = np.random.randint(0, 3)
-    goal = np.random.randint(0, 3)
-    
-    # Calculate BMI
-    bmi = weight / ((height/100) ** 2)
-    
-    # Determine category (0-8)
-    category = fitness_level * 3 + goal
-    
-    # Category label
-    category_label = f"{fitness_levels[fitness_level]} - {goals[goal]}"
-    
-    cnn_data.append({
-        'age': age,
-        'weight': round(weight, 2),
-        'height': round(height, 2),
-        'bmi': round(bmi, 2),
-        'fitness_level': fitness_level,
-        'fitness_level_name': fitness_levels[fitness_level],
-        'goal': goal,
-        'goal_name': goals[goal],
-        'category': category,
-        'category_label': category_label
-    })
-
-cnn_df = pd.DataFrame(cnn_data)
-cnn_df.to_csv('cnn_training_dataset.csv', index=False)
-print(f"✓ Saved: cnn_training_dataset.csv ({len(cnn_df)} samples)")
-
-# Save summary
-cnn_summary = {
-    'dataset_name': 'CNN Fitness Classification Dataset',
-    'total_samples': len(cnn_df),
-    'features': ['age', 'weight', 'height', 'bmi', 'fitness_level', 'goal'],
-    'target': 'category (0-8)',
-    'classes': 9,
-    'class_distribution': cnn_df['category_label'].value_counts().to_dict()
+from columnar_dataset import (
+    CNN_COLUMNS, CNN_DATASET_DIR, RNN_COLUMNS, RNN_DATASET_DIR, ColumnarWriter, csv_chunks, dataset_bytes
+)
+from sharded_generation import KINDS, generate_sharded, shard_sample
+from synthetic_data import (
+    DEFAULT_CHUNK_SIZE, RowRate, fitness_levels, goals, workout_names,
+    generate_cnn_chunk, generate_rnn_chunk, iter_chunks
+)
+
+parser = argparse.ArgumentParser(description='Generate the CNN and RNN training datasets')
+parser.add_argument('--cnn-rows', type=int, default=5000)
+parser.add_argument('--rnn-rows', type=int, default=10000)
+parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='rows held in memory at once')
+parser.add_argument('--seed', type=int, default=42)
+parser.add_argument('--shards', type=int, default=1,
+                    help='split each dataset into this many shards, generated in parallel with a manifest')
+parser.add_argument('--workers', type=int, help='processes for --shards (default: all cores)')
+parser.add_argument('--csv', action='store_true', help='also export cnn/rnn_training_dataset.csv')
+parser.add_argument('--from-csv', action='store_true', help='convert the existing CSVs instead of generating')
+parser.add_argument('--benchmark', action='store_true', help='only report generation rows/sec')
+
+workout_names = np.array(workout_names)
+fitness_levels = np.array(fitness_levels)
+goals = np.array(goals)
+category_labels = [f"{level} - {goal}" for level in fitness_levels for goal in goals]
+
+# Code -> name tables stored in meta.json instead of per-row name columns
+names = {
+    'fitness_level': fitness_levels.tolist(),
+    'goal': goals.tolist(),
+    'category': category_labels,
+    'workout': workout_names.tolist(),
 }
 
-print(f"\nCNN Dataset Summary:")
-print(f"  • Total Samples: {cnn_summary['total_samples']}")
-print(f"  • Features: {len(cnn_summary['features'])}")
-print(f"  • Output Classes: {cnn_summary['classes']}")
-
-# ============================================================================
-# GENERATE RNN DATASET
-# ============================================================================
-print("\n[2/4] Generating RNN Training Dataset...")
-
-workout_types = {
-    'Rest': 0,
-    'Cardio': 1,
-    'Strength': 2,
-    'HIIT': 3,
-    'Yoga': 4,
-    'Swimming': 5,
-    'Cycling': 6
-}
 
-workout_names = ['Rest', 'Cardio', 'Strength', 'HIIT', 'Yoga', 'Swimming', 'Cycling']
-
-def generate_workout_sequence(level, goal):
-    """Generate a weekly workout sequence"""
-    sequence = []
-    
-    if level == 0:  # Beginner
-        if goal == 0:  # Weight loss
-            sequence = [1, 0, 2, 0, 1, 0, 4]
-        elif goal == 1:  # Muscle gain
-            sequence = [2, 0, 2, 0, 2, 2, 0]
-        else:  # Fitness
-            sequence = [1, 2, 0, 3, 0, 1, 4]
-    elif level == 1:  # Intermediate
-        if goal == 0:
-            sequence = [3, 1, 2, 1, 3, 6, 0]
-        elif goal == 1:
-            sequence = [2, 2, 0, 2, 2, 2, 0]
-        else:
-            sequence = [2, 3, 1, 2, 3, 5, 4]
-    else:  # Advanced
-        if goal == 0:
-            sequence = [3, 3, 2, 3, 3, 6, 1]
-        elif goal == 1:
-            sequence = [2, 2, 2, 2, 2, 2, 0]
-        else:
-            sequence = [3, 2, 3, 2, 3, 5, 2]
-    
-    return sequence
-
-rnn_data = []
-
-# Generate samples
-for _ in range(10000):  # Generate 10000 samples
-    level = np.random.randint(0, 3)
-    goal = np.random.randint(0, 3)
-    age = np.random.randint(18, 65)
-    
-    # Generate base sequence
-    sequence = generate_workout_sequence(level, goal)
-    
-    # Add some randomness (10% chance to modify each workout)
-    for i in range(len(sequence)):
-        if np.random.random() < 0.1:
-            sequence[i] = np.random.randint(0, 7)
-    
-    # Create training sample (first 6 days predict 7th day)
-    rnn_data.append({
-        'age': age,
+def cnn_frame(chunk):
+    """CSV columns for a CNN chunk"""
+    level, goal = chunk['fitness_level'], chunk['goal']
+    return pd.DataFrame({
+        'age': chunk['age'],
+        'weight': np.round(chunk['weight'], 2),
+        'height': np.round(chunk['height'], 2),
+        'bmi': np.round(chunk['bmi'], 2),
         'fitness_level': level,
         'fitness_level_name': fitness_levels[level],
         'goal': goal,
         'goal_name': goals[goal],
-        'day1_workout': sequence[0],
-        'day1_workout_name': workout_names[sequence[0]],
-        'day2_workout': sequence[1],
-        'day2_workout_name': workout_names[sequence[1]],
-        'day3_workout': sequence[2],
-        'day3_workout_name': workout_names[sequence[2]],
-        'day4_workout': sequence[3],
-        'day4_workout_name': workout_names[sequence[3]],
-        'day5_workout': sequence[4],
-        'day5_workout_name': workout_names[sequence[4]],
-        'day6_workout': sequence[5],
-        'day6_workout_name': workout_names[sequence[5]],
-        'day7_workout': sequence[6],
-        'day7_workout_name': workout_names[sequence[6]],
-        'target_workout': sequence[6]
+        'category': chunk['category'],
+        'category_label': np.char.add(np.char.add(fitness_levels[level], ' - '), goals[goal])
     })
 
-rnn_df = pd.DataFrame(rnn_data)
-rnn_df.to_csv('rnn_training_dataset.csv', index=False)
-print(f"✓ Saved: rnn_training_dataset.csv ({len(rnn_df)} samples)")
-
-# Save summary
-rnn_summary = {
-    'dataset_name': 'RNN Workout Sequence Prediction Dataset',
-    'total_samples': len(rnn_df),
-    'sequence_length': 6,
-    'prediction_target': 'day 7 workout',
-    'features': ['age', 'fitness_level', 'goal', 'past_6_days_workouts'],
-    'target': 'next_workout (0-6)',
-    'classes': 7,
-    'class_distribution': rnn_df['day7_workout_name'].value_counts().to_dict()
-}
 
-print(f"\nRNN Dataset Summary:")
-print(f"  • Total Samples: {rnn_summary['total_samples']}")
-print(f"  • Sequence Length: {rnn_summary['sequence_length']} days")
-print(f"  • Output Classes: {rnn_summary['classes']}")
-
-# ============================================================================
-# CREATE SAMPLE DATASETS (First 100 rows for documentation)
-# ============================================================================
-print("\n[3/4] Creating sample datasets...")
-
-cnn_df.head(100).to_csv('cnn_dataset_sample.csv', index=False)
-print(f"✓ Saved: cnn_dataset_sample.csv (100 samples)")
-
-rnn_df.head(100).to_csv('rnn_dataset_sample.csv', index=False)
-print(f"✓ Saved: rnn_dataset_sample.csv (100 samples)")
-
-# ============================================================================
-# CREATE DATASET DOCUMENTATION
-# ============================================================================
-print("\n[4/4] Creating dataset documentation...")
-
-documentation = {
-    'project': 'Fitness Plan Generator - Deep Learning Models',
-    'created_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-    'datasets': {
-        'cnn_dataset': {
-            'filename': 'cnn_training_dataset.csv',
-            'description': 'User profile classification dataset for CNN model',
-            'total_samples': len(cnn_df),
-            'features': {
-                'age': 'User age (18-65 years)',
-                'weight': 'User weight in kg (45-120 kg)',
-                'height': 'User height in cm (150-200 cm)',
-                'bmi': 'Body Mass Index calculated from weight and height',
-                'fitness_level': 'Encoded fitness level (0=Beginner, 1=Intermediate, 2=Advanced)',
-                'fitness_level_name': 'Human-readable fitness level',
-                'goal': 'Encoded fitness goal (0=Weight Loss, 1=Muscle Gain, 2=General Fitness)',
-                'goal_name': 'Human-readable fitness goal',
-                'category': 'Target classification (0-8)',
-                'category_label': 'Human-readable category label'
+def rnn_frame(chunk):
+    """CSV columns for an RNN chunk (first 6 days predict the 7th)"""
+    level, goal, workouts = chunk['fitness_level'], chunk['goal'], chunk['workouts']
+    columns = {
+        'age': chunk['age'],
+        'fitness_level': level,
+        'fitness_level_name': fitness_levels[level],
+        'goal': goal,
+        'goal_name': goals[goal],
+    }
+    for day in range(7):
+        columns[f'day{day + 1}_workout'] = workouts[:, day]
+        columns[f'day{day + 1}_workout_name'] = workout_names[workouts[:, day]]
+    columns['target_workout'] = workouts[:, 6]
+    return pd.DataFrame(columns)
+
+
+def write_dataset(chunks, writer, to_frame, label_of, sample_path, csv_path=None):
+    """
+    Stream chunks into the columnar `writer` (and `csv_path` when exporting);
+    the first 100 rows also go to `sample_path`.
+
+    Returns (rows, class counts over label_of(chunk), generation rows/sec).
+    """
+    rate = RowRate()
+    counts = np.zeros(9, dtype=np.int64)
+    for i, chunk in enumerate(rate.wrap(chunks)):
+        writer.write(chunk)
+        if i == 0:
+            to_frame({name: column[:100] for name, column in chunk.items()}).to_csv(sample_path, index=False)
+        if csv_path:
+            to_frame(chunk).to_csv(csv_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+        counts += np.bincount(label_of(chunk), minlength=9)
+    writer.close()
+    return rate.rows, counts, rate.rows_per_sec
+
+
+def build_dataset(kind, path, rows, seed, to_frame, sample_path, csv_path=None,
+                  chunk_size=DEFAULT_CHUNK_SIZE, shards=1, workers=None):
+    """
+    Generate one dataset, over a process pool of `workers` when shards > 1.
+
+    Returns (rows, class counts, rows/sec).
+    """
+    generate, columns, label_of = KINDS[kind]
+    if shards == 1:
+        return write_dataset(
+            iter_chunks(generate, rows, chunk_size, seed=seed), ColumnarWriter(path, columns, rows, names),
+            to_frame, label_of, sample_path, csv_path
+        )
+
+    manifest, seconds = generate_sharded(kind, path, rows, shards, seed, chunk_size, names, workers)
+    to_frame(shard_sample(path)).to_csv(sample_path, index=False)
+    counts = np.sum([entry['label_counts'] for entry in manifest['shards']], axis=0)
+    return rows, counts, rows / seconds
+
+
+def convert_csv(csv_path, path, columns, chunk_size=DEFAULT_CHUNK_SIZE):
+    with open(csv_path) as f:
+        rows = sum(1 for _ in f) - 1
+    writer = ColumnarWriter(path, columns, rows, names)
+    for chunk in csv_chunks(csv_path, columns, chunk_size):
+        writer.write(chunk)
+    writer.close()
+    print(f"✓ {csv_path} ({os.path.getsize(csv_path) / 1024:.2f} KB) -> {path}/ "
+          f"({dataset_bytes(path) / 1024:.2f} KB, {rows:,} rows)")
+
+
+def benchmark(name, chunks):
+    rate = RowRate()
+    for _ in rate.wrap(chunks):
+        pass
+    print(f"  {name}: {rate.rows:,} rows in {rate.seconds:.2f}s ({rate.rows_per_sec:,.0f} rows/sec)")
+
+
+if __name__ == '__main__':
+    # Guarded so sharded_generation's spawned pool workers can import this module
+    args = parser.parse_args()
+    if not 1 <= args.shards <= min(args.cnn_rows, args.rnn_rows):
+        parser.error('--shards must be between 1 and the row count')
+    if args.shards > 1 and args.csv:
+        parser.error('--csv writes one file per dataset, generate without --shards')
+
+    if args.benchmark:
+        print(f"Generation throughput (chunks of {args.chunk_size:,} rows, nothing written):")
+        benchmark('CNN', iter_chunks(generate_cnn_chunk, args.cnn_rows, args.chunk_size, seed=args.seed))
+        benchmark('RNN', iter_chunks(generate_rnn_chunk, args.rnn_rows, args.chunk_size, seed=args.seed + 1))
+        raise SystemExit(0)
+
+    if args.from_csv:
+        convert_csv('cnn_training_dataset.csv', CNN_DATASET_DIR, CNN_COLUMNS, args.chunk_size)
+        convert_csv('rnn_training_dataset.csv', RNN_DATASET_DIR, RNN_COLUMNS, args.chunk_size)
+        raise SystemExit(0)
+
+    print("="*80)
+    print("GENERATING COMPREHENSIVE DATASETS FOR CNN AND RNN MODELS")
+    print("="*80)
+
+    # ============================================================================
+    # GENERATE CNN DATASET
+    # ============================================================================
+    print("\n[1/4] Generating CNN Training Dataset...")
+
+    cnn_rows, cnn_counts, cnn_rate = build_dataset(
+        'cnn', CNN_DATASET_DIR, args.cnn_rows, args.seed, cnn_frame, 'cnn_dataset_sample.csv',
+        csv_path='cnn_training_dataset.csv' if args.csv else None,
+        chunk_size=args.chunk_size, shards=args.shards, workers=args.workers
+    )
+    print(f"✓ Saved: {CNN_DATASET_DIR}/ ({cnn_rows} samples, generated at {cnn_rate:,.0f} rows/sec)")
+    if args.csv:
+        print(f"✓ Saved: cnn_training_dataset.csv")
+
+    # Save summary
+    cnn_summary = {
+        'dataset_name': 'CNN Fitness Classification Dataset',
+        'total_samples': cnn_rows,
+        'features': ['age', 'weight', 'height', 'bmi', 'fitness_level', 'goal'],
+        'target': 'category (0-8)',
+        'classes': 9,
+        'class_distribution': {
+            category_labels[category]: int(count) for category, count in enumerate(cnn_counts) if count
+        }
+    }
+
+    print(f"\nCNN Dataset Summary:")
+    print(f"  • Total Samples: {cnn_summary['total_samples']}")
+    print(f"  • Features: {len(cnn_summary['features'])}")
+    print(f"  • Output Classes: {cnn_summary['classes']}")
+
+    # ============================================================================
+    # GENERATE RNN DATASET
+    # ============================================================================
+    print("\n[2/4] Generating RNN Training Dataset...")
+
+    rnn_rows, rnn_counts, rnn_rate = build_dataset(
+        'rnn', RNN_DATASET_DIR, args.rnn_rows, args.seed + 1, rnn_frame, 'rnn_dataset_sample.csv',
+        csv_path='rnn_training_dataset.csv' if args.csv else None,
+        chunk_size=args.chunk_size, shards=args.shards, workers=args.workers
+    )
+    print(f"✓ Saved: {RNN_DATASET_DIR}/ ({rnn_rows} samples, generated at {rnn_rate:,.0f} rows/sec)")
+    if args.csv:
+        print(f"✓ Saved: rnn_training_dataset.csv")
+
+    # Save summary
+    rnn_summary = {
+        'dataset_name': 'RNN Workout Sequence Prediction Dataset',
+        'total_samples': rnn_rows,
+        'sequence_length': 6,
+        'prediction_target': 'day 7 workout',
+        'features': ['age', 'fitness_level', 'goal', 'past_6_days_workouts'],
+        'target': 'next_workout (0-6)',
+        'classes': 7,
+        'class_distribution': {
+            str(workout_names[workout]): int(count) for workout, count in enumerate(rnn_counts[:7]) if count
+        }
+    }
+
+    print(f"\nRNN Dataset Summary:")
+    print(f"  • Total Samples: {rnn_summary['total_samples']}")
+    print(f"  • Sequence Length: {rnn_summary['sequence_length']} days")
+    print(f"  • Output Classes: {rnn_summary['classes']}")
+
+    # ============================================================================
+    # CREATE SAMPLE DATASETS (First 100 rows for documentation)
+    # ============================================================================
+    print("\n[3/4] Creating sample datasets...")
+
+    # Written from the first chunk of each dataset by write_dataset()
+    print(f"✓ Saved: cnn_dataset_sample.csv (100 samples)")
+    print(f"✓ Saved: rnn_dataset_sample.csv (100 samples)")
+
+    # ============================================================================
+    # CREATE DATASET DOCUMENTATION
+    # ============================================================================
+    print("\n[4/4] Creating dataset documentation...")
+
+    documentation = {
+        'project': 'Fitness Plan Generator - Deep Learning Models',
+        'created_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'datasets': {
+            'cnn_dataset': {
+                'filename': f'{CNN_DATASET_DIR}/',
+                'format': 'columnar: one .npy per column (uint8 codes, float32 measurements), names in meta.json',
+                'columns': {name: {'dtype': dtype, 'shape': list(shape)} for name, (dtype, shape) in CNN_COLUMNS.items()},
+                'csv_export': 'cnn_training_dataset.csv (generate_datasets.py --csv), with the features below',
+                'description': 'User profile classification dataset for CNN model',
+                'total_samples': cnn_rows,
+                'features': {
+                    'age': 'User age (18-65 years)',
+                    'weight': 'User weight in kg (45-120 kg)',
+                    'height': 'User height in cm (150-200 cm)',
+                    'bmi': 'Body Mass Index calculated from weight and height',
+                    'fitness_level': 'Encoded fitness level (0=Beginner, 1=Intermediate, 2=Advanced)',
+                    'fitness_level_name': 'Human-readable fitness level',
+                    'goal': 'Encoded fitness goal (0=Weight Loss, 1=Muscle Gain, 2=General Fitness)',
+                    'goal_name': 'Human-readable fitness goal',
+                    'category': 'Target classification (0-8)',
+                    'category_label': 'Human-readable category label'
+                },
+                'output_classes': 9,
+                'class_labels': [
+                    'Beginner - Weight Loss',
+                    'Beginner - Muscle Gain',
+                    'Beginner - General Fitness',
+                    'Intermediate - Weight Loss',
+                    'Intermediate - Muscle Gain',
+                    'Intermediate - General Fitness',
+                    'Advanced - Weight Loss',
+                    'Advanced - Muscle Gain',
+                    'Advanced - General Fitness'
+                ],
+                'model': 'Convolutional Neural Network (CNN)',
+                'purpose': 'Classify users into fitness categories based on their profile'
             },
-            'output_classes': 9,
-            'class_labels': [
-                'Beginner - Weight Loss',
-                'Beginner - Muscle Gain',
-                'Beginner - General Fitness',
-                'Intermediate - Weight Loss',
-                'Intermediate - Muscle Gain',
-                'Intermediate - General Fitness',
-                'Advanced - Weight Loss',
-                'Advanced - Muscle Gain',
-                'Advanced - General Fitness'
-            ],
-            'model': 'Convolutional Neural Network (CNN)',
-            'purpose': 'Classify users into fitness categories based on their profile'
+            'rnn_dataset': {
+                'filename': f'{RNN_DATASET_DIR}/',
+                'format': 'columnar: one .npy per column (uint8 codes), names in meta.json',
+                'columns': {name: {'dtype': dtype, 'shape': list(shape)} for name, (dtype, shape) in RNN_COLUMNS.items()},
+                'csv_export': 'rnn_training_dataset.csv (generate_datasets.py --csv), with the features below',
+                'description': 'Sequential workout prediction dataset for RNN model',
+                'total_samples': rnn_rows,
+                'features': {
+                    'age': 'User age (18-65 years)',
+                    'fitness_level': 'Encoded fitness level (0-2)',
+                    'fitness_level_name': 'Human-readable fitness level',
+                    'goal': 'Encoded fitness goal (0-2)',
+                    'goal_name': 'Human-readable fitness goal',
+                    'day1_workout to day6_workout': 'Encoded workout types for past 6 days (0-6)',
+                    'day1_workout_name to day6_workout_name': 'Human-readable workout names',
+                    'day7_workout': 'Target workout for day 7 (encoded)',
+                    'day7_workout_name': 'Target workout for day 7 (human-readable)',
+                    'target_workout': 'Same as day7_workout (for model training)'
+                },
+                'output_classes': 7,
+                'class_labels': [
+                    'Rest',
+                    'Cardio',
+                    'Strength',
+                    'HIIT',
+                    'Yoga',
+                    'Swimming',
+                    'Cycling'
+                ],
+                'model': 'Recurrent Neural Network (LSTM-based RNN)',
+                'purpose': 'Predict next day workout based on past 6 days and user profile'
+            }
         },
-        'rnn_dataset': {
-            'filename': 'rnn_training_dataset.csv',
-            'description': 'Sequential workout prediction dataset for RNN model',
-            'total_samples': len(rnn_df),
-            'features': {
-                'age': 'User age (18-65 years)',
-                'fitness_level': 'Encoded fitness level (0-2)',
-                'fitness_level_name': 'Human-readable fitness level',
-                'goal': 'Encoded fitness goal (0-2)',
-                'goal_name': 'Human-readable fitness goal',
-                'day1_workout to day6_workout': 'Encoded workout types for past 6 days (0-6)',
-                'day1_workout_name to day6_workout_name': 'Human-readable workout names',
-                'day7_workout': 'Target workout for day 7 (encoded)',
-                'day7_workout_name': 'Target workout for day 7 (human-readable)',
-                'target_workout': 'Same as day7_workout (for model training)'
-            },
-            'output_classes': 7,
-            'class_labels': [
-                'Rest',
-                'Cardio',
-                'Strength',
-                'HIIT',
-                'Yoga',
-                'Swimming',
-                'Cycling'
-            ],
-            'model': 'Recurrent Neural Network (LSTM-based RNN)',
-            'purpose': 'Predict next day workout based on past 6 days and user profile'
-        }
-    },
-    'data_generation_method': 'Synthetic data generated using rule-based patterns with 10% randomness',
-    'usage': 'These datasets are used to train deep learning models for personalized fitness recommendations'
-}
+        'data_generation_method': 'Synthetic data generated using rule-based patterns with 10% randomness',
+        'usage': 'These datasets are used to train deep learning models for personalized fitness recommendations'
+    }
 
-with open('dataset_documentation.json', 'w') as f:
-    json.dump(documentation, f, indent=2)
+    with open('dataset_documentation.json', 'w') as f:
+        json.dump(documentation, f, indent=2)
 
-print(f"✓ Saved: dataset_documentation.json")
+    print(f"✓ Saved: dataset_documentation.json")
 
-# ============================================================================
-# CREATE README FOR DATASETS
-# ============================================================================
-readme_content = f"""# Fitness Plan Generator - Training Datasets
+    # ============================================================================
+    # CREATE README FOR DATASETS
+    # ============================================================================
+    readme_content = f"""# Fitness Plan Generator - Training Datasets
 
 ## Overview
 This directory contains the training datasets used for the Fitness Plan Generator deep learning models.
@@ -285,14 +346,21 @@ This directory contains the training datasets used for the Fitness Plan Generato
 ## 📊 Datasets
 
 ### 1. CNN Training Dataset
-**File:** `cnn_training_dataset.csv`
+**Directory:** `cnn_training_dataset/` (CSV export: `cnn_training_dataset.csv`)
 
-- **Samples:** {len(cnn_df):,}
+- **Samples:** {cnn_rows:,}
 - **Purpose:** User profile classification
 - **Model:** Convolutional Neural Network (CNN)
 - **Output:** 9 fitness categories
 
-#### Features:
+#### Columnar Layout:
+| File | dtype | Shape |
+|------|-------|-------|
+| age.npy, fitness_level.npy, goal.npy, category.npy | uint8 | (rows,) |
+| weight.npy, height.npy, bmi.npy | float32 | (rows,) |
+| meta.json | - | row count, dtypes, code → name tables |
+
+#### Features (CSV export):
 | Column | Type | Description | Range |
 |--------|------|-------------|-------|
 | age | int | User age | 18-65 years |
@@ -320,14 +388,21 @@ This directory contains the training datasets used for the Fitness Plan Generato
 ---
 
 ### 2. RNN Training Dataset
-**File:** `rnn_training_dataset.csv`
+**Directory:** `rnn_training_dataset/` (CSV export: `rnn_training_dataset.csv`)
 
-- **Samples:** {len(rnn_df):,}
+- **Samples:** {rnn_rows:,}
 - **Purpose:** Sequential workout prediction
 - **Model:** LSTM Recurrent Neural Network (RNN)
 - **Output:** 7 workout types
 
-#### Features:
+#### Columnar Layout:
+| File | dtype | Shape |
+|------|-------|-------|
+| age.npy, fitness_level.npy, goal.npy | uint8 | (rows,) |
+| workouts.npy | uint8 | (rows, 7), day 7 is the target |
+| meta.json | - | row count, dtypes, code → name tables |
+
+#### Features (CSV export):
 | Column | Type | Description | Range |
 |--------|------|-------------|-------|
 | age | int | User age | 18-65 years |
@@ -392,14 +467,14 @@ Synthetic data generated using rule-based patterns that follow fitness principle
 
 ### CNN Dataset Distribution
 ```
-Total Samples: {len(cnn_df):,}
+Total Samples: {cnn_rows:,}
 Features: 6 (age, weight, height, bmi, fitness_level, goal)
 Target Classes: 9
 ```
 
 ### RNN Dataset Distribution
 ```
-Total Samples: {len(rnn_df):,}
+Total Samples: {rnn_rows:,}
 Sequence Length: 6 days input → 1 day prediction
 Features: 3 user features + 6 workout sequences
 Target Classes: 7
@@ -411,37 +486,30 @@ Target Classes: 7
 
 ### Loading CNN Dataset (Python)
 ```python
-import pandas as pd
-
-# Load full dataset
-cnn_df = pd.read_csv('cnn_training_dataset.csv')
+from columnar_dataset import load_dataset, cnn_profile_rows
 
-# Features
-X = cnn_df[['age', 'weight', 'height', 'fitness_level', 'goal']].values
+# Memory-mapped columns, nothing is parsed
+columns = load_dataset('cnn_training_dataset')
 
-# Target
-y = cnn_df['category'].values
+# Features [age, weight, height, fitness_level, goal] and target category
+X, y = cnn_profile_rows(columns)
 ```
 
 ### Loading RNN Dataset (Python)
 ```python
-import pandas as pd
-import numpy as np
-
-# Load full dataset
-rnn_df = pd.read_csv('rnn_training_dataset.csv')
+from columnar_dataset import load_dataset, load_meta, rnn_model_inputs
 
-# Sequence features (past 6 days)
-X_seq = rnn_df[['day1_workout', 'day2_workout', 'day3_workout', 
-                'day4_workout', 'day5_workout', 'day6_workout']].values
+columns = load_dataset('rnn_training_dataset')
 
-# User features
-X_feat = rnn_df[['age', 'fitness_level', 'goal']].values
+# Past 6 days, normalized user features and the day 7 target
+X_seq, X_feat, y = rnn_model_inputs(columns)
 
-# Target (day 7 workout)
-y = rnn_df['target_workout'].values
+# Workout names
+workout_names = load_meta('rnn_training_dataset')['names']['workout']
 ```
 
+Regenerate with `python generate_datasets.py --csv` to also get the CSV files.
+
 ---
 
 ## 📝 Citation
@@ -480,38 +548,47 @@ Models: CNN (9-class classification) and RNN (7-class sequence prediction)
 For questions about the datasets or models, refer to the main project documentation.
 """
 
-with open('DATASET_README.md', 'w', encoding='utf-8') as f:
-    f.write(readme_content)
-
-print(f"✓ Saved: DATASET_README.md")
-
-# ============================================================================
-# STATISTICS SUMMARY
-# ============================================================================
-print("\n" + "="*80)
-print("DATASET GENERATION COMPLETE!")
-print("="*80)
-print(f"\n📊 Generated Files:")
-print(f"   1. cnn_training_dataset.csv      - {len(cnn_df):,} samples")
-print(f"   2. rnn_training_dataset.csv      - {len(rnn_df):,} samples")
-print(f"   3. cnn_dataset_sample.csv        - 100 sample rows")
-print(f"   4. rnn_dataset_sample.csv        - 100 sample rows")
-print(f"   5. dataset_documentation.json    - Technical documentation")
-print(f"   6. DATASET_README.md             - Complete dataset guide")
-
-print(f"\n📈 Dataset Statistics:")
-print(f"\n   CNN Dataset:")
-print(f"   • Total Samples: {len(cnn_df):,}")
-print(f"   • Features: 6 (age, weight, height, bmi, fitness_level, goal)")
-print(f"   • Target: category (9 classes)")
-print(f"   • File Size: {cnn_df.memory_usage(deep=True).sum() / 1024:.2f} KB")
-
-print(f"\n   RNN Dataset:")
-print(f"   • Total Samples: {len(rnn_df):,}")
-print(f"   • Sequence Length: 6 days → predict day 7")
-print(f"   • Features: 3 user + 6 workout sequence")
-print(f"   • Target: next_workout (7 classes)")
-print(f"   • File Size: {rnn_df.memory_usage(deep=True).sum() / 1024:.2f} KB")
-
-print(f"\n✅ All datasets saved successfully!")
-print("="*80 + "\n")
+    with open('DATASET_README.md', 'w', encoding='utf-8') as f:
+        f.write(readme_content)
+
+    print(f"✓ Saved: DATASET_README.md")
+
+    # ============================================================================
+    # STATISTICS SUMMARY
+    # ============================================================================
+    print("\n" + "="*80)
+    print("DATASET GENERATION COMPLETE!")
+    print("="*80)
+    print(f"\n📊 Generated Files:")
+    print(f"   1. {CNN_DATASET_DIR}/          - {cnn_rows:,} samples")
+    print(f"   2. {RNN_DATASET_DIR}/          - {rnn_rows:,} samples")
+    print(f"   3. cnn_dataset_sample.csv        - 100 sample rows")
+    print(f"   4. rnn_dataset_sample.csv        - 100 sample rows")
+    print(f"   5. dataset_documentation.json    - Technical documentation")
+    print(f"   6. DATASET_README.md             - Complete dataset guide")
+
+    print(f"\n📈 Dataset Statistics:")
+    print(f"\n   CNN Dataset:")
+    print(f"   • Total Samples: {cnn_rows:,}")
+    print(f"   • Features: 6 (age, weight, height, bmi, fitness_level, goal)")
+    print(f"   • Target: category (9 classes)")
+    print(f"   • Size: {dataset_bytes(CNN_DATASET_DIR) / 1024:.2f} KB columnar", end='')
+    print(f", {os.path.getsize('cnn_training_dataset.csv') / 1024:.2f} KB CSV" if args.csv else "")
+
+    print(f"\n   RNN Dataset:")
+    print(f"   • Total Samples: {rnn_rows:,}")
+    print(f"   • Sequence Length: 6 days → predict day 7")
+    print(f"   • Features: 3 user + 6 workout sequence")
+    print(f"   • Target: next_workout (7 classes)")
+    print(f"   • Size: {dataset_bytes(RNN_DATASET_DIR) / 1024:.2f} KB columnar", end='')
+    print(f", {os.path.getsize('rnn_training_dataset.csv') / 1024:.2f} KB CSV" if args.csv else "")
+
+    if args.shards > 1:
+        print(f"\n⚡ Generation Throughput ({args.shards} shards, wall clock including writes):")
+    else:
+        print(f"\n⚡ Generation Throughput (excluding writes):")
+    print(f"   • CNN: {cnn_rate:,.0f} rows/sec")
+    print(f"   • RNN: {rnn_rate:,.0f} rows/sec")
+
+    print(f"\n✅ All datasets saved successfully!")
+    print("="*80 + "\n")
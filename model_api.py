@@ -3,13 +3,28 @@ Flask API to serve the trained RNN model
 This runs separately and your Next.js app can call it
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 import numpy as np
-import tensorflow as tf
-from tensorflow import keras
+import itertools
+import json
+import logging
 import os
+import queue
 import random
+import threading
+import time
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from api_logging import get_logger, log_event, sample_predictions
+from api_metrics import Registry, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from numpy_inference import beam_decode
+from cnn_serving import (
+    CNN_SERVING_PATH, CNN_SERVING_TFLITE_PATH, CNN_WEIGHTS_PATH, workout_categories, profile_row
+)
+from plan_table import PlanTable, PLAN_TABLE_PATH, artifacts_sha256, file_sha256
 
 # Import training data and exercise database
 from training_data import (
@@ -25,25 +40,581 @@ from training_data import (
 app = Flask(__name__)
 CORS(app)  # Enable CORS for Next.js to call this API
 
-# Load the trained model
-MODEL_PATH = 'fitness_rnn_model.h5'
-model = None
+# JSON request logs, written off the request path
+log = get_logger()
+
+# Per-stage latency and outcome metrics, served by /metrics. With
+# METRICS_MULTIPROC_DIR (set by serve.py) /metrics sums every worker's values
+metrics = Registry(os.environ.get('METRICS_MULTIPROC_DIR'))
+stage_seconds = metrics.histogram(
+    'model_api_stage_seconds', 'Time spent in each request stage', ['stage'])
+rnn_step_seconds = metrics.histogram(
+    'model_api_rnn_step_seconds', 'Time spent predicting one day for a batch', ['day'])
+requests_total = metrics.counter(
+    'model_api_requests_total', 'Requests received', ['endpoint'])
+errors_total = metrics.counter(
+    'model_api_errors_total', 'Requests that failed with an error', ['endpoint'])
+model_not_loaded_total = metrics.counter(
+    'model_api_model_not_loaded_total', 'Requests rejected because no model was loaded', ['endpoint'])
+cache_hits_total = metrics.counter(
+    'model_api_cache_hits_total', 'Predictions answered without running the model', ['cache'])
+
+# Inference backend: 'keras' (TensorFlow), 'numpy' (no TensorFlow import)
+# or 'tflite' (TFLite interpreter, see export_tflite.py)
+MODEL_BACKEND = os.environ.get('MODEL_BACKEND', 'keras')
+
+# Load the trained model (both written by train_rnn_model.py)
+from fitness_rnn_model import MODEL_PATH, DECODER_PATH
+# Exported by numpy_inference.py (--stepwise for the stateful decoder)
+from numpy_inference import WEIGHTS_PATH
+NUMPY_WEIGHTS_PATH = os.environ.get('NUMPY_WEIGHTS_PATH', WEIGHTS_PATH)
+# Exported by export_tflite.py (or a quantize_models.py variant)
+from tflite_inference import RNN_TFLITE_PATH
+TFLITE_MODEL_PATH = os.environ.get('TFLITE_MODEL_PATH', RNN_TFLITE_PATH)
+CNN_TFLITE_MODEL_PATH = os.environ.get('CNN_TFLITE_MODEL_PATH', CNN_SERVING_TFLITE_PATH)
+SEQUENCE_LENGTH = 6
+
+# Cross-request micro-batching: wait up to BATCH_WINDOW_MS for up to
+# MAX_BATCH_SIZE requests, then decode them together (0 disables batching)
+BATCH_WINDOW_MS = float(os.environ.get('BATCH_WINDOW_MS', '2'))
+MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', '32'))
+
+# Profiles decoded together by /api/predict-workout/batch
+BATCH_CHUNK_SIZE = int(os.environ.get('BATCH_CHUNK_SIZE', '512'))
+
+# Upper bound on the "alternatives" a request may ask for (beam width - 1)
+MAX_ALTERNATIVES = int(os.environ.get('MAX_ALTERNATIVES', '5'))
+
+# Full-response cache for repeat submissions of the same profile
+RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', '10000'))
+RESPONSE_CACHE_TTL_S = float(os.environ.get('RESPONSE_CACHE_TTL_S', '3600'))
+
+# Hot reload: poll the artifacts every MODEL_WATCH_INTERVAL_S seconds (0 disables
+# the watcher; POST /admin/reload still works). ADMIN_TOKEN guards /admin/reload,
+# which is localhost-only when it is unset.
+MODEL_WATCH_INTERVAL_S = float(os.environ.get('MODEL_WATCH_INTERVAL_S', '0'))
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+
+class ModelBundle:
+    """
+    Everything one model version serves with, swapped as a unit on reload.
+
+    Handlers read `serving` once per request and pass that bundle down, so
+    requests in flight during a reload finish on the version they started on.
+    """
+
+    def __init__(self):
+        self.model = None
+        self.decoder = None
+        self.cnn_model = None  # Profile classifier with the scaler folded in (cnn_serving.py)
+        self.version = None
+        self.cnn_version = None
+        self.plan_table = None
+        self.artifacts = None  # artifact_stamp() taken before loading
+        self.loaded_at = None
+        self.model_info_fragment = None  # "modelInfo" JSON of this version, see model_info()
+        # Warm-up state reported by /health; traffic should only reach warm workers
+        self.warmup = {"state": "cold", "duration_ms": None, "warm_latency_ms": None}
+
+serving = ModelBundle()  # Replaced, never mutated, once loaded
+
+reload_lock = threading.Lock()
+reload_status = {"state": "idle", "started_at": None, "finished_at": None, "error": None}
+
+def rnn_artifact_paths():
+    """Files the RNN is loaded from on the current backend; their digest is the served version"""
+    if MODEL_BACKEND == 'numpy':
+        return [NUMPY_WEIGHTS_PATH]
+    if MODEL_BACKEND == 'tflite':
+        return [TFLITE_MODEL_PATH]
+    return [MODEL_PATH, os.path.join(DECODER_PATH, 'saved_model.pb')]
+
+def artifact_paths():
+    """Files whose change should trigger a reload on the current backend"""
+    if MODEL_BACKEND == 'numpy':
+        cnn_path = CNN_WEIGHTS_PATH
+    elif MODEL_BACKEND == 'tflite':
+        cnn_path = CNN_TFLITE_MODEL_PATH
+    else:
+        cnn_path = CNN_SERVING_PATH
+    return rnn_artifact_paths() + [cnn_path, PLAN_TABLE_PATH]
+
+def artifact_stamp():
+    """(path, mtime, size) of every artifact, None for missing files"""
+    stamp = []
+    for path in artifact_paths():
+        try:
+            info = os.stat(path)
+            stamp.append((path, info.st_mtime_ns, info.st_size))
+        except OSError:
+            stamp.append((path, None, None))
+    return tuple(stamp)
 
 # Load model on startup
 def load_model():
-    global model
+    """Load, warm up and start serving the artifacts on disk"""
+    global serving
+    serving = load_bundle()
+
+def load_bundle():
+    """A new, warmed-up ModelBundle from the artifacts on disk"""
+    bundle = ModelBundle()
+    bundle.artifacts = artifact_stamp()
+
+    if MODEL_BACKEND == 'numpy':
+        bundle.model, bundle.decoder = load_numpy_model()
+    elif MODEL_BACKEND == 'tflite':
+        bundle.model, bundle.decoder = load_tflite_model()
+    else:
+        bundle.model, bundle.decoder = load_keras_model()
+
+    # Digest of what this backend actually loaded, so replacing only the
+    # .npz or .tflite file still changes the version (and the cache keys)
+    if bundle.model is not None:
+        bundle.version = artifacts_sha256(rnn_artifact_paths())
+
+    bundle.cnn_model, bundle.cnn_version = load_cnn_model()
+    bundle.plan_table = load_plan_table(bundle.version)
+    if bundle.model is None:
+        # Nothing on disk to serve: /health reports this instead of "warming"
+        bundle.warmup["state"] = "unavailable"
+    warm_up_model(bundle)
+    bundle.loaded_at = str(np.datetime64('now'))
+    bundle.model_info_fragment = json.dumps(model_info(bundle.version, bundle.loaded_at)).encode()
+    return bundle
+
+def reload_model():
+    """
+    Load and warm the current artifacts, then swap them in.
+
+    The swap is one reference assignment; if loading fails the old bundle
+    keeps serving. Returns False if another reload is already running.
+    """
+    global serving
+    if not reload_lock.acquire(blocking=False):
+        return False
+    try:
+        reload_status.update(state="loading", started_at=str(np.datetime64('now')), error=None)
+        log_event(log, 'reload_started', version=serving.version)
+        bundle = load_bundle()
+        if bundle.model is None:
+            raise RuntimeError("No model could be loaded from the current artifacts")
+
+        previous, serving = serving, bundle
+        reload_status.update(state="idle", finished_at=str(np.datetime64('now')))
+        log_event(log, 'reload_finished', previous_version=previous.version, version=bundle.version,
+                  warmup_ms=bundle.warmup["duration_ms"])
+    except Exception as e:
+        reload_status.update(state="failed", finished_at=str(np.datetime64('now')), error=str(e))
+        log_event(log, 'reload_failed', logging.ERROR, error=str(e))
+    finally:
+        reload_lock.release()
+    return True
+
+def start_reload():
+    """Run reload_model on a background thread; False if one is already running"""
+    if reload_lock.locked():
+        return False
+    threading.Thread(target=reload_model, name='model-reload', daemon=True).start()
+    return True
+
+class ArtifactWatcher:
+    """Reloads the model when its artifacts change and have stopped changing"""
+
+    def __init__(self, interval_s):
+        self.interval = interval_s
+        self.lock = threading.Lock()
+        self.worker_pid = None
+
+    def ensure_started(self):
+        # Threads do not survive fork, so each worker process starts its own
+        if self.worker_pid == os.getpid():
+            return
+        with self.lock:
+            if self.worker_pid != os.getpid():
+                threading.Thread(target=self._run, name='artifact-watcher', daemon=True).start()
+                self.worker_pid = os.getpid()
+
+    def _run(self):
+        pending = None
+        failed = None
+        while True:
+            time.sleep(self.interval)
+            stamp = artifact_stamp()
+            if stamp == serving.artifacts or stamp == failed:
+                pending = None
+                continue
+            # Wait one more poll so a file that is still being copied is not loaded
+            if stamp != pending:
+                pending = stamp
+                continue
+            pending = None
+            reload_model()
+            if serving.artifacts != stamp:
+                failed = stamp
+
+watcher = ArtifactWatcher(MODEL_WATCH_INTERVAL_S) if MODEL_WATCH_INTERVAL_S > 0 else None
+
+def load_cnn_model():
+    """The CNN classifier and its file hash, on the same backend as the RNN"""
+    if MODEL_BACKEND == 'numpy':
+        path = CNN_WEIGHTS_PATH
+    elif MODEL_BACKEND == 'tflite':
+        path = CNN_TFLITE_MODEL_PATH
+    else:
+        path = CNN_SERVING_PATH
+
+    if not os.path.exists(path):
+        print(f"⚠️ CNN classifier not found: {path} (run cnn_serving.py to enable /api/classify-profile)")
+        return None, None
+
+    if MODEL_BACKEND == 'numpy':
+        from cnn_serving import NumpyCNNModel
+        cnn_model = NumpyCNNModel.load(path)
+    elif MODEL_BACKEND == 'tflite':
+        from tflite_inference import TFLiteModel
+        cnn_model = TFLiteModel(path)
+    else:
+        from tensorflow import keras
+        cnn_model = keras.models.load_model(path)
+    print(f"✅ CNN classifier loaded successfully from {path}")
+    return cnn_model, file_sha256(path)
+
+def load_tflite_model():
+    """(model, decoder); the TFLite model is decoded by the per-day loop"""
+    from tflite_inference import TFLiteModel
+
+    if os.path.exists(TFLITE_MODEL_PATH):
+        model = TFLiteModel(TFLITE_MODEL_PATH, input_names=['sequence_input', 'features_input'])
+        print(f"✅ TFLite model loaded successfully from {TFLITE_MODEL_PATH}")
+        return model, None
+
+    print(f"❌ TFLite model not found: {TFLITE_MODEL_PATH}")
+    print("Please run export_tflite.py first to convert the model")
+    return None, None
+
+def load_plan_table(model_version):
+    """The plan table on disk if it was built for `model_version` (the RNN artifact digest), else None"""
+    if not os.path.exists(PLAN_TABLE_PATH):
+        print(f"⚠️ Plan table not found: {PLAN_TABLE_PATH} (every request runs the model)")
+        return None
+
+    try:
+        table = PlanTable.load(PLAN_TABLE_PATH)
+    except ValueError as e:
+        print(f"⚠️ Ignoring plan table: {e}")
+        return None
+
+    # model_version digests the artifacts of this backend, so a table built
+    # before any of them changed (or on another backend) never matches
+    if table.model_hash != model_version:
+        print(f"⚠️ Ignoring stale plan table built for other artifacts ({table.backend} backend; "
+              f"run MODEL_BACKEND={MODEL_BACKEND} python plan_table.py)")
+        return None
+
+    print(f"✅ Plan table loaded: {len(table)} weeks for ages {table.age_min}-{table.age_max}")
+    return table
+
+def load_keras_model():
+    """(model, decoder); decoder is the exported week decoder when present"""
+    import tensorflow as tf
+    from tensorflow import keras
+
+    model = None
+    decoder = None
     if os.path.exists(MODEL_PATH):
         model = keras.models.load_model(MODEL_PATH)
         print(f"✅ Model loaded successfully from {MODEL_PATH}")
     else:
         print(f"❌ Model file not found: {MODEL_PATH}")
-        print("Please run fitness_rnn_model.py first to train the model")
+        print("Please run train_rnn_model.py first to train the model")
+
+    if os.path.exists(DECODER_PATH):
+        decoder = tf.saved_model.load(DECODER_PATH)
+        print(f"✅ Week decoder loaded from {DECODER_PATH}")
+    else:
+        print(f"⚠️ Week decoder not found: {DECODER_PATH} (using per-day predict loop)")
+    return model, decoder
+
+def load_numpy_model():
+    """(model, decoder); stateful weights act as their own decoder"""
+    from numpy_inference import NumpyRNNModel
+
+    if os.path.exists(NUMPY_WEIGHTS_PATH):
+        model = NumpyRNNModel.load(NUMPY_WEIGHTS_PATH)
+        print(f"✅ NumPy model loaded successfully from {NUMPY_WEIGHTS_PATH}")
+        # Stateful weights decode a week with one LSTM step per day; windowed
+        # ones go through the per-day loop in decode_weeks, so every step is timed
+        return model, model if model.stateful else None
+
+    print(f"❌ Weights file not found: {NUMPY_WEIGHTS_PATH}")
+    print("Please run numpy_inference.py first to export the weights")
+    return None, None
+
+# Decode full weeks for a batch of users
+def decode_weeks(seeds, features, bundle=None):
+    """
+    Complete 7-day weeks from 2-day seeds.
+
+    Args:
+        seeds: int array (batch, 2) of initial workouts
+        features: float array (batch, 3) of normalized [age, level, goal]
+        bundle: ModelBundle to decode with (default: the one being served)
+
+    Returns:
+        (weeks, confidences): int array (batch, 7) and float array (batch, 7)
+        with confidences in percent (seed days report 100%)
+    """
+    if bundle is None:
+        bundle = serving
+    seeds = np.asarray(seeds, dtype=np.int32)
+    features = np.asarray(features, dtype=np.float32)
+
+    if bundle.decoder is not None:
+        # One call runs all five prediction steps
+        with stage_seconds.time(stage='rnn_decode'):
+            result = bundle.decoder.decode_week(seeds, features)
+        return np.asarray(result['week']), np.asarray(result['confidence']) * 100
+
+    batch, seed_len = seeds.shape
+    weeks = np.zeros((batch, len(days_of_week)), dtype=np.int32)
+    confidences = np.full(weeks.shape, 100.0)
+    weeks[:, :seed_len] = seeds
+
+    for day in range(seed_len, weeks.shape[1]):
+        # Last 6 days; days not predicted yet are still 0, the right padding
+        start = max(0, day - SEQUENCE_LENGTH)
+        seq_input = weeks[:, start:start + SEQUENCE_LENGTH]
+        with rnn_step_seconds.time(day=day + 1):
+            prediction = bundle.model.predict([seq_input, features], verbose=0)
+        weeks[:, day] = np.argmax(prediction, axis=-1)
+        confidences[:, day] = np.max(prediction, axis=-1) * 100
+    return weeks, confidences
+
+def decode_week_rows(seeds, features, bundle=None):
+    """decode_weeks as one (week, confidences) list pair per user"""
+    weeks, confidences = decode_weeks(seeds, features, bundle)
+    return [([int(w) for w in week], [float(c) for c in conf]) for week, conf in zip(weeks, confidences)]
+
+# Classify raw profile rows with the CNN
+def classify_profiles(rows, bundle=None):
+    """
+    Plan category of each raw [age, weight, height, fitness_level, goal] row.
+
+    Returns (categories, confidences): int array (batch,) and float array
+    (batch,) with confidences in percent.
+    """
+    if bundle is None:
+        bundle = serving
+    with stage_seconds.time(stage='cnn_classify'):
+        prediction = np.asarray(bundle.cnn_model.predict(np.asarray(rows, dtype=np.float32), verbose=0))
+    return np.argmax(prediction, axis=-1), np.max(prediction, axis=-1) * 100
+
+def classify_rows(rows, bundle=None):
+    """classify_profiles as one (category, confidence) pair per row"""
+    categories, confidences = classify_profiles(rows, bundle)
+    return [(int(category), float(conf)) for category, conf in zip(categories, confidences)]
+
+def split_by_bundle(run, *columns):
+    """
+    Call run(*columns, bundle) once per bundle in a batch whose last column
+    holds each request's bundle; results come back in request order.
+    """
+    *columns, bundles = columns
+    results = [None] * len(bundles)
+    for bundle in {id(b): b for b in bundles}.values():
+        rows = [i for i, b in enumerate(bundles) if b is bundle]
+        outputs = run(*[[column[i] for i in rows] for column in columns], bundle)
+        for i, output in zip(rows, outputs):
+            results[i] = output
+    return results
+
+def warm_up_model(bundle, rounds=5):
+    """
+    Run every (level, goal) pattern through the bundle's models so graph
+    tracing and buffer allocation happen before it serves real requests.
+    """
+    if bundle.model is None:
+        return
+
+    warmup = bundle.warmup
+    warmup["state"] = "warming"
+    start = time.perf_counter()
+
+    patterns = sorted(workout_patterns)
+    seeds = [workout_patterns[pattern] for pattern in patterns]
+    features = [user_features(30, level, goal) for level, goal in patterns]
+
+    # Both the single-request and the batched shapes
+    for seed, feat in zip(seeds, features):
+        decode_weeks([seed], [feat], bundle)
+    decode_weeks(seeds, features, bundle)
+    if bundle.cnn_model is not None:
+        rows = [profile_row(30, 70, 170, level, goal) for level, goal in patterns]
+        classify_profiles(rows[:1], bundle)
+        classify_profiles(rows, bundle)
+
+    timings = []
+    for i in range(rounds):
+        t0 = time.perf_counter()
+        decode_weeks([seeds[i % len(seeds)]], [features[i % len(features)]], bundle)
+        timings.append((time.perf_counter() - t0) * 1000)
+
+    warmup.update(
+        state="warm",
+        duration_ms=round((time.perf_counter() - start) * 1000, 2),
+        warm_latency_ms=round(float(np.median(timings)), 3)
+    )
+    print(f"🔥 Model warmed up in {warmup['duration_ms']:.0f} ms "
+          f"(warm decode: {warmup['warm_latency_ms']:.2f} ms)")
+
+class InferenceBatcher:
+    """
+    Collects concurrent requests and runs them as one batch.
+
+    `decode_fn` takes one list per input (e.g. seeds, features) and returns
+    one result per request, in order.
+    """
+
+    def __init__(self, decode_fn, window_ms, max_batch_size, name='inference-batcher'):
+        self.decode_fn = decode_fn
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.name = name
+        self.lock = threading.Lock()
+        self.queue = None
+        self.worker_pid = None
+
+    def submit(self, *inputs):
+        """Queue one request's inputs; the Future yields its row of decode_fn's result"""
+        self._ensure_worker()
+        future = Future()
+        self.queue.put((inputs, future))
+        return future
+
+    def _ensure_worker(self):
+        # Threads do not survive fork, so each worker process starts its own
+        if self.worker_pid == os.getpid():
+            return
+        with self.lock:
+            if self.worker_pid != os.getpid():
+                self.queue = queue.Queue()
+                threading.Thread(target=self._run, name=self.name, daemon=True).start()
+                self.worker_pid = os.getpid()
+
+    def _collect(self):
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                results = self.decode_fn(*[list(column) for column in zip(*[inputs for inputs, _ in batch])])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+batcher = None
+cnn_batcher = None
+if BATCH_WINDOW_MS > 0:
+    # Requests carry their bundle, so a batch straddling a reload is split by version
+    batcher = InferenceBatcher(
+        lambda *columns: split_by_bundle(decode_week_rows, *columns), BATCH_WINDOW_MS, MAX_BATCH_SIZE)
+    cnn_batcher = InferenceBatcher(
+        lambda *columns: split_by_bundle(classify_rows, *columns), BATCH_WINDOW_MS, MAX_BATCH_SIZE,
+        name='cnn-batcher')
+
+class ResponseCache:
+    """Thread-safe LRU of serialized responses with a time-to-live"""
+
+    def __init__(self, max_size, ttl_seconds):
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if time.monotonic() > expires_at:
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+response_cache = ResponseCache(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL_S) if RESPONSE_CACHE_SIZE > 0 else None
 
 # Generate workout sequence based on level and goal
 def get_initial_sequence(level, goal):
     """Get initial 2-day workout pattern from predefined patterns"""
     return workout_patterns.get((level, goal), [1, 0])  # Default: Cardio, Rest
 
+def user_features(age, level, goal):
+    """Normalized feature row fed to the model"""
+    return [age / 100.0, level / 2.0, goal / 2.0]
+
+def predict_week(age, level, goal, bundle):
+    """Full week and per-day confidences, from the plan table when possible"""
+    if bundle.plan_table is not None:
+        result = bundle.plan_table.lookup(age, level, goal)
+        if result is not None:
+            cache_hits_total.inc(cache='plan_table')
+            return result
+
+    seed = get_initial_sequence(level, goal)
+    features = user_features(age, level, goal)
+    if batcher is not None:
+        return batcher.submit(seed, features, bundle).result()
+
+    return decode_week_rows([seed], [features], bundle)[0]
+
+def predict_alternatives(age, level, goal, week, count, bundle):
+    """
+    Up to `count` other weeks for the same user, best first.
+
+    One beam search of width count + 1 expands every candidate in a single
+    batch per day; the beam equal to `week` (usually the first) is dropped.
+    """
+    # Stateful models read the unpadded days so far instead of a padded window
+    window = None if getattr(bundle.model, 'stateful', False) else SEQUENCE_LENGTH
+    with stage_seconds.time(stage='beam_search'):
+        result = beam_decode(
+            lambda inputs: bundle.model.predict(inputs, verbose=0),
+            [get_initial_sequence(level, goal)], [user_features(age, level, goal)],
+            beam_width=count + 1, days=len(days_of_week), window=window
+        )
+
+    alternatives = []
+    for beam_week, beam_confidence in zip(result['week'][0], result['confidence'][0]):
+        beam_week = [int(w) for w in beam_week]
+        if beam_week != list(week):
+            alternatives.append((beam_week, [float(c) * 100 for c in beam_confidence]))
+    return alternatives[:count]
+
 # Generate exercise details based on workout type
 def get_exercises_for_workout(workout_type, level, goal):
     """Generate detailed exercises for each workout type"""
@@ -65,8 +636,8 @@ def get_exercises_for_workout(workout_type, level, goal):
     }
 
 # Generate diet plan based on user data
-def generate_diet_plan(age, weight, height, level, goal, allergies):
-    """Generate personalized diet plan"""
+def generate_diet_plan(age, weight, height, level, goal, allergies, rng=random):
+    """Generate personalized diet plan (meals drawn from `rng`)"""
     
     # Calculate BMR (Basal Metabolic Rate)
     bmr = 10 * weight + 6.25 * height - 5 * age + 5
@@ -82,11 +653,11 @@ def generate_diet_plan(age, weight, height, level, goal, allergies):
     
     # Select random meals from templates
     meals = [
-        {"name": "Breakfast", "foods": random.choice(meal_options["breakfast"])},
-        {"name": "Lunch", "foods": random.choice(meal_options["lunch"])},
-        {"name": "Dinner", "foods": random.choice(meal_options["dinner"])},
-        {"name": "Snack 1", "foods": random.choice(meal_options["snacks"])},
-        {"name": "Snack 2", "foods": random.choice(meal_options["snacks"])},
+        {"name": "Breakfast", "foods": rng.choice(meal_options["breakfast"])},
+        {"name": "Lunch", "foods": rng.choice(meal_options["lunch"])},
+        {"name": "Dinner", "foods": rng.choice(meal_options["dinner"])},
+        {"name": "Snack 1", "foods": rng.choice(meal_options["snacks"])},
+        {"name": "Snack 2", "foods": rng.choice(meal_options["snacks"])},
     ]
     
     return {
@@ -94,116 +665,458 @@ def generate_diet_plan(age, weight, height, level, goal, allergies):
         "meals": meals
     }
 
+# Parse one user profile from the request JSON
+def parse_profile(data):
+    """Extract and normalize the fields the model and diet planner use"""
+    
+    # Extract user data
+    age = int(data.get('age', 25))
+    weight = float(data.get('weight', 70))
+    height = float(data.get('height', 170))
+    fitness_level = data.get('fitnessLevel', 'beginner')
+    goal = data.get('fitnessGoals', 'improve fitness')
+    allergies = data.get('allergies', '')
+    
+    # Map to numeric values
+    level_map = {'beginner': 0, 'intermediate': 1, 'advanced': 2}
+    
+    level = level_map.get(fitness_level, 0)
+    goal_num = 2  # default to fitness
+    
+    # Parse goal from text
+    goal_text = goal.lower()
+    if 'weight' in goal_text or 'loss' in goal_text or 'lose' in goal_text:
+        goal_num = 0
+    elif 'muscle' in goal_text or 'gain' in goal_text or 'build' in goal_text:
+        goal_num = 1
+    
+    return {
+        "age": age,
+        "weight": weight,
+        "height": height,
+        "fitness_level": fitness_level,
+        "level": level,
+        "goal": goal_num,
+        "allergies": allergies,
+        "alternatives": min(max(int(data.get('alternatives', 0)), 0), MAX_ALTERNATIVES)
+    }
+
+def normalize_profile(profile):
+    """
+    The request-dependent inputs that determine a plan, as a hashable key.
+
+    `allergies` is not used by the planner yet; add it here once it is.
+    """
+    return (
+        profile["age"],
+        round(profile["weight"], 1),
+        round(profile["height"], 1),
+        profile["level"],
+        profile["goal"]
+    )
+
+def profile_rng(profile):
+    """Random generator seeded from the normalized profile, so meals are reproducible"""
+    digest = hashlib.sha256(repr(normalize_profile(profile)).encode()).digest()
+    return random.Random(int.from_bytes(digest[:8], 'big'))
+
+# Static parts of every plan, JSON-encoded once at startup
+def build_routine_fragments():
+    """(workout_type, level_name) -> JSON bytes of that day's routine list"""
+    return {
+        (workout_type, level_names[level]): json.dumps(
+            get_exercises_for_workout(workout_type, level, None)["routines"]
+        ).encode()
+        for workout_type in exercises_db
+        for level in range(len(level_names))
+    }
+
+ROUTINE_FRAGMENTS = build_routine_fragments()
+DAY_PREFIXES = [b'{"day":' + json.dumps(day).encode() + b',"routines":' for day in days_of_week]
+PLAN_PREFIX = b'{"success":true,"workoutPlan":{"schedule":' + json.dumps(days_of_week).encode() + b',"exercises":['
+def model_info(model_version, loaded_at):
+    """The "modelInfo" block of plan responses for one served version"""
+    return {
+        "name": "Fitness RNN Model",
+        "version": "1.0",
+        "accuracy": "90%",
+        "modelVersion": model_version[:12] if model_version else None,
+        "loadedAt": loaded_at
+    }
+
+def render_exercises(week, level_name):
+    """JSON bytes of the per-day exercise list, spliced from ROUTINE_FRAGMENTS"""
+    return b','.join(
+        prefix + ROUTINE_FRAGMENTS[(workout_type, level_name)] + b'}'
+        for prefix, workout_type in zip(DAY_PREFIXES, week)
+    )
+
+# Assemble the response for one user from their predicted week
+def render_plan_body(profile, week, bundle, index=None, alternatives=()):
+    """
+    Serialized plan response (workout schedule, exercises and diet plan).
+
+    Routine blocks are spliced in from ROUTINE_FRAGMENTS; only the diet
+    plan, timestamp and optional batch index are encoded per request.
+    `alternatives` are (week, confidences) pairs from predict_alternatives.
+    """
+    level_name = level_names[profile["level"]]
+    
+    # Detailed exercises for each day
+    with stage_seconds.time(stage='exercises'):
+        exercises = render_exercises(week, level_name)
+        alternative_plans = b','.join(
+            b'{"rank":%d,"workouts":' % rank + json.dumps([workout_names[w] for w in alt_week]).encode()
+            + b',"confidence":' + json.dumps([round(c, 1) for c in alt_confidences]).encode()
+            + b',"exercises":[' + render_exercises(alt_week, level_name) + b']}'
+            for rank, (alt_week, alt_confidences) in enumerate(alternatives, 1)
+        )
+    
+    # Generate diet plan
+    with stage_seconds.time(stage='diet'):
+        diet_plan = generate_diet_plan(
+            profile["age"], profile["weight"], profile["height"], profile["level"], profile["goal"],
+            profile["allergies"], rng=profile_rng(profile)
+        )
+    
+    with stage_seconds.time(stage='serialize'):
+        parts = [PLAN_PREFIX, exercises, b'],"generatedBy":"AI RNN Model"}']
+        if alternatives:
+            parts += [b',"alternativePlans":[', alternative_plans, b']']
+        parts += [
+            b',"dietPlan":', json.dumps(diet_plan).encode(),
+            b',"generatedAt":', json.dumps(str(np.datetime64('now'))).encode(),
+            b',"modelInfo":', bundle.model_info_fragment
+        ]
+        if index is not None:
+            parts.append(b',"index":%d' % index)
+        parts.append(b'}')
+        return b''.join(parts)
+
 @app.route('/api/predict-workout', methods=['POST'])
 def predict_workout():
     """Generate weekly workout plan using AI model"""
     
-    if model is None:
+    requests_total.inc(endpoint='predict-workout')
+    bundle = serving  # This request stays on this version even if a reload swaps it
+    if bundle.model is None:
+        model_not_loaded_total.inc(endpoint='predict-workout')
         return jsonify({
             "error": "Model not loaded. Please train the model first.",
             "success": False
         }), 500
     
     try:
-        data = request.json
+        with stage_seconds.time(stage='parse'):
+            profile = parse_profile(request.json)
+        age, level, goal_num = profile["age"], profile["level"], profile["goal"]
         
-        # Extract user data
-        age = int(data.get('age', 25))
-        weight = float(data.get('weight', 70))
-        height = float(data.get('height', 170))
-        fitness_level = data.get('fitnessLevel', 'beginner')
-        goal = data.get('fitnessGoals', 'improve fitness')
-        allergies = data.get('allergies', '')
+        cache_key = (normalize_profile(profile), profile["alternatives"], bundle.version)
+        if response_cache is not None:
+            body = response_cache.get(cache_key)
+            if body is not None:
+                cache_hits_total.inc(cache='response')
+                log_event(log, 'plan_cached', age=age, fitness_level=level, goal=goal_num)
+                return Response(body, mimetype='application/json')
         
-        # Map to numeric values
-        level_map = {'beginner': 0, 'intermediate': 1, 'advanced': 2}
-        goal_map = {'weight loss': 0, 'build muscle': 1, 'improve fitness': 2}
+        # Generate weekly workout plan using AI model (days 3-7 are predicted)
+        week, confidences = predict_week(age, level, goal_num, bundle)
         
-        level = level_map.get(fitness_level, 0)
-        goal_num = 2  # default to fitness
+        if sample_predictions():
+            for day_idx in range(len(get_initial_sequence(level, goal_num)), len(week)):
+                log_event(log, 'day_predicted', day=day_idx + 1, workout=workout_names[week[day_idx]],
+                          confidence=round(confidences[day_idx], 1))
         
-        # Parse goal from text
-        goal_text = goal.lower()
-        if 'weight' in goal_text or 'loss' in goal_text or 'lose' in goal_text:
-            goal_num = 0
-        elif 'muscle' in goal_text or 'gain' in goal_text or 'build' in goal_text:
-            goal_num = 1
+        alternatives = ()
+        if profile["alternatives"]:
+            alternatives = predict_alternatives(age, level, goal_num, week, profile["alternatives"], bundle)
         
-        print(f"\n🤖 AI Model Processing:")
-        print(f"   Age: {age}, Weight: {weight}kg, Height: {height}cm")
-        print(f"   Level: {fitness_level} ({level}), Goal: {goal_num}")
+        body = render_plan_body(profile, week, bundle, alternatives=alternatives)
+        if response_cache is not None:
+            response_cache.put(cache_key, body)
         
-        # Generate weekly workout plan using AI model
-        week = get_initial_sequence(level, goal_num)
+        log_event(log, 'plan_generated', age=age, weight=profile['weight'], height=profile['height'],
+                  fitness_level=level, goal=goal_num, week=week, alternatives=len(alternatives))
         
-        # Predict remaining days using RNN model
-        for day_idx in range(5):  # Predict days 3-7
-            if len(week) >= 6:
-                past_week = week[-6:]
-            else:
-                past_week = week + [0] * (6 - len(week))
-            
-            seq_input = np.array([past_week])
-            feat_input = np.array([[age / 100.0, level / 2.0, goal_num / 2.0]])
+        return Response(body, mimetype='application/json')
+        
+    except Exception as e:
+        errors_total.inc(endpoint='predict-workout')
+        log_event(log, 'plan_failed', logging.ERROR, error=str(e))
+        return jsonify({
+            "error": str(e),
+            "success": False
+        }), 500
+
+def read_batch_profiles(req):
+    """
+    Yield raw profile dicts from a JSON array body or an NDJSON stream.
+
+    NDJSON is read line by line so large uploads are never fully buffered.
+    Lines that are not valid JSON are yielded as the exception instead.
+    """
+    if req.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        for line in req.stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                yield e
+    else:
+        profiles = req.get_json()
+        if not isinstance(profiles, list):
+            raise ValueError("Expected a JSON array of profiles")
+        yield from profiles
+
+def predict_weeks(profiles, bundle):
+    """Vectorized predict_week: table lookups first, then one decode for the misses"""
+    results = [None] * len(profiles)
+    misses = []
+    for i, profile in enumerate(profiles):
+        if bundle.plan_table is not None:
+            results[i] = bundle.plan_table.lookup(profile["age"], profile["level"], profile["goal"])
+        if results[i] is None:
+            misses.append(i)
+        else:
+            cache_hits_total.inc(cache='plan_table')
+    
+    if misses:
+        weeks, confidences = decode_weeks(
+            [get_initial_sequence(profiles[i]["level"], profiles[i]["goal"]) for i in misses],
+            [user_features(profiles[i]["age"], profiles[i]["level"], profiles[i]["goal"]) for i in misses],
+            bundle
+        )
+        for i, week, conf in zip(misses, weeks, confidences):
+            results[i] = ([int(w) for w in week], [float(c) for c in conf])
+    
+    return results
+
+@app.route('/api/predict-workout/batch', methods=['POST'])
+def predict_workout_batch():
+    """
+    Generate plans for many users in one request.
+
+    Accepts a JSON array or an NDJSON stream of profiles and streams one
+    NDJSON plan per profile back, in input order. Profiles are decoded
+    BATCH_CHUNK_SIZE at a time, each day computed for the whole chunk.
+    """
+    
+    requests_total.inc(endpoint='predict-workout-batch')
+    bundle = serving  # The whole stream is served by one version
+    if bundle.model is None:
+        model_not_loaded_total.inc(endpoint='predict-workout-batch')
+        return jsonify({
+            "error": "Model not loaded. Please train the model first.",
+            "success": False
+        }), 500
+    
+    try:
+        raw_profiles = read_batch_profiles(request)
+        # Pull the first item now so a malformed body fails before streaming
+        first = list(itertools.islice(raw_profiles, 1))
+    except ValueError as e:
+        errors_total.inc(endpoint='predict-workout-batch')
+        return jsonify({"error": str(e), "success": False}), 400
+    
+    def generate():
+        profiles = itertools.chain(first, raw_profiles)
+        index = 0
+        while True:
+            chunk = list(itertools.islice(profiles, BATCH_CHUNK_SIZE))
+            if not chunk:
+                break
             
-            prediction = model.predict([seq_input, feat_input], verbose=0)
-            next_workout = np.argmax(prediction)
-            confidence = np.max(prediction) * 100
+            parsed = []
+            for item in chunk:
+                try:
+                    if isinstance(item, Exception):
+                        raise item
+                    parsed.append(parse_profile(item))
+                except Exception as e:
+                    parsed.append(e)
             
-            print(f"   Day {len(week)+1}: {workout_names[next_workout]} (confidence: {confidence:.1f}%)")
+            valid = [p for p in parsed if not isinstance(p, Exception)]
+            weeks = iter(predict_weeks(valid, bundle))
             
-            week.append(next_workout)
-        
-        # Generate detailed exercises for each day
-        exercises = []
-        schedule = []
-        
-        for day_name, workout_type in zip(days_of_week, week):
-            exercise_details = get_exercises_for_workout(workout_type, level, goal_num)
-            exercises.append({
-                "day": day_name,
-                "routines": exercise_details["routines"]
-            })
-            schedule.append(day_name)
-        
-        # Generate diet plan
-        diet_plan = generate_diet_plan(age, weight, height, level, goal_num, allergies)
-        
-        response = {
-            "success": True,
-            "workoutPlan": {
-                "schedule": schedule,
-                "exercises": exercises,
-                "generatedBy": "AI RNN Model"
-            },
-            "dietPlan": diet_plan,
-            "generatedAt": str(np.datetime64('now')),
-            "modelInfo": {
-                "name": "Fitness RNN Model",
-                "version": "1.0",
-                "accuracy": "90%"
-            }
+            for profile in parsed:
+                if isinstance(profile, Exception):
+                    errors_total.inc(endpoint='predict-workout-batch')
+                    line = json.dumps({"index": index, "error": str(profile), "success": False}).encode()
+                else:
+                    week, _ = next(weeks)
+                    line = render_plan_body(profile, week, bundle, index=index)
+                yield line + b"\n"
+                index += 1
+    
+    log_event(log, 'batch_started')
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+def classification_body(category, confidence, bundle, index=None):
+    """JSON-ready result of /api/classify-profile for one profile"""
+    body = {
+        "success": True,
+        "category": workout_categories[category],
+        "categoryIndex": category,
+        "confidence": round(confidence, 2),
+        "modelInfo": {
+            "name": "Fitness CNN Model",
+            "version": "1.0",
+            "accuracy": "86%",
+            "modelVersion": bundle.cnn_version[:12],
+            "loadedAt": bundle.loaded_at
         }
+    }
+    if index is not None:
+        body["index"] = index
+    return body
+
+@app.route('/api/classify-profile', methods=['POST'])
+def classify_profile():
+    """Classify one user into one of the 9 plan categories with the CNN"""
+    
+    requests_total.inc(endpoint='classify-profile')
+    bundle = serving
+    if bundle.cnn_model is None:
+        model_not_loaded_total.inc(endpoint='classify-profile')
+        return jsonify({
+            "error": "CNN model not loaded. Please run cnn_serving.py first.",
+            "success": False
+        }), 500
+    
+    try:
+        profile = parse_profile(request.json)
+        row = profile_row(profile["age"], profile["weight"], profile["height"], profile["level"], profile["goal"])
+        if cnn_batcher is not None:
+            category, confidence = cnn_batcher.submit(row, bundle).result()
+        else:
+            category, confidence = classify_rows([row], bundle)[0]
         
-        print("✅ Workout plan generated successfully!")
-        
-        return jsonify(response)
+        log_event(log, 'profile_classified', age=profile["age"], fitness_level=profile["level"],
+                  goal=profile["goal"], category=workout_categories[category])
+        return jsonify(classification_body(category, confidence, bundle))
         
     except Exception as e:
-        print(f"❌ Error: {str(e)}")
+        errors_total.inc(endpoint='classify-profile')
+        log_event(log, 'classify_failed', logging.ERROR, error=str(e))
         return jsonify({
             "error": str(e),
             "success": False
         }), 500
 
+@app.route('/api/classify-profile/batch', methods=['POST'])
+def classify_profile_batch():
+    """
+    Classify many users in one request.
+
+    Same input and streaming as /api/predict-workout/batch; each chunk of
+    BATCH_CHUNK_SIZE profiles is one CNN call.
+    """
+    
+    requests_total.inc(endpoint='classify-profile-batch')
+    bundle = serving
+    if bundle.cnn_model is None:
+        model_not_loaded_total.inc(endpoint='classify-profile-batch')
+        return jsonify({
+            "error": "CNN model not loaded. Please run cnn_serving.py first.",
+            "success": False
+        }), 500
+    
+    try:
+        raw_profiles = read_batch_profiles(request)
+        first = list(itertools.islice(raw_profiles, 1))
+    except ValueError as e:
+        errors_total.inc(endpoint='classify-profile-batch')
+        return jsonify({"error": str(e), "success": False}), 400
+    
+    def generate():
+        profiles = itertools.chain(first, raw_profiles)
+        index = 0
+        while True:
+            chunk = list(itertools.islice(profiles, BATCH_CHUNK_SIZE))
+            if not chunk:
+                break
+            
+            rows = []
+            for item in chunk:
+                try:
+                    if isinstance(item, Exception):
+                        raise item
+                    p = parse_profile(item)
+                    rows.append(profile_row(p["age"], p["weight"], p["height"], p["level"], p["goal"]))
+                except Exception as e:
+                    rows.append(e)
+            
+            valid = [row for row in rows if not isinstance(row, Exception)]
+            results = iter(classify_rows(valid, bundle) if valid else [])
+            
+            for row in rows:
+                if isinstance(row, Exception):
+                    errors_total.inc(endpoint='classify-profile-batch')
+                    line = {"index": index, "error": str(row), "success": False}
+                else:
+                    line = classification_body(*next(results), bundle, index=index)
+                yield json.dumps(line).encode() + b"\n"
+                index += 1
+    
+    log_event(log, 'classify_batch_started')
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/admin/reload', methods=['POST'])
+def admin_reload():
+    """Load and warm the artifacts on disk in the background, then swap them in"""
+    if ADMIN_TOKEN is not None:
+        if request.headers.get('X-Admin-Token') != ADMIN_TOKEN:
+            return jsonify({"error": "Invalid admin token", "success": False}), 403
+    elif request.remote_addr not in ('127.0.0.1', '::1'):
+        return jsonify({"error": "Set ADMIN_TOKEN to reload from other hosts", "success": False}), 403
+    
+    if not start_reload():
+        return jsonify({"error": "A reload is already running", "success": False, "reload": reload_status}), 409
+    return jsonify({"success": True, "serving_version": serving.version, "reload": reload_status}), 202
+
+@app.before_request
+def start_artifact_watcher():
+    if watcher is not None:
+        watcher.ensure_started()
+
+@app.before_request
+def start_metrics_flusher():
+    metrics.ensure_flushing()
+
 @app.route('/health', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
+    """
+    Health check endpoint (503 until the model is loaded and warm). Status is
+    "unavailable" when no model artifact was found, which waiting will not fix.
+    """
+    bundle = serving
+    ready = bundle.model is not None and bundle.warmup["state"] == "warm"
+    if ready:
+        status = "healthy"
+    elif bundle.warmup["state"] == "unavailable":
+        status = "unavailable"
+    else:
+        status = "warming"
     return jsonify({
-        "status": "healthy",
-        "model_loaded": model is not None,
+        "status": status,
+        "model_loaded": bundle.model is not None,
+        "model_version": bundle.version,
+        "cnn_model_version": bundle.cnn_version,
+        "loaded_at": bundle.loaded_at,
+        "backend": MODEL_BACKEND,
+        "cnn_model_loaded": bundle.cnn_model is not None,
+        "plan_table_loaded": bundle.plan_table is not None,
+        "warmup": bundle.warmup,
+        "reload": reload_status,
         "message": "AI Fitness Model API is running!"
-    })
+    }), 200 if ready else 503
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus metrics, summed over all workers when METRICS_MULTIPROC_DIR is set"""
+    return Response(metrics.render(), content_type=METRICS_CONTENT_TYPE)
 
 if __name__ == '__main__':
     print("\n" + "="*60)
@@ -0,0 +1,342 @@
+"""
+NumPy Inference Engine
+Pure-NumPy forward pass for the fitness RNN model, so the API can serve
+without importing TensorFlow.
+
+Export the weights once from the trained Keras model:
+    python numpy_inference.py
+    python numpy_inference.py --stepwise   # stateful step-wise model
+"""
+
+import argparse
+import os
+import numpy as np
+
+from fitness_rnn_model import MODEL_PATH, STEPWISE_MODEL_PATH
+from columnar_dataset import RNN_DATASET_DIR, load_dataset, rnn_model_inputs
+
+WEIGHTS_PATH = 'fitness_rnn_weights.npz'
+DATASET_PATH = RNN_DATASET_DIR
+STEPWISE_WEIGHTS_PATH = 'fitness_rnn_stepwise_weights.npz'
+
+NUM_LSTM_LAYERS = 3
+NUM_HEAD_LAYERS = 3  # Dense(64) -> Dense(32) -> Dense(7, softmax)
+
+
+def sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def softmax(x):
+    e = np.exp(x - np.max(x, axis=-1, keepdims=True))
+    return e / np.sum(e, axis=-1, keepdims=True)
+
+
+def relu(x):
+    return np.maximum(x, 0.0)
+
+
+def lstm_step(x_proj, h, c, recurrent_kernel):
+    """One LSTM timestep given the input projection x @ kernel + bias"""
+    units = recurrent_kernel.shape[0]
+    z = x_proj + h @ recurrent_kernel
+    i = sigmoid(z[:, :units])
+    f = sigmoid(z[:, units:2 * units])
+    g = np.tanh(z[:, 2 * units:3 * units])
+    o = sigmoid(z[:, 3 * units:])
+    c = f * c + i * g
+    h = o * np.tanh(c)
+    return h, c
+
+
+def lstm_forward(x, kernel, recurrent_kernel, bias, return_sequences=False):
+    """
+    Run a Keras-compatible LSTM over a batch of sequences.
+
+    Gate order follows Keras: input, forget, cell, output.
+
+    Args:
+        x: (batch, timesteps, input_dim)
+        kernel: (input_dim, 4 * units)
+        recurrent_kernel: (units, 4 * units)
+        bias: (4 * units,)
+    """
+    batch, timesteps, _ = x.shape
+    units = recurrent_kernel.shape[0]
+    h = np.zeros((batch, units), dtype=x.dtype)
+    c = np.zeros((batch, units), dtype=x.dtype)
+
+    # Input projections for every timestep in one matmul
+    x_proj = x @ kernel + bias
+    outputs = []
+    for t in range(timesteps):
+        h, c = lstm_step(x_proj[:, t], h, c, recurrent_kernel)
+        if return_sequences:
+            outputs.append(h)
+
+    if return_sequences:
+        return np.stack(outputs, axis=1)
+    return h
+
+
+class NumpyRNNModel:
+    """
+    Inference-only copy of the model built by create_rnn_model(), or of
+    create_stepwise_training_model() when `stateful` is set.
+
+    A stateful model carries (h, c) for every LSTM layer from one day to the
+    next, so decode_week does one LSTM step per day instead of re-reading
+    the whole window.
+    """
+
+    def __init__(self, weights, stateful=False):
+        weights = dict(weights)
+        self.stateful = bool(weights.pop('stateful', stateful))
+        self.weights = {name: np.asarray(value, dtype=np.float32) for name, value in weights.items()}
+
+    @classmethod
+    def load(cls, path=WEIGHTS_PATH):
+        with np.load(path) as data:
+            return cls(dict(data))
+
+    def save(self, path=WEIGHTS_PATH):
+        np.savez(path, stateful=self.stateful, **self.weights)
+
+    def predict(self, inputs, verbose=0):
+        """
+        Same contract as keras Model.predict([seq_input, feat_input]).
+
+        A stateful model reads `seq_input` as the unpadded days so far and
+        returns the prediction for the day after the last one.
+        """
+        seq_input, feat_input = inputs
+        w = self.weights
+        tokens = np.asarray(seq_input).astype(np.int64)
+
+        if self.stateful:
+            states = self.initial_states(len(tokens))
+            for t in range(tokens.shape[1]):
+                x, states = self.step(tokens[:, t], states)
+            return self.head(x, self.features(feat_input))
+
+        x = w['embedding'][tokens]
+        for i in range(NUM_LSTM_LAYERS):
+            x = lstm_forward(
+                x,
+                w[f'lstm_{i}_kernel'],
+                w[f'lstm_{i}_recurrent_kernel'],
+                w[f'lstm_{i}_bias'],
+                return_sequences=i < NUM_LSTM_LAYERS - 1
+            )
+        return self.head(x, self.features(feat_input))
+
+    def features(self, feat_input):
+        """User-feature branch: Dense(32, relu) over [age, level, goal]"""
+        features = np.asarray(feat_input, dtype=np.float32)
+        return relu(features @ self.weights['features_kernel'] + self.weights['features_bias'])
+
+    def head(self, x, features):
+        """Dense head over the top LSTM output and the feature branch"""
+        w = self.weights
+        x = np.concatenate([x, features], axis=-1)
+        for i in range(NUM_HEAD_LAYERS):
+            x = x @ w[f'head_{i}_kernel'] + w[f'head_{i}_bias']
+            x = relu(x) if i < NUM_HEAD_LAYERS - 1 else softmax(x)
+        return x
+
+    def initial_states(self, batch):
+        """Zero (h, c) for every LSTM layer"""
+        states = []
+        for i in range(NUM_LSTM_LAYERS):
+            units = self.weights[f'lstm_{i}_recurrent_kernel'].shape[0]
+            states.append((np.zeros((batch, units), dtype=np.float32),
+                           np.zeros((batch, units), dtype=np.float32)))
+        return states
+
+    def step(self, tokens, states):
+        """Feed one day through every LSTM layer; returns (top h, new states)"""
+        w = self.weights
+        x = w['embedding'][np.asarray(tokens).astype(np.int64)]
+        new_states = []
+        for i, (h, c) in enumerate(states):
+            h, c = lstm_step(x @ w[f'lstm_{i}_kernel'] + w[f'lstm_{i}_bias'], h, c,
+                             w[f'lstm_{i}_recurrent_kernel'])
+            new_states.append((h, c))
+            x = h
+        return x, new_states
+
+    def decode_week(self, seed, features, days=7, window=6):
+        """
+        NumPy twin of the exported week decoder (see build_week_decoder).
+        Stateful models ignore `window`: each day is fed exactly once.
+
+        Returns {'week': (batch, days) ints, 'confidence': (batch, days)}.
+        """
+        if not self.stateful:
+            return greedy_decode(self.predict, seed, features, days, window)
+
+        seed = np.asarray(seed, dtype=np.int32)
+        features = self.features(features)
+        batch, seed_len = seed.shape
+
+        week = np.zeros((batch, days), dtype=np.int32)
+        confidence = np.ones((batch, days), dtype=np.float32)
+        week[:, :seed_len] = seed
+
+        states = self.initial_states(batch)
+        for day in range(1, days):
+            x, states = self.step(week[:, day - 1], states)
+            if day >= seed_len:  # The head only runs for predicted days
+                prediction = self.head(x, features)
+                week[:, day] = np.argmax(prediction, axis=-1)
+                confidence[:, day] = np.max(prediction, axis=-1)
+
+        return {'week': week, 'confidence': confidence}
+
+
+def greedy_decode(predict, seed, features, days=7, window=6):
+    """
+    Complete weeks one day at a time with any Keras-style predict function,
+    feeding the model the same right-zero-padded window as the API.
+    """
+    seed = np.asarray(seed, dtype=np.int32)
+    features = np.asarray(features, dtype=np.float32)
+    batch, seed_len = seed.shape
+
+    week = np.zeros((batch, days), dtype=np.int32)
+    confidence = np.ones((batch, days), dtype=np.float32)
+    week[:, :seed_len] = seed
+
+    for day in range(seed_len, days):
+        # Positions >= day are still zero, which is the right padding
+        start = max(0, day - window)
+        prediction = predict([week[:, start:start + window].astype(np.float32), features])
+        week[:, day] = np.argmax(prediction, axis=-1)
+        confidence[:, day] = np.max(prediction, axis=-1)
+
+    return {'week': week, 'confidence': confidence}
+
+
+def beam_decode(predict, seed, features, beam_width=3, days=7, window=6):
+    """
+    Top `beam_width` distinct weeks per user by beam search over the softmax.
+
+    Every live beam of every user is expanded in one predict() call per day,
+    so K alternatives cost one batched pass rather than K greedy runs.
+    With window=None the model gets the unpadded days so far (stateful models).
+
+    Returns {'week': (batch, K, days) ints, 'confidence': (batch, K, days),
+             'score': (batch, K) summed log-probabilities}, best beam first.
+    """
+    seed = np.asarray(seed, dtype=np.int32)
+    features = np.asarray(features, dtype=np.float32)
+    batch, seed_len = seed.shape
+    rows = np.arange(batch)[:, None]
+
+    week = np.zeros((batch, 1, days), dtype=np.int32)
+    confidence = np.ones((batch, 1, days), dtype=np.float32)
+    score = np.zeros((batch, 1), dtype=np.float64)
+    week[:, 0, :seed_len] = seed
+
+    for day in range(seed_len, days):
+        beams = week.shape[1]
+        flat = week.reshape(batch * beams, days)
+        if window is None:
+            seq_input = flat[:, :day]
+        else:
+            start = max(0, day - window)
+            seq_input = flat[:, start:start + window]
+        prediction = predict([seq_input.astype(np.float32), np.repeat(features, beams, axis=0)])
+        prediction = np.asarray(prediction).reshape(batch, beams, -1)
+
+        # Every (beam, next workout) pair, ranked per user
+        candidates = (score[:, :, None] + np.log(np.maximum(prediction, 1e-12))).reshape(batch, -1)
+        top = np.argsort(-candidates, axis=1, kind='stable')[:, :beam_width]
+        parent, token = np.divmod(top, prediction.shape[-1])
+
+        week = week[rows, parent]
+        confidence = confidence[rows, parent]
+        week[:, :, day] = token
+        confidence[:, :, day] = prediction[rows, parent, token]
+        score = candidates[rows, top]
+
+    return {'week': week, 'confidence': confidence, 'score': score}
+
+
+def extract_rnn_weights(model):
+    """Pull the Keras layer weights into the flat dict NumpyRNNModel expects"""
+    weights = {}
+    lstm_layers = [layer for layer in model.layers if layer.__class__.__name__ == 'LSTM']
+    dense_layers = [layer for layer in model.layers if layer.__class__.__name__ == 'Dense']
+    embedding = [layer for layer in model.layers if layer.__class__.__name__ == 'Embedding'][0]
+
+    weights['embedding'] = embedding.get_weights()[0]
+
+    for i, layer in enumerate(lstm_layers):
+        kernel, recurrent_kernel, bias = layer.get_weights()
+        weights[f'lstm_{i}_kernel'] = kernel
+        weights[f'lstm_{i}_recurrent_kernel'] = recurrent_kernel
+        weights[f'lstm_{i}_bias'] = bias
+
+    # The user-feature branch is the only Dense fed by the 3 raw features
+    head_index = 0
+    for layer in dense_layers:
+        kernel, bias = layer.get_weights()
+        if kernel.shape[0] == 3:
+            weights['features_kernel'] = kernel
+            weights['features_bias'] = bias
+        else:
+            weights[f'head_{head_index}_kernel'] = kernel
+            weights[f'head_{head_index}_bias'] = bias
+            head_index += 1
+
+    return weights
+
+
+def load_rnn_holdout(path=DATASET_PATH, rows=500, with_labels=False):
+    """Last `rows` samples of the RNN dataset as (seq_input, feat_input[, labels])"""
+    seq_input, feat_input, labels = rnn_model_inputs(load_dataset(path), slice(-rows, None))
+    if with_labels:
+        return seq_input, feat_input, labels
+    return seq_input, feat_input
+
+
+def check_against_keras(keras_model, engine, seq_input, feat_input, atol=1e-5):
+    """Compare NumPy and Keras softmax outputs, returning the max abs difference"""
+    expected = keras_model.predict([seq_input, feat_input], verbose=0)
+    if expected.ndim == 3:
+        # Step-wise training model: one prediction per position, compare the last
+        expected = expected[:, -1]
+    actual = engine.predict([seq_input, feat_input])
+    max_diff = float(np.max(np.abs(expected - actual)))
+    agreement = float(np.mean(np.argmax(expected, axis=-1) == np.argmax(actual, axis=-1)))
+
+    if max_diff > atol:
+        raise AssertionError(f"NumPy engine differs from Keras by {max_diff:.2e} (tolerance {atol:.0e})")
+    return max_diff, agreement
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export the RNN weights for NumPy inference')
+    parser.add_argument('--stepwise', action='store_true',
+                        help=f"export the stateful step-wise model ({STEPWISE_MODEL_PATH})")
+    args = parser.parse_args()
+    model_path = STEPWISE_MODEL_PATH if args.stepwise else MODEL_PATH
+    weights_path = STEPWISE_WEIGHTS_PATH if args.stepwise else WEIGHTS_PATH
+
+    from tensorflow import keras
+
+    print("=" * 60)
+    print("EXPORTING RNN WEIGHTS FOR NUMPY INFERENCE")
+    print("=" * 60)
+
+    keras_model = keras.models.load_model(model_path)
+    engine = NumpyRNNModel(extract_rnn_weights(keras_model), stateful=args.stepwise)
+    engine.save(weights_path)
+    print(f"✅ Weights saved as '{weights_path}' ({os.path.getsize(weights_path) / 1024:.1f} KB)")
+
+    seq_input, feat_input = load_rnn_holdout()
+    max_diff, agreement = check_against_keras(keras_model, engine, seq_input, feat_input)
+    print(f"✅ Matches Keras on {len(seq_input)} held-out rows")
+    print(f"   Max abs difference: {max_diff:.2e}")
+    print(f"   Argmax agreement: {agreement * 100:.2f}%")
@@ -0,0 +1,153 @@
+"""
+Precomputed Plan Table
+Every week the RNN can produce for (age, level, goal), built offline in one
+batched model pass so the API can answer by lookup instead of inference.
+
+A table is tied to the digest of the artifacts it was decoded from
+(model_api.rnn_artifact_paths() of one backend), so build it with the same
+MODEL_BACKEND the API serves, and again whenever those artifacts change:
+    python plan_table.py
+    MODEL_BACKEND=numpy python plan_table.py
+"""
+
+import hashlib
+import os
+from datetime import datetime
+import numpy as np
+
+PLAN_TABLE_PATH = 'fitness_plan_table.npz'
+TABLE_FORMAT_VERSION = 2  # 2: model_hash is the backend artifact digest, plus backend
+
+# Ages outside this range fall back to the live model
+AGE_MIN = 10
+AGE_MAX = 100
+NUM_LEVELS = 3
+NUM_GOALS = 3
+
+
+def file_sha256(path):
+    """Hex digest of a model artifact, used to tie a table to its model"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def artifacts_sha256(paths):
+    """
+    One digest over the files in `paths` that exist (None if none do), so a
+    change to any artifact a backend serves from changes the version.
+    """
+    digest = hashlib.sha256()
+    found = False
+    for path in paths:
+        if os.path.exists(path):
+            digest.update(f"{os.path.basename(path)}:{file_sha256(path)}\n".encode())
+            found = True
+    return digest.hexdigest() if found else None
+
+
+class PlanTable:
+    """Weeks and confidences indexed by [age - age_min, level, goal]"""
+
+    def __init__(self, weeks, confidences, age_min, model_hash, created_at='', backend=''):
+        self.weeks = weeks
+        self.confidences = confidences
+        self.age_min = age_min
+        self.age_max = age_min + weeks.shape[0] - 1
+        self.model_hash = model_hash
+        self.created_at = created_at
+        self.backend = backend
+
+    def __len__(self):
+        return int(np.prod(self.weeks.shape[:3]))
+
+    def lookup(self, age, level, goal):
+        """Return (week, confidences) lists, or None when age is out of range"""
+        if not self.age_min <= age <= self.age_max:
+            return None
+        index = (age - self.age_min, level, goal)
+        return self.weeks[index].tolist(), self.confidences[index].astype(np.float32).tolist()
+
+    def save(self, path=PLAN_TABLE_PATH):
+        np.savez_compressed(
+            path,
+            format_version=np.array(TABLE_FORMAT_VERSION),
+            model_hash=np.array(self.model_hash),
+            created_at=np.array(self.created_at),
+            backend=np.array(self.backend),
+            age_min=np.array(self.age_min),
+            weeks=self.weeks,
+            confidences=self.confidences
+        )
+
+    @classmethod
+    def load(cls, path=PLAN_TABLE_PATH):
+        with np.load(path) as data:
+            version = int(data['format_version'])
+            if version != TABLE_FORMAT_VERSION:
+                raise ValueError(f"Unsupported plan table format {version} (expected {TABLE_FORMAT_VERSION})")
+            return cls(
+                weeks=data['weeks'],
+                confidences=data['confidences'],
+                age_min=int(data['age_min']),
+                model_hash=str(data['model_hash']),
+                created_at=str(data['created_at']),
+                backend=str(data['backend'])
+            )
+
+
+def build_plan_table(decode_weeks, initial_sequence, user_features, model_hash, backend='',
+                     age_min=AGE_MIN, age_max=AGE_MAX):
+    """
+    Enumerate every (age, level, goal) and decode all weeks in one batch.
+
+    Args:
+        decode_weeks: batched decoder, (seeds, features) -> (weeks, confidences)
+        initial_sequence: (level, goal) -> 2-day seed
+        user_features: (age, level, goal) -> normalized feature row
+        model_hash: artifact digest of the model that produced the table
+        backend: MODEL_BACKEND the model was served with
+    """
+    ages = range(age_min, age_max + 1)
+    grid = [(age, level, goal) for age in ages for level in range(NUM_LEVELS) for goal in range(NUM_GOALS)]
+
+    seeds = [initial_sequence(level, goal) for _, level, goal in grid]
+    features = [user_features(age, level, goal) for age, level, goal in grid]
+    weeks, confidences = decode_weeks(seeds, features)
+
+    shape = (len(ages), NUM_LEVELS, NUM_GOALS, -1)
+    return PlanTable(
+        weeks=np.asarray(weeks, dtype=np.uint8).reshape(shape),
+        confidences=np.asarray(confidences, dtype=np.float16).reshape(shape),
+        age_min=age_min,
+        model_hash=model_hash,
+        created_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        backend=backend
+    )
+
+
+if __name__ == '__main__':
+    import model_api
+
+    print("=" * 60)
+    print("BUILDING PRECOMPUTED PLAN TABLE")
+    print("=" * 60)
+
+    model_api.load_model()
+    bundle = model_api.serving
+    if bundle.model is None:
+        raise SystemExit("❌ No model loaded, cannot build the plan table")
+
+    table = build_plan_table(
+        lambda seeds, features: model_api.decode_weeks(seeds, features, bundle),
+        model_api.get_initial_sequence,
+        model_api.user_features,
+        bundle.version,
+        model_api.MODEL_BACKEND
+    )
+    table.save(PLAN_TABLE_PATH)
+
+    print(f"✅ {len(table)} weeks for ages {table.age_min}-{table.age_max} ({table.backend} backend)")
+    print(f"✅ Plan table saved as '{PLAN_TABLE_PATH}' ({os.path.getsize(PLAN_TABLE_PATH) / 1024:.1f} KB)")
@@ -0,0 +1,253 @@
+"""
+Post-training quantization with an accuracy regression gate
+Builds float16, dynamic-range int8 and full-integer int8 TFLite variants of
+the RNN, the CNN and the served CNN with the scaler folded in
+(fitness_cnn_serving.h5, see cnn_serving.py), calibrated on rows drawn from
+the training datasets, and only keeps an artifact if it stays close to the
+float32 Keras model on a fixed evaluation set.
+
+Usage:
+    python quantize_models.py
+    python quantize_models.py --modes float16 dynamic --max-accuracy-drop 0.005
+    python quantize_models.py --models cnn_serving
+
+Gate (per model and mode):
+    * top-1 accuracy on the evaluation rows may drop at most --max-accuracy-drop
+    * plan agreement with the float model must be at least --min-plan-agreement
+      (RNN: identical 7-day weeks for every age/level/goal; CNN: same category)
+"""
+
+import argparse
+import json
+import os
+import pickle
+import sys
+import numpy as np
+
+from export_tflite import (
+    convert_to_tflite, load_cnn_holdout, RNN_MODEL_PATH, CNN_MODEL_PATH,
+    CNN_SCALER_PATH, CNN_DATASET_PATH, RNN_INPUT_NAMES, RNN_INPUT_SHAPES
+)
+from cnn_serving import CNN_SERVING_PATH, load_cnn_profiles
+from numpy_inference import load_rnn_holdout, greedy_decode, DATASET_PATH as RNN_DATASET_PATH
+from tflite_inference import TFLiteModel
+from columnar_dataset import load_dataset, rnn_model_inputs, cnn_profile_rows
+from training_data import workout_patterns
+
+QUANTIZATION_MODES = ('float16', 'dynamic', 'int8')
+MODELS = ('rnn', 'cnn', 'cnn_serving')
+REPORT_PATH = 'quantization_report.json'
+
+# Ages used for the weekly-plan agreement check
+PLAN_AGES = range(18, 65)
+
+
+def quantized_path(model_path, mode):
+    return model_path.replace('.h5', f'_{mode}.tflite')
+
+
+def rnn_representative_data(rows=500):
+    """Calibration batches from the start of the RNN dataset (disjoint from the eval rows)"""
+    seq_input, feat_input, _ = rnn_model_inputs(load_dataset(RNN_DATASET_PATH), slice(rows))
+    for seq, feat in zip(seq_input.astype(np.float32), feat_input):
+        yield [seq[None], feat[None]]
+
+
+def cnn_representative_data(rows=500):
+    """Calibration batches from the start of the CNN dataset, scaled like training"""
+    features, _ = cnn_profile_rows(load_dataset(CNN_DATASET_PATH), slice(rows))
+    with open(CNN_SCALER_PATH, 'rb') as f:
+        scaler = pickle.load(f)
+    for row in scaler.transform(features).reshape(-1, 1, 5, 1, 1).astype(np.float32):
+        yield [row]
+
+
+def cnn_serving_representative_data(rows=500):
+    """Calibration batches of raw profile rows, for the CNN with the scaler folded in"""
+    features, _ = cnn_profile_rows(load_dataset(CNN_DATASET_PATH), slice(rows))
+    for row in features.reshape(-1, 1, 5).astype(np.float32):
+        yield [row]
+
+
+def quantize(keras_model, mode, representative_data, input_shapes=None):
+    """TFLite flatbuffer of `keras_model` quantized with `mode`"""
+    import tensorflow as tf
+
+    if mode == 'float16':
+        return convert_to_tflite(
+            keras_model, optimizations=[tf.lite.Optimize.DEFAULT], supported_types=[tf.float16],
+            input_shapes=input_shapes)
+    if mode == 'dynamic':
+        return convert_to_tflite(keras_model, optimizations=[tf.lite.Optimize.DEFAULT], input_shapes=input_shapes)
+    if mode == 'int8':
+        # Full-integer: int8 kernels only (conversion fails rather than falling
+        # back to float ops) and int8 inputs/outputs, which TFLiteModel
+        # quantizes and dequantizes with the tensors' scale and zero point
+        return convert_to_tflite(
+            keras_model,
+            optimizations=[tf.lite.Optimize.DEFAULT],
+            representative_dataset=representative_data,
+            supported_ops=[tf.lite.OpsSet.TFLITE_BUILTINS_INT8],
+            inference_input_type=tf.int8,
+            inference_output_type=tf.int8,
+            input_shapes=input_shapes
+        )
+    raise ValueError(f"Unknown quantization mode: {mode}")
+
+
+def remove_artifact(path):
+    """Drop an artifact accepted by an earlier run, so what is on disk matches this report"""
+    if os.path.exists(path):
+        os.remove(path)
+        print(f"   Removed previously accepted '{path}'")
+
+
+def plan_inputs():
+    """Seeds and features for every (age, level, goal) the API can serve"""
+    grid = [(age, level, goal) for age in PLAN_AGES for (level, goal) in sorted(workout_patterns)]
+    seeds = [workout_patterns[(level, goal)] for _, level, goal in grid]
+    features = [[age / 100.0, level / 2.0, goal / 2.0] for age, level, goal in grid]
+    return seeds, features
+
+
+def evaluate_rnn(keras_model, candidate, eval_set, plans):
+    seq_input, feat_input, labels = eval_set
+    reference = keras_model.predict([seq_input, feat_input], verbose=0)
+    actual = candidate.predict([seq_input, feat_input])
+
+    seeds, features = plans
+    reference_weeks = greedy_decode(lambda x: keras_model.predict(x, verbose=0), seeds, features)['week']
+    candidate_weeks = greedy_decode(candidate.predict, seeds, features)['week']
+
+    return {
+        'reference_accuracy': float(np.mean(np.argmax(reference, -1) == labels)),
+        'accuracy': float(np.mean(np.argmax(actual, -1) == labels)),
+        'plan_agreement': float(np.mean(np.all(reference_weeks == candidate_weeks, axis=1))),
+    }
+
+
+def evaluate_cnn(keras_model, candidate, eval_set):
+    inputs, labels = eval_set
+    reference = np.argmax(keras_model.predict(inputs, verbose=0), -1)
+    actual = np.argmax(candidate.predict(inputs), -1)
+    return {
+        'reference_accuracy': float(np.mean(reference == labels)),
+        'accuracy': float(np.mean(actual == labels)),
+        'plan_agreement': float(np.mean(reference == actual)),
+    }
+
+
+def passes_gate(result, max_accuracy_drop, min_plan_agreement):
+    accuracy_drop = result['reference_accuracy'] - result['accuracy']
+    return accuracy_drop <= max_accuracy_drop and result['plan_agreement'] >= min_plan_agreement
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Quantize the fitness models behind an accuracy gate')
+    parser.add_argument('--models', nargs='+', choices=MODELS, default=list(MODELS))
+    parser.add_argument('--modes', nargs='+', choices=QUANTIZATION_MODES, default=list(QUANTIZATION_MODES))
+    parser.add_argument('--max-accuracy-drop', type=float, default=0.01,
+                        help='largest allowed top-1 accuracy drop (absolute, default 0.01)')
+    parser.add_argument('--min-plan-agreement', type=float, default=0.99,
+                        help='smallest allowed fraction of plans identical to the float model')
+    parser.add_argument('--eval-rows', type=int, default=500)
+    args = parser.parse_args()
+
+    from tensorflow import keras
+
+    print("=" * 60)
+    print("POST-TRAINING QUANTIZATION")
+    print("=" * 60)
+
+    # The RNN is converted at a fixed batch size (see export_tflite.py)
+    models = {
+        'rnn': {
+            'path': RNN_MODEL_PATH,
+            'representative_data': rnn_representative_data,
+            'input_names': RNN_INPUT_NAMES,
+            'input_shapes': RNN_INPUT_SHAPES,
+        },
+        'cnn': {
+            'path': CNN_MODEL_PATH,
+            'representative_data': cnn_representative_data,
+            'input_names': None,
+            'input_shapes': None,
+        },
+        'cnn_serving': {
+            'path': CNN_SERVING_PATH,
+            'representative_data': cnn_serving_representative_data,
+            'input_names': None,
+            'input_shapes': None,
+        },
+    }
+    models = {name: models[name] for name in args.models}
+    for spec in models.values():
+        spec['keras'] = keras.models.load_model(spec['path'])
+
+    if 'rnn' in models:
+        rnn_eval = load_rnn_holdout(rows=args.eval_rows, with_labels=True)
+        rnn_eval = (rnn_eval[0].astype(np.float32),) + rnn_eval[1:]
+        plans = plan_inputs()
+    eval_sets = {}
+    if 'cnn' in models:
+        eval_sets['cnn'] = load_cnn_holdout(rows=args.eval_rows)
+    if 'cnn_serving' in models:
+        eval_sets['cnn_serving'] = load_cnn_profiles(rows=args.eval_rows)
+
+    report = {'max_accuracy_drop': args.max_accuracy_drop, 'min_plan_agreement': args.min_plan_agreement,
+              'results': []}
+    rejected = 0
+
+    for name, spec in models.items():
+        for mode in args.modes:
+            path = quantized_path(spec['path'], mode)
+            try:
+                flatbuffer = quantize(spec['keras'], mode, spec['representative_data'], spec['input_shapes'])
+            except Exception as e:
+                print(f"\n⚠️ {name.upper()} {mode}: conversion failed ({e})")
+                report['results'].append({'model': name, 'mode': mode, 'status': 'conversion_failed',
+                                          'error': str(e)})
+                remove_artifact(path)
+                rejected += 1
+                continue
+
+            # Evaluate from a temporary file so rejected builds never land at `path`
+            candidate_path = path + '.candidate'
+            with open(candidate_path, 'wb') as f:
+                f.write(flatbuffer)
+            candidate = TFLiteModel(candidate_path, input_names=spec['input_names'])
+
+            if name == 'rnn':
+                result = evaluate_rnn(spec['keras'], candidate, rnn_eval, plans)
+            else:
+                result = evaluate_cnn(spec['keras'], candidate, eval_sets[name])
+
+            accepted = passes_gate(result, args.max_accuracy_drop, args.min_plan_agreement)
+            if accepted:
+                os.replace(candidate_path, path)
+            else:
+                os.remove(candidate_path)
+                rejected += 1
+
+            result.update(model=name, mode=mode, size_kb=round(len(flatbuffer) / 1024, 1),
+                          status='accepted' if accepted else 'rejected', path=path if accepted else None)
+            report['results'].append(result)
+
+            print(f"\n{'✅' if accepted else '❌'} {name.upper()} {mode} ({result['size_kb']} KB)")
+            print(f"   Accuracy: {result['accuracy'] * 100:.2f}% "
+                  f"(float32: {result['reference_accuracy'] * 100:.2f}%)")
+            print(f"   Plan agreement: {result['plan_agreement'] * 100:.2f}%")
+            print(f"   {'Saved as ' + path if accepted else 'Rejected by the accuracy gate'}")
+            if not accepted:
+                remove_artifact(path)
+
+    with open(REPORT_PATH, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Report saved as '{REPORT_PATH}'")
+
+    if rejected:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
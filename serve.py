@@ -0,0 +1,125 @@
+"""
+Production server for the Flask model API
+Pre-fork gunicorn workers sharing the model that is loaded once in the parent.
+The keras backend is the exception: TensorFlow's runtime and thread pools do
+not survive fork, so each worker loads its own copy after forking.
+
+Usage:
+    python serve.py --workers 4 --threads 4 --intra-op-threads 1 --inter-op-threads 1
+
+`python model_api.py` stays the local debug server; use this for deployments
+and benchmarks (see benchmark_api.py).
+"""
+
+import argparse
+import gc
+import os
+import tempfile
+
+
+def parse_args():
+    cpu_count = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description='Run the model API with pre-forked workers')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=cpu_count,
+                        help='worker processes (default: one per core)')
+    parser.add_argument('--threads', type=int, default=4,
+                        help='request threads per worker')
+    parser.add_argument('--intra-op-threads', type=int, default=1,
+                        help='TensorFlow/BLAS threads per op, per worker')
+    parser.add_argument('--inter-op-threads', type=int, default=1,
+                        help='TensorFlow ops run in parallel, per worker')
+    parser.add_argument('--timeout', type=int, default=30,
+                        help='seconds before a silent worker is restarted')
+    parser.add_argument('--metrics-dir',
+                        help='directory where workers share metric snapshots for /metrics (default: a new temp dir)')
+    parser.add_argument('--no-preload', dest='preload', action='store_false',
+                        help='load the model in every worker instead of once in the parent '
+                             '(always the case for the keras backend)')
+    return parser.parse_args()
+
+
+def limit_threads(intra_op_threads, inter_op_threads):
+    """Cap per-worker thread pools so workers x threads does not oversubscribe cores"""
+    # Read by TensorFlow and the BLAS libraries when they first initialize
+    os.environ['TF_NUM_INTRAOP_THREADS'] = str(intra_op_threads)
+    os.environ['TF_NUM_INTEROP_THREADS'] = str(inter_op_threads)
+    for var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ[var] = str(intra_op_threads)
+
+
+def load_in_worker(intra_op_threads, inter_op_threads):
+    """post_worker_init hook: set up TensorFlow (keras backend) and load the model in this worker"""
+    import model_api
+
+    if model_api.MODEL_BACKEND == 'keras':
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+        tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+    model_api.load_model()
+
+
+def main():
+    args = parse_args()
+    limit_threads(args.intra_op_threads, args.inter_op_threads)
+
+    # Every worker serves /metrics on the same port, so they aggregate through
+    # snapshot files (read by api_metrics when model_api is imported)
+    from api_metrics import clear_multiproc_dir
+    metrics_dir = args.metrics_dir or tempfile.mkdtemp(prefix='model-api-metrics-')
+    clear_multiproc_dir(metrics_dir)
+    os.environ['METRICS_MULTIPROC_DIR'] = metrics_dir
+
+    # Imported after the thread limits so NumPy/TensorFlow pick them up
+    import model_api
+    from gunicorn.app.base import BaseApplication
+
+    class ModelAPIServer(BaseApplication):
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return model_api.app
+
+    options = {
+        'bind': f'{args.host}:{args.port}',
+        'workers': args.workers,
+        'threads': args.threads,
+        'worker_class': 'gthread',
+        'timeout': args.timeout,
+    }
+
+    # Never initialize TensorFlow in the master: forked workers can hang in it
+    preload = args.preload and model_api.MODEL_BACKEND != 'keras'
+    options['preload_app'] = preload
+    if preload:
+        model_api.load_model()
+        # Warm-up timings would otherwise be inherited, and summed, by every worker
+        model_api.metrics.reset()
+        # Keep the garbage collector from writing to the shared model pages
+        gc.freeze()
+    else:
+        options['post_worker_init'] = lambda worker: load_in_worker(args.intra_op_threads, args.inter_op_threads)
+
+    print("\n" + "="*60)
+    print("🤖 AI FITNESS MODEL API (production)")
+    print("="*60)
+    print(f"📡 Listening on http://{args.host}:{args.port}")
+    print(f"   Workers: {args.workers} x {args.threads} threads")
+    print(f"   Op threads per worker: intra={args.intra_op_threads}, inter={args.inter_op_threads}")
+    print(f"   Metrics aggregated across workers in {metrics_dir}")
+    print(f"   Model loaded {'once in the parent' if preload else 'in each worker'} "
+          f"({model_api.MODEL_BACKEND} backend)")
+    print("="*60 + "\n")
+
+    ModelAPIServer(options).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+Multi-process Sharded Dataset Generation
+Fans dataset generation out over a process pool, one columnar shard per task
+(see columnar_dataset.py). Shard i draws from its own child seed,
+SeedSequence(seed, spawn_key=(i,)), so its rows depend only on (seed, i, its
+row count, chunk size) - not on generation order or the number of workers.
+
+manifest.json next to the shards records those parameters plus every shard's
+row count and per-file SHA-256, so a single shard can be verified or
+regenerated on its own.
+
+Usage (generate_datasets.py --shards N writes sharded datasets):
+    python sharded_generation.py rnn_training_dataset --verify
+    python sharded_generation.py rnn_training_dataset --regenerate 3 7
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+
+from columnar_dataset import (
+    CNN_COLUMNS, RNN_COLUMNS, ColumnarWriter, clear_dataset, load_columns, shard_path
+)
+from plan_table import file_sha256
+from synthetic_data import generate_cnn_chunk, generate_rnn_chunk, iter_chunks
+
+MANIFEST_FILE = 'manifest.json'
+
+# kind -> (chunk generator, columns, label column used for class counts)
+KINDS = {
+    'rnn': (generate_rnn_chunk, RNN_COLUMNS, lambda chunk: chunk['workouts'][:, 6]),
+    'cnn': (generate_cnn_chunk, CNN_COLUMNS, lambda chunk: chunk['category']),
+}
+
+
+def shard_seed(seed, index):
+    """Independent child seed of shard `index`"""
+    return np.random.SeedSequence(seed, spawn_key=(index,))
+
+
+def shard_rows(rows, shards):
+    bounds = np.linspace(0, rows, shards + 1).astype(int)
+    return [int(n) for n in np.diff(bounds)]
+
+
+def shard_checksums(path, columns):
+    return {f'{name}.npy': file_sha256(os.path.join(path, f'{name}.npy')) for name in columns}
+
+
+def generate_shard(kind, path, index, rows, seed, chunk_size, names=None):
+    """
+    Write shard `index` of a dataset; runs in a pool worker.
+
+    Returns (manifest entry, seconds).
+    """
+    generate, columns, label_of = KINDS[kind]
+    start = time.perf_counter()
+
+    directory = shard_path(path, index)
+    writer = ColumnarWriter(directory, columns, rows, names)
+    label_counts = np.zeros(9, dtype=np.int64)
+    for chunk in iter_chunks(generate, rows, chunk_size, seed=shard_seed(seed, index)):
+        writer.write(chunk)
+        label_counts += np.bincount(label_of(chunk), minlength=9)
+    writer.close()
+
+    entry = {
+        'index': index,
+        'path': os.path.basename(directory),
+        'rows': rows,
+        'label_counts': label_counts.tolist(),
+        'checksums': shard_checksums(directory, columns),
+    }
+    return entry, time.perf_counter() - start
+
+
+def generate_sharded(kind, path, rows, shards, seed=42, chunk_size=1_000_000, names=None, workers=None):
+    """
+    Generate a dataset as `shards` shards on `workers` processes and write its manifest.
+
+    Returns (manifest, wall seconds).
+    """
+    clear_dataset(path)
+    start = time.perf_counter()
+
+    # Default start method (spawn on Windows and macOS): tasks are plain
+    # picklable arguments, and generate_datasets.py guards its script body
+    entries = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(generate_shard, kind, path, index, n, seed, chunk_size, names)
+            for index, n in enumerate(shard_rows(rows, shards))
+        ]
+        for future in as_completed(futures):
+            entry, seconds = future.result()
+            entries.append(entry)
+            print(f"  ✓ {kind} {entry['path']}: {entry['rows']:,} rows in {seconds:.2f}s "
+                  f"({entry['rows'] / seconds:,.0f} rows/sec)")
+
+    manifest = {
+        'kind': kind,
+        'rows': rows,
+        'num_shards': shards,
+        'seed': seed,
+        'chunk_size': chunk_size,
+        'names': names or {},
+        'shards': sorted(entries, key=lambda entry: entry['index']),
+    }
+    with open(os.path.join(path, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest, time.perf_counter() - start
+
+
+def load_manifest(path):
+    with open(os.path.join(path, MANIFEST_FILE)) as f:
+        return json.load(f)
+
+
+def verify_shards(path):
+    """Indices of shards whose files no longer match the manifest checksums"""
+    manifest = load_manifest(path)
+    _, columns, _ = KINDS[manifest['kind']]
+    bad = []
+    for entry in manifest['shards']:
+        directory = os.path.join(path, entry['path'])
+        try:
+            if shard_checksums(directory, columns) != entry['checksums']:
+                bad.append(entry['index'])
+        except FileNotFoundError:
+            bad.append(entry['index'])
+    return bad
+
+
+def regenerate_shard(path, index):
+    """Rewrite one shard from the manifest parameters; True if it matches the recorded checksums"""
+    manifest = load_manifest(path)
+    entry = manifest['shards'][index]
+    regenerated, _ = generate_shard(
+        manifest['kind'], path, index, entry['rows'], manifest['seed'], manifest['chunk_size'], manifest['names'])
+    return regenerated['checksums'] == entry['checksums']
+
+
+def shard_sample(path, rows=100):
+    """First `rows` rows of shard 0, for the sample CSVs"""
+    columns = load_columns(shard_path(path, 0))
+    return {name: np.asarray(column[:rows]) for name, column in columns.items()}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Verify or regenerate shards of a sharded dataset')
+    parser.add_argument('dataset', help='dataset directory with a manifest.json')
+    parser.add_argument('--verify', action='store_true', help='check every shard against the manifest')
+    parser.add_argument('--regenerate', type=int, nargs='+', default=[], metavar='INDEX')
+    args = parser.parse_args()
+
+    for index in args.regenerate:
+        ok = regenerate_shard(args.dataset, index)
+        print(f"{'✅' if ok else '❌'} Regenerated shard {index}: "
+              f"{'matches the manifest' if ok else 'checksums differ from the manifest'}")
+
+    if args.verify:
+        bad = verify_shards(args.dataset)
+        if bad:
+            print(f"❌ Shards not matching the manifest: {bad}")
+            print(f"   Fix with: python sharded_generation.py {args.dataset} --regenerate {' '.join(map(str, bad))}")
+            raise SystemExit(1)
+        print(f"✅ All {load_manifest(args.dataset)['num_shards']} shards match the manifest")
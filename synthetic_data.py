@@ -0,0 +1,102 @@
+"""
+Vectorized Synthetic Data Generators
+Produces the CNN and RNN training rows as NumPy arrays, a chunk at a time,
+so tens of millions of rows can be generated with bounded memory.
+
+Every generator takes a numpy Generator (np.random.default_rng) and returns
+a dict of equally long column arrays.
+"""
+
+import time
+import numpy as np
+
+from fitness_rnn_model import generate_workout_sequence, workout_names
+
+fitness_levels = ['Beginner', 'Intermediate', 'Advanced']
+goals = ['Weight Loss', 'Muscle Gain', 'General Fitness']
+
+# Base week for every (level, goal), indexed by level * 3 + goal
+BASE_PATTERNS = np.array(
+    [generate_workout_sequence(level, goal) for level in range(3) for goal in range(3)],
+    dtype=np.uint8
+)
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+MUTATION_RATE = 0.1  # Chance that any single day is replaced by a random workout
+
+
+def generate_rnn_chunk(rng, rows, age_range=(18, 65), mutation_rate=MUTATION_RATE):
+    """
+    RNN rows: a base week for a random (level, goal) with per-day noise.
+
+    Columns: age, fitness_level, goal (uint8) and workouts (rows, 7) uint8;
+    the first 6 days are the input sequence, day 7 the target.
+    """
+    level = rng.integers(0, 3, rows, dtype=np.uint8)
+    goal = rng.integers(0, 3, rows, dtype=np.uint8)
+    age = rng.integers(age_range[0], age_range[1], rows, dtype=np.uint8)
+
+    workouts = BASE_PATTERNS[level * 3 + goal]
+    mutate = rng.random(workouts.shape) < mutation_rate
+    workouts[mutate] = rng.integers(0, len(workout_names), int(mutate.sum()), dtype=np.uint8)
+
+    return {'age': age, 'fitness_level': level, 'goal': goal, 'workouts': workouts}
+
+
+def generate_cnn_chunk(rng, rows, age_range=(18, 65)):
+    """
+    CNN rows: random user profiles labelled with category = level * 3 + goal.
+
+    Columns: age, fitness_level, goal, category (uint8) and weight (kg),
+    height (cm), bmi (float32).
+    """
+    age = rng.integers(age_range[0], age_range[1], rows, dtype=np.uint8)
+    weight = rng.uniform(45, 120, rows).astype(np.float32)
+    height = rng.uniform(150, 200, rows).astype(np.float32)
+    level = rng.integers(0, 3, rows, dtype=np.uint8)
+    goal = rng.integers(0, 3, rows, dtype=np.uint8)
+
+    return {
+        'age': age,
+        'weight': weight,
+        'height': height,
+        'bmi': weight / np.square(height / 100),
+        'fitness_level': level,
+        'goal': goal,
+        'category': level * 3 + goal
+    }
+
+
+def iter_chunks(generate, total_rows, chunk_size=DEFAULT_CHUNK_SIZE, seed=42, **kwargs):
+    """Yield generate(rng, n, **kwargs) chunks of at most `chunk_size` rows until `total_rows`"""
+    rng = np.random.default_rng(seed)
+    for start in range(0, total_rows, chunk_size):
+        yield generate(rng, min(chunk_size, total_rows - start), **kwargs)
+
+
+def chunk_rows(chunk):
+    return len(next(iter(chunk.values())))
+
+
+class RowRate:
+    """Rows/sec of a chunk iterator, counting only the time spent generating"""
+
+    def __init__(self):
+        self.rows = 0
+        self.seconds = 0.0
+
+    def wrap(self, chunks):
+        chunks = iter(chunks)
+        while True:
+            start = time.perf_counter()
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                return
+            self.seconds += time.perf_counter() - start
+            self.rows += chunk_rows(chunk)
+            yield chunk
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.seconds if self.seconds else 0.0
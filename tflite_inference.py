@@ -0,0 +1,111 @@
+"""
+TFLite Inference Backend
+Runs the TFLite builds of the fitness models (see export_tflite.py) with the
+lightweight `tflite_runtime` interpreter when installed, else TensorFlow's.
+"""
+
+import threading
+import numpy as np
+
+try:
+    from tflite_runtime.interpreter import Interpreter
+except ImportError:  # Fall back to the interpreter bundled with TensorFlow
+    Interpreter = None
+
+RNN_TFLITE_PATH = 'fitness_rnn_model.tflite'
+CNN_TFLITE_PATH = 'fitness_cnn_model.tflite'
+
+
+def quantize_input(values, detail):
+    """Float inputs in the tensor's dtype; full-integer models take int8 with (scale, zero_point)"""
+    scale, zero_point = detail['quantization']
+    if not scale:
+        return values.astype(detail['dtype'])
+    info = np.iinfo(detail['dtype'])
+    return np.clip(np.round(values / scale + zero_point), info.min, info.max).astype(detail['dtype'])
+
+
+def dequantize_output(values, detail):
+    scale, zero_point = detail['quantization']
+    if not scale:
+        return values
+    return (values.astype(np.float32) - zero_point) * scale
+
+
+def make_interpreter(model_path, num_threads=None):
+    interpreter_class = Interpreter
+    if interpreter_class is None:
+        import tensorflow as tf
+        interpreter_class = tf.lite.Interpreter
+    return interpreter_class(model_path=model_path, num_threads=num_threads)
+
+
+class TFLiteModel:
+    """
+    Keras-style predict() over a TFLite flatbuffer.
+
+    Inputs are matched to the Keras input names (e.g. 'sequence_input'),
+    falling back to positional order. The interpreter is not thread-safe,
+    so calls are serialized with a lock.
+
+    Models converted at a fixed batch size (the RNN, see export_tflite.py)
+    cannot be resized: their fused LSTM keeps state tensors of that size,
+    which are also written back on every invoke. Those run in chunks of the
+    fixed batch with the state reset before each chunk.
+    """
+
+    def __init__(self, model_path, input_names=None, num_threads=None):
+        self.model_path = model_path
+        self.interpreter = make_interpreter(model_path, num_threads)
+        self.interpreter.allocate_tensors()
+        self.input_details = self.interpreter.get_input_details()
+        self.output_details = self.interpreter.get_output_details()
+        self.lock = threading.Lock()
+        self.batch_size = None
+
+        if input_names is not None:
+            self.input_details = [self._find_input(name) for name in input_names]
+
+        batch = int(self.input_details[0]['shape_signature'][0])
+        self.fixed_batch = batch if batch > 0 else None
+
+    def _find_input(self, name):
+        for detail in self.input_details:
+            if name in detail['name']:
+                return detail
+        raise KeyError(f"No input named '{name}' in {self.model_path}")
+
+    def predict(self, inputs, verbose=0):
+        """Same contract as keras Model.predict for one or several inputs"""
+        if not isinstance(inputs, (list, tuple)):
+            inputs = [inputs]
+        inputs = [np.asarray(values, dtype=np.float32) for values in inputs]
+        batch_size = inputs[0].shape[0]
+
+        with self.lock:
+            if self.fixed_batch is None:
+                if batch_size != self.batch_size:
+                    for detail, values in zip(self.input_details, inputs):
+                        self.interpreter.resize_tensor_input(detail['index'], values.shape)
+                    self.interpreter.allocate_tensors()
+                    self.batch_size = batch_size
+                return self._invoke(inputs)
+
+            outputs = []
+            for start in range(0, batch_size, self.fixed_batch):
+                chunk = [values[start:start + self.fixed_batch] for values in inputs]
+                rows = chunk[0].shape[0]
+                if rows < self.fixed_batch:
+                    chunk = [np.concatenate([values, np.zeros((self.fixed_batch - rows,) + values.shape[1:],
+                                                              dtype=np.float32)]) for values in chunk]
+                self.interpreter.reset_all_variables()
+                outputs.append(self._invoke(chunk)[:rows])
+            return np.concatenate(outputs)
+
+    def _invoke(self, inputs):
+        for detail, values in zip(self.input_details, inputs):
+            self.interpreter.set_tensor(detail['index'], quantize_input(values, detail))
+        self.interpreter.invoke()
+
+        output = self.output_details[0]
+        return dequantize_output(self.interpreter.get_tensor(output['index']).copy(), output)
@@ -0,0 +1,295 @@
+"""
+Train the fitness RNN
+Generates the synthetic weeks, trains the windowed LSTM model, saves
+fitness_rnn_model.h5 and exports the week decoder used by model_api.py.
+
+Usage:
+    python train_rnn_model.py
+    python train_rnn_model.py --stepwise      # also train the stateful step-wise variant
+    python train_rnn_model.py --epochs 20     # quick run
+    python train_rnn_model.py --dataset rnn_training_dataset   # train on generate_datasets.py output
+    python train_rnn_model.py --dataset rnn_training_dataset --stream   # tf.data, larger than memory
+    python train_rnn_model.py --compact --age-bucket 5    # weighted unique rows instead of duplicates
+    python train_rnn_model.py --compare-compact           # full vs compacted, time-to-accuracy report
+    python train_rnn_model.py --jit-compile --mixed-precision --batch-size 256   # see benchmark_training.py
+"""
+
+import argparse
+import numpy as np
+
+from data_pipeline import RNN_SPLITS, DEFAULT_SHUFFLE_BUFFER, count_rows, rnn_dataset, throughput_logger
+from fitness_rnn_model import (
+    MODEL_PATH, DECODER_PATH, STEPWISE_MODEL_PATH, workout_names, days_of_week,
+    generate_training_data, load_training_data, create_rnn_model, compile_rnn_model, export_week_decoder,
+    create_stepwise_training_model, create_stepwise_decoder, decode_week_stepwise,
+    predict_next_workout, generate_weekly_plan, user_features, compact_training_rows
+)
+from training_modes import set_mixed_precision, to_float32, training_clock
+
+DEFAULT_TARGET_ACCURACY = 0.85  # Validation accuracy used for time-to-accuracy
+
+
+def fit_split(data, compact=False, age_bucket=None):
+    """
+    (inputs, labels, fit kwargs) for model.fit. Validation is the last 20% of
+    the training split either way (what validation_split=0.2 holds out); with
+    `compact` the remaining rows are collapsed into weighted unique rows.
+    """
+    X_seq_train, _, X_feat_train, _, y_train, _ = data
+    if not compact:
+        return [X_seq_train, X_feat_train], y_train, {'validation_split': 0.2}
+
+    fit_rows = len(y_train) - int(len(y_train) * 0.2)
+    validation = ([X_seq_train[fit_rows:], X_feat_train[fit_rows:]], y_train[fit_rows:])
+    seq, feat, labels, sample_weight = compact_training_rows(
+        X_seq_train[:fit_rows], X_feat_train[:fit_rows], y_train[:fit_rows], age_bucket)
+    print(f"Compacted {fit_rows:,} training rows to {len(labels):,} unique rows "
+          f"({fit_rows / len(labels):.1f}x{f', ages bucketed by {age_bucket}' if age_bucket else ''})")
+    return [seq, feat], labels, {'validation_data': validation, 'sample_weight': sample_weight}
+
+
+def train_rnn(data, epochs=100, batch_size=64, compact=False, age_bucket=None, callbacks=(), jit_compile=False):
+    """Train and evaluate the windowed model; returns (model, test_accuracy)"""
+    _, X_seq_test, _, X_feat_test, _, y_test = data
+    inputs, labels, fit_kwargs = fit_split(data, compact, age_bucket)
+
+    model = compile_rnn_model(create_rnn_model(), jit_compile)
+
+    # Model summary
+    print("=" * 60)
+    print("FITNESS PLAN RNN MODEL ARCHITECTURE")
+    print("=" * 60)
+    model.summary()
+
+    # Train the model
+    print("\n" + "=" * 60)
+    print("TRAINING RNN MODEL")
+    print("=" * 60)
+
+    fit_rows = len(labels) if compact else len(labels) - int(len(labels) * 0.2)
+    model.fit(
+        inputs,
+        labels,
+        epochs=epochs,
+        batch_size=batch_size,
+        callbacks=[throughput_logger(fit_rows), *callbacks],
+        verbose=1,
+        **fit_kwargs
+    )
+
+    # Evaluate model
+    print("\n" + "=" * 60)
+    print("MODEL EVALUATION")
+    print("=" * 60)
+    test_loss, test_accuracy = model.evaluate(
+        [X_seq_test, X_feat_test],
+        y_test,
+        verbose=0
+    )
+    print(f"Test Accuracy: {test_accuracy * 100:.2f}%")
+    print(f"Test Loss: {test_loss:.4f}")
+    return model, test_accuracy
+
+
+def compare_compaction(data, epochs=100, batch_size=64, age_bucket=None, target_accuracy=DEFAULT_TARGET_ACCURACY):
+    """Train on the full and the compacted training split and report both side by side"""
+    results = {}
+    for name, compact in (('full', False), ('compact', True)):
+        callback, clock = training_clock(target_accuracy)
+        _, test_accuracy = train_rnn(
+            data, epochs=epochs, batch_size=batch_size, compact=compact, age_bucket=age_bucket, callbacks=[callback])
+        results[name] = (clock, test_accuracy)
+
+    print("\n" + "=" * 60)
+    print(f"FULL VS COMPACTED TRAINING (target val accuracy {target_accuracy * 100:.0f}%)")
+    print("=" * 60)
+    print(f"{'':<10}{'s/epoch':>10}{'to target':>14}{'epochs':>8}{'test acc':>10}")
+    for name, (clock, test_accuracy) in results.items():
+        epoch_seconds = np.mean(clock['epoch_seconds'])
+        reached = clock['time_to_accuracy'] is not None
+        to_target = f"{clock['time_to_accuracy']:.1f}s" if reached else 'not reached'
+        epochs_to = str(clock['epochs_to_accuracy']) if reached else '-'
+        print(f"{name:<10}{epoch_seconds:>10.3f}{to_target:>14}{epochs_to:>8}{test_accuracy * 100:>9.2f}%")
+
+    full, compact = results['full'][0], results['compact'][0]
+    print(f"\nEpoch speed-up: {np.mean(full['epoch_seconds']) / np.mean(compact['epoch_seconds']):.1f}x")
+    if full['time_to_accuracy'] and compact['time_to_accuracy']:
+        print(f"Time-to-accuracy speed-up: {full['time_to_accuracy'] / compact['time_to_accuracy']:.1f}x")
+
+
+def train_rnn_streaming(path, epochs=100, batch_size=64, shuffle_buffer=DEFAULT_SHUFFLE_BUFFER, jit_compile=False):
+    """Train and evaluate the windowed model from the tf.data pipeline; returns (model, test_accuracy)"""
+    train = rnn_dataset(path, RNN_SPLITS['train'], batch_size, shuffle_buffer)
+    validation = rnn_dataset(path, RNN_SPLITS['validation'], batch_size, shuffle_buffer=0)
+    test = rnn_dataset(path, RNN_SPLITS['test'], batch_size, shuffle_buffer=0)
+    train_rows = count_rows(path, RNN_SPLITS['train'])
+
+    model = compile_rnn_model(create_rnn_model(), jit_compile)
+
+    print("=" * 60)
+    print("FITNESS PLAN RNN MODEL ARCHITECTURE")
+    print("=" * 60)
+    model.summary()
+
+    print("\n" + "=" * 60)
+    print(f"TRAINING RNN MODEL (streaming {train_rows:,} rows from '{path}/')")
+    print("=" * 60)
+
+    model.fit(
+        train,
+        validation_data=validation,
+        epochs=epochs,
+        callbacks=[throughput_logger(train_rows)],
+        verbose=1
+    )
+
+    print("\n" + "=" * 60)
+    print("MODEL EVALUATION")
+    print("=" * 60)
+    test_loss, test_accuracy = model.evaluate(test, verbose=0)
+    print(f"Test Accuracy: {test_accuracy * 100:.2f}%")
+    print(f"Test Loss: {test_loss:.4f}")
+    return model, test_accuracy
+
+
+def train_stepwise(data, week_decoder, test_accuracy, epochs=100, batch_size=64, jit_compile=False,
+                   mixed_precision=False):
+    """Train the step-wise variant on the same data and compare it with the windowed model"""
+    import tensorflow as tf
+    from training_data import workout_patterns
+
+    X_seq_train, X_seq_test, X_feat_train, X_feat_test, y_train, y_test = data
+
+    print("\n" + "=" * 60)
+    print("STEP-WISE MODEL TRAINING")
+    print("=" * 60)
+
+    full_train = np.concatenate([X_seq_train, y_train[:, None]], axis=1)
+    full_test = np.concatenate([X_seq_test, y_test[:, None]], axis=1)
+
+    if mixed_precision:
+        set_mixed_precision(True)
+    stepwise_model = compile_rnn_model(create_stepwise_training_model(), jit_compile)
+    stepwise_model.fit(
+        [full_train[:, :-1], X_feat_train],
+        full_train[:, 1:],
+        epochs=epochs,
+        batch_size=batch_size,
+        validation_split=0.2,
+        verbose=1
+    )
+    if mixed_precision:
+        stepwise_model = to_float32(stepwise_model, create_stepwise_training_model)
+    stepwise_model.save(STEPWISE_MODEL_PATH)
+    print(f"\n✅ Step-wise model saved as '{STEPWISE_MODEL_PATH}'")
+
+    # Day-7 accuracy is the prediction at the last position
+    stepwise_probs = stepwise_model.predict([full_test[:, :-1], X_feat_test], verbose=0)
+    stepwise_accuracy = np.mean(np.argmax(stepwise_probs[:, -1], axis=-1) == y_test)
+
+    # Weekly plans for every pattern the API serves, both decoders
+    grid = [(age, level, goal) for age in range(18, 65) for (level, goal) in sorted(workout_patterns)]
+    seeds = np.array([workout_patterns[(level, goal)] for _, level, goal in grid], dtype=np.int32)
+    features = np.array([user_features(age, level, goal) for age, level, goal in grid], dtype=np.float32)
+
+    step_model = create_stepwise_decoder(stepwise_model)
+    windowed_weeks = week_decoder.decode_week(tf.constant(seeds), tf.constant(features))['week'].numpy()
+    stepwise_weeks = decode_week_stepwise(step_model, seeds, features)
+    plan_agreement = np.mean(np.all(windowed_weeks == stepwise_weeks, axis=1))
+
+    print("\nWindowed vs step-wise")
+    print(f"  Day-7 test accuracy: windowed {test_accuracy * 100:.2f}% | step-wise {stepwise_accuracy * 100:.2f}%")
+    print(f"  Identical weekly plans: {plan_agreement * 100:.2f}% of {len(grid)}")
+    print("  LSTM steps per week (5 predicted days): windowed 30 | step-wise 6")
+    print("  Serve it with: python numpy_inference.py --stepwise")
+
+
+def print_sample_predictions(model):
+    print("\n" + "=" * 60)
+    print("SAMPLE PREDICTION - Next Workout")
+    print("=" * 60)
+    print("Input: Past week=[Cardio, Rest, Strength, Rest, Cardio, Rest]")
+    print("       Age=30, Level=Intermediate, Goal=Weight Loss")
+    past_week = [1, 0, 2, 0, 1, 0]
+    predicted_class, confidence = predict_next_workout(model, past_week, 30, 1, 0)
+    print(f"\n🎯 Prediction Results:")
+    print(f"   Past Week: {[workout_names[i] for i in past_week]}")
+    print(f"   Next Workout: {workout_names[predicted_class]}")
+    print(f"   Confidence: {confidence:.2f}%")
+
+    print("\n" + "=" * 60)
+    print("SAMPLE PREDICTION - Full Week Plan")
+    print("=" * 60)
+    print("Input: Age=25, Level=Beginner, Goal=Muscle Gain")
+    week = generate_weekly_plan(model, 25, 0, 1)
+    print(f"\n📅 Weekly Workout Plan:")
+    for day, workout in zip(days_of_week, week):
+        print(f"   {day}: {workout_names[workout]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Train the fitness RNN model')
+    parser.add_argument('--epochs', type=int, default=100)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--samples', type=int, default=2000, help='synthetic weeks to generate')
+    parser.add_argument('--dataset', help='columnar dataset directory from generate_datasets.py (default: generate in memory)')
+    parser.add_argument('--stream', action='store_true', help='stream --dataset through tf.data instead of loading it')
+    parser.add_argument('--shuffle-buffer', type=int, default=DEFAULT_SHUFFLE_BUFFER, help='rows (--stream only)')
+    parser.add_argument('--compact', action='store_true', help='train on weighted unique rows')
+    parser.add_argument('--age-bucket', type=int, help='with --compact, bucket ages into this many years')
+    parser.add_argument('--compare-compact', action='store_true', help='report full vs compacted training, then exit')
+    parser.add_argument('--target-accuracy', type=float, default=DEFAULT_TARGET_ACCURACY,
+                        help='validation accuracy for --compare-compact time-to-accuracy')
+    parser.add_argument('--stepwise', action='store_true', help='also train the stateful step-wise variant')
+    parser.add_argument('--jit-compile', action='store_true', help='compile train steps with XLA')
+    parser.add_argument('--mixed-precision', action='store_true', help='train in mixed bfloat16 (saved models stay float32)')
+    args = parser.parse_args()
+    if args.stream and not args.dataset:
+        parser.error('--stream needs --dataset')
+    if args.stream and (args.stepwise or args.compact or args.compare_compact):
+        parser.error('--stepwise and compaction train from in-memory arrays, drop --stream')
+
+    if args.mixed_precision:
+        set_mixed_precision(True)
+
+    if args.stream:
+        model, test_accuracy = train_rnn_streaming(
+            args.dataset, epochs=args.epochs, batch_size=args.batch_size, shuffle_buffer=args.shuffle_buffer,
+            jit_compile=args.jit_compile)
+    else:
+        if args.dataset:
+            data = load_training_data(args.dataset)
+            print(f"Loaded {len(data[0]) + len(data[1])} weeks from '{args.dataset}/'")
+        else:
+            data = generate_training_data(samples=args.samples)
+        if args.compare_compact:
+            compare_compaction(data, args.epochs, args.batch_size, args.age_bucket, args.target_accuracy)
+            return
+        model, test_accuracy = train_rnn(
+            data, epochs=args.epochs, batch_size=args.batch_size, compact=args.compact, age_bucket=args.age_bucket,
+            jit_compile=args.jit_compile)
+
+    if args.mixed_precision:
+        model = to_float32(model, create_rnn_model)
+
+    # Save model
+    model.save(MODEL_PATH)
+    print(f"\n✅ Model saved as '{MODEL_PATH}'")
+
+    # Export the week decoder used by model_api.py
+    week_decoder = export_week_decoder(model, DECODER_PATH)
+    print(f"✅ Week decoder exported to '{DECODER_PATH}/'")
+
+    if args.stepwise:
+        train_stepwise(data, week_decoder, test_accuracy, epochs=args.epochs, batch_size=args.batch_size,
+                       jit_compile=args.jit_compile, mixed_precision=args.mixed_precision)
+
+    print_sample_predictions(model)
+
+    print("\n" + "=" * 60)
+    print("TRAINING COMPLETE!")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
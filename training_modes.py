@@ -0,0 +1,65 @@
+"""
+Training Modes
+Opt-in XLA compilation (jit_compile) and mixed precision for the training
+scripts and benchmark_training.py. Both are off by default, and models are
+converted back to float32 before they are saved, so serving and the exports
+never see a mixed-precision layer.
+"""
+
+import time
+
+# bfloat16 has fast CPU kernels (AVX-512 BF16 / AMX); float16 mostly does not
+MIXED_PRECISION_POLICY = 'mixed_bfloat16'
+
+
+def set_mixed_precision(enabled):
+    """Global Keras dtype policy for the models built afterwards"""
+    from tensorflow import keras
+
+    keras.mixed_precision.set_global_policy(MIXED_PRECISION_POLICY if enabled else 'float32')
+
+
+def to_float32(model, build):
+    """
+    `model` rebuilt by `build()` under the float32 policy, with its trained
+    weights (mixed-precision variables are float32 already). Leaves the
+    global policy at float32 for everything built afterwards.
+    """
+    set_mixed_precision(False)
+    copy = build()
+    copy.set_weights(model.get_weights())
+    return copy
+
+
+def mode_name(jit_compile=False, mixed_precision=False):
+    parts = (['xla'] if jit_compile else []) + (['mixed'] if mixed_precision else [])
+    return '+'.join(parts) or 'baseline'
+
+
+def training_clock(target_accuracy=None, monitor='val_accuracy'):
+    """
+    Keras callback timing every epoch and, with `target_accuracy`, the first
+    epoch where `monitor` reaches it. Returns (callback, clock dict filled during fit).
+    """
+    from tensorflow import keras
+
+    clock = {'epoch_seconds': [], 'time_to_accuracy': None, 'epochs_to_accuracy': None}
+    started = {}
+
+    def on_train_begin(logs=None):
+        started['train'] = time.perf_counter()
+
+    def on_epoch_begin(epoch, logs=None):
+        started['epoch'] = time.perf_counter()
+
+    def on_epoch_end(epoch, logs=None):
+        now = time.perf_counter()
+        clock['epoch_seconds'].append(now - started['epoch'])
+        reached = target_accuracy is not None and (logs or {}).get(monitor, 0.0) >= target_accuracy
+        if reached and clock['time_to_accuracy'] is None:
+            clock['time_to_accuracy'] = now - started['train']
+            clock['epochs_to_accuracy'] = epoch + 1
+
+    callback = keras.callbacks.LambdaCallback(
+        on_train_begin=on_train_begin, on_epoch_begin=on_epoch_begin, on_epoch_end=on_epoch_end)
+    return callback, clock